@@ -0,0 +1,102 @@
+"""
+Import cost of the app's modules, each imported in a fresh interpreter as in a new Streamlit worker:
+
+    python -m benchmarks.bench_imports
+    python -m benchmarks.bench_imports --modules src.pages.ResultsPage tensorflow --top 15
+
+For every module, reports the wall time of the fresh interpreter importing it, the cumulative time
+Python's -X importtime attributes to it, whether TensorFlow was imported along the way, and the
+slowest packages it imported.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULES = (
+    "main",
+    "src.pages.HomePage",
+    "src.pages.ContactPage",
+    "src.pages.DataGatheringPage",
+    "src.pages.DataAnalysisPage",
+    "src.pages.DataPreprocessingPage",
+    "src.pages.ModelPage",
+    "src.pages.ResultsPage",
+)
+
+
+def parse_importtime(stderr: str) -> list[tuple[str, int, int]]:
+    """
+    Parses the output of python -X importtime into (module, self us, cumulative us) rows.
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def measure_import(module: str, python: str = sys.executable) -> dict:
+    """
+    Imports module in a fresh interpreter and returns its import times and imported packages.
+    """
+    start = time.perf_counter()
+    result = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    wall_time = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+    rows = parse_importtime(result.stderr)
+    cumulative = {name: cumulative_us for name, _, cumulative_us in rows}
+    return {
+        "wall_s": wall_time,
+        "import_s": cumulative.get(module, 0) / 1e6,
+        "tensorflow": "tensorflow" in cumulative,
+        "rows": rows,
+    }
+
+
+def run_benchmark(modules=DEFAULT_MODULES, top: int = 5) -> tuple[pd.DataFrame, dict[str, list]]:
+    """
+    Returns a DataFrame of the import cost of each module, along with the top packages by
+    cumulative import time for each module.
+    """
+    # The startup of a bare interpreter, subtracted from the wall times
+    baseline = min(measure_import("sys")["wall_s"] for _ in range(3))
+    results = {}
+    heaviest = {}
+    for module in modules:
+        measurement = measure_import(module)
+        results[module] = {
+            "wall_s": measurement["wall_s"] - baseline,
+            "import_s": measurement["import_s"],
+            "tensorflow": measurement["tensorflow"],
+        }
+        # Only top level packages, since their cumulative time includes their submodules
+        packages = [(name, cumulative_us / 1e6) for name, _, cumulative_us in measurement["rows"] if "." not in name and name != module]
+        heaviest[module] = sorted(packages, key=lambda package: -package[1])[:top]
+    return pd.DataFrame.from_dict(results, orient="index").rename_axis("module"), heaviest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the import cost of the app's modules.")
+    parser.add_argument("--modules", nargs="+", default=list(DEFAULT_MODULES))
+    parser.add_argument("--top", type=int, default=5, help="Number of slowest packages listed per module")
+    args = parser.parse_args(argv)
+    results, heaviest = run_benchmark(args.modules, args.top)
+    print(results.to_string(float_format=lambda value: f"{value:.3f}"))
+    for module, packages in heaviest.items():
+        print(f"\n{module}: " + ", ".join(f"{name} {seconds:.3f}s" for name, seconds in packages))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+"""
+Time and peak memory of the steps of the data to model pipeline, on synthetic OHLCV data so that
+it runs offline and gives the same inputs on every machine:
+
+    python -m benchmarks.bench_pipeline
+    python -m benchmarks.bench_pipeline --quick --benchmarks construct_lstm_data preprocess_data
+    python -m benchmarks.bench_pipeline --series-lengths 5000 --window-sizes 60 --save-baseline benchmarks/baselines/pipeline.json
+    python -m benchmarks.bench_pipeline --compare benchmarks/baselines/pipeline.json --threshold 0.2
+
+Every benchmark runs over the grid of the parameters it depends on, among the series length, the
+window size, the number of features and the batch size. Times are the median and min over the
+repeats, after a warmup call that pays the one-off costs such as tracing. Peak memory is the peak
+of the Python and NumPy allocations seen by tracemalloc during one more call, which does not see
+the memory TensorFlow allocates natively.
+
+Baselines are machine specific, so none is committed: save one locally with --save-baseline,
+by default to benchmarks/baselines/pipeline.json, before the change to measure. With --compare,
+the results are matched with that baseline, and the cases slower, by their min time, or using
+more memory than the baseline by more than the threshold are flagged as regressions, the command
+then exiting with status 1.
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "pipeline.json")
+PARAMETERS = ("series_length", "window_size", "n_features", "batch_size")
+DEFAULT_GRID = {"series_length": (1_000, 10_000), "window_size": (8, 60), "n_features": (1, 5), "batch_size": (16, 256)}
+QUICK_GRID = {"series_length": (1_000,), "window_size": (8,), "n_features": (1,), "batch_size": (16,)}
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+def synthetic_ohlcv(n_rows: int, seed: int = 0, start_price: float = 100.0) -> pd.DataFrame:
+    """
+    Returns n_rows business days of OHLCV bars following a geometric Brownian motion, along with
+    the change_percent column that gather_data adds.
+    """
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0.0003, 0.015, n_rows)
+    close = start_price * np.exp(np.cumsum(returns))
+    open_ = np.concatenate([[start_price], close[:-1]]) * np.exp(rng.normal(0, 0.002, n_rows))
+    spread = np.abs(rng.normal(0, 0.01, n_rows))
+    df = pd.DataFrame({
+        "Open": open_,
+        "High": np.maximum(open_, close) * (1 + spread),
+        "Low": np.minimum(open_, close) * (1 - spread),
+        "Close": close,
+        "Volume": rng.lognormal(15, 0.5, n_rows).round(),
+    }, index=pd.bdate_range("2000-01-03", periods=n_rows, name="Date"))
+    df["change_percent"] = df["Close"].pct_change() * 100
+    return df
+
+
+def synthetic_features(n_rows: int, n_features: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Returns n_features columns of synthetic data, Close first, then the other OHLCV columns, then
+    random walks.
+    """
+    df = synthetic_ohlcv(n_rows, seed)
+    columns = (["Close"] + [column for column in OHLCV_COLUMNS if column != "Close"])[:n_features]
+    features = df[columns].copy()
+    rng = np.random.default_rng(seed + 1)
+    for i in range(len(columns), n_features):
+        features[f"walk_{i}"] = np.cumsum(rng.normal(0, 1, n_rows))
+    return features
+
+
+def _make_model(window_size, n_features):
+    from src.create_model import LSTMForecasting
+    # The default model of the Model page
+    model = LSTMForecasting(
+        input_size=window_size,
+        lstm_hidden_size=50,
+        linear_hidden_size=10,
+        lstm_num_layers=2,
+        linear_num_layers=2,
+        output_size=1
+    )
+    model(np.zeros((1, window_size, n_features), dtype=np.float32))
+    return model
+
+
+def _splits(series_length, n_features):
+    from src.data_handling import split_dataset_sequentially
+    data = {"SYN": synthetic_features(series_length, n_features)}
+    return split_dataset_sequentially(data, ["SYN", list(data["SYN"].columns)])
+
+
+def _setup_construct_lstm_data(series_length, window_size, n_features):
+    from src.data_handling import construct_lstm_data
+    data = np.random.default_rng(0).random((series_length, n_features))
+    return lambda: construct_lstm_data(data, window_size)
+
+
+def _setup_split_dataset_sequentially(series_length, n_features):
+    from src.data_handling import split_dataset_sequentially
+    data = {"SYN": synthetic_features(series_length, n_features)}
+    target = ["SYN", list(data["SYN"].columns)]
+    return lambda: split_dataset_sequentially(data, target)
+
+
+def _setup_preprocess_data(series_length, window_size, n_features):
+    from src.data_handling import preprocess_data
+    splits = _splits(series_length, n_features)
+    return lambda: preprocess_data(*splits, seq_size=window_size, target_index=0)
+
+
+def _setup_model_forward(window_size, n_features, batch_size):
+    model = _make_model(window_size, n_features)
+    X = np.random.default_rng(0).random((batch_size, window_size, n_features), dtype=np.float32)
+    return lambda: model(X, training=False)
+
+
+def _setup_model_train_step(window_size, n_features, batch_size):
+    model = _make_model(window_size, n_features)
+    model.compile(optimizer="adam", loss="mean_squared_error")
+    rng = np.random.default_rng(0)
+    X = rng.random((batch_size, window_size, n_features), dtype=np.float32)
+    y = rng.random((batch_size, 1), dtype=np.float32)
+    return lambda: model.train_on_batch(X, y)
+
+
+def _setup_predict(series_length, window_size, n_features):
+    from src.data_handling import preprocess_data
+    from src.predictions import predict
+    X_train, y_train, X_val, y_val, X_test, y_test, scaler = preprocess_data(*_splits(series_length, n_features), seq_size=window_size, target_index=0)
+    model = _make_model(window_size, n_features)
+    return lambda: predict(model, X_train, X_val, X_test, y_train, y_val, y_test, scaler)
+
+
+def _setup_plot_stats(series_length):
+    import matplotlib.pyplot as plt
+    from src.plotting import plot_stats
+    data = {"SYN": synthetic_ohlcv(series_length)}
+
+    def run():
+        fig, _ = plot_stats(data, "SYN")
+        if fig is not None:
+            plt.close(fig)
+    return run
+
+
+# Benchmarks by name, with the function returning the call to measure from the benchmark parameters
+BENCHMARKS = {
+    "construct_lstm_data": _setup_construct_lstm_data,
+    "split_dataset_sequentially": _setup_split_dataset_sequentially,
+    "preprocess_data": _setup_preprocess_data,
+    "model_forward": _setup_model_forward,
+    "model_train_step": _setup_model_train_step,
+    "predict": _setup_predict,
+    "plot_stats": _setup_plot_stats,
+}
+
+
+def benchmark_parameters(name: str) -> list[str]:
+    """
+    Returns the parameters, among PARAMETERS, a benchmark depends on.
+    """
+    code = BENCHMARKS[name].__code__
+    return [parameter for parameter in code.co_varnames[:code.co_argcount] if parameter in PARAMETERS]
+
+
+def measure(fn, repeats: int = 5, warmup: int = 1) -> dict[str, float]:
+    """
+    Returns the median and min time in seconds of fn over repeats calls, after warmup calls, and
+    the peak memory in MB allocated during one more call.
+    """
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"median_s": float(np.median(times)), "min_s": float(np.min(times)), "peak_mb": peak / 1024 ** 2}
+
+
+def _format_params(params: dict) -> str:
+    return ",".join(f"{name}={value}" for name, value in params.items())
+
+
+def run_benchmarks(names=tuple(BENCHMARKS), grid: dict = DEFAULT_GRID, repeats: int = 5, warmup: int = 1) -> pd.DataFrame:
+    """
+    Runs every benchmark over the grid of the parameters it depends on.
+
+    Args:
+    - names: The benchmarks to run, see BENCHMARKS
+    - grid: The values of every parameter, see DEFAULT_GRID
+    - repeats: The number of timed calls per case
+    - warmup: The number of calls before the timed ones
+
+    Returns:
+    - A DataFrame indexed by benchmark and parameters, with the median_s, min_s and peak_mb of every case
+    """
+    rows = []
+    for name in names:
+        if name not in BENCHMARKS:
+            raise ValueError(f"Unknown benchmark {name}, expected one of {', '.join(BENCHMARKS)}")
+        parameters = benchmark_parameters(name)
+        for values in itertools.product(*(grid[parameter] for parameter in parameters)):
+            params = dict(zip(parameters, values))
+            fn = BENCHMARKS[name](**params)
+            rows.append({"benchmark": name, "params": _format_params(params), **measure(fn, repeats, warmup)})
+    return pd.DataFrame(rows, columns=["benchmark", "params", "median_s", "min_s", "peak_mb"]).set_index(["benchmark", "params"])
+
+
+def save_baseline(results: pd.DataFrame, path: str = DEFAULT_BASELINE_PATH) -> None:
+    """
+    Saves results to a JSON baseline, along with the machine and versions they were measured on.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    baseline = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "results": results.reset_index().to_dict(orient="records"),
+    }
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2)
+
+
+def load_baseline(path: str = DEFAULT_BASELINE_PATH) -> pd.DataFrame:
+    """
+    Returns the results of a baseline saved by save_baseline.
+    """
+    with open(path) as f:
+        baseline = json.load(f)
+    return pd.DataFrame(baseline["results"]).set_index(["benchmark", "params"])
+
+
+def compare(results: pd.DataFrame, baseline: pd.DataFrame, threshold: float = 0.2, memory_threshold: float = 0.2,
+            min_time: float = 1e-4) -> pd.DataFrame:
+    """
+    Compares results with a baseline, case by case. Cases missing from either are left out. Times
+    are compared by their min over the repeats, which is the least affected by other processes.
+
+    Args:
+    - results, baseline: Results of run_benchmarks
+    - threshold: The relative increase of the min time flagged as a regression
+    - memory_threshold: The relative increase of the peak memory flagged as a regression
+    - min_time: Time differences below this many seconds are noise and never flagged
+
+    Returns:
+    - A DataFrame of the current and baseline min time and peak memory of every case, their
+      ratios, and whether the case regressed
+    """
+    joined = results[["min_s", "peak_mb"]].join(baseline[["min_s", "peak_mb"]], rsuffix="_baseline", how="inner")
+    joined["time_ratio"] = joined["min_s"] / joined["min_s_baseline"]
+    joined["memory_ratio"] = joined["peak_mb"] / joined["peak_mb_baseline"]
+    slower = (joined["time_ratio"] > 1 + threshold) & (joined["min_s"] - joined["min_s_baseline"] > min_time)
+    # Allocations of less than a kilobyte are noise too
+    larger = (joined["memory_ratio"] > 1 + memory_threshold) & (joined["peak_mb"] - joined["peak_mb_baseline"] > 1 / 1024)
+    joined["regression"] = slower | larger
+    return joined
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--benchmarks", nargs="+", default=list(BENCHMARKS), choices=list(BENCHMARKS))
+    parser.add_argument("--quick", action="store_true", help="Run a single small case per benchmark")
+    parser.add_argument("--series-lengths", type=int, nargs="+", default=None)
+    parser.add_argument("--window-sizes", type=int, nargs="+", default=None)
+    parser.add_argument("--features", type=int, nargs="+", default=None, help="Numbers of features")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=None)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE_PATH, default=None, metavar="PATH")
+    parser.add_argument("--compare", nargs="?", const=DEFAULT_BASELINE_PATH, default=None, metavar="PATH")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative time increase flagged as a regression")
+    parser.add_argument("--memory-threshold", type=float, default=0.2, help="Relative peak memory increase flagged as a regression")
+    args = parser.parse_args(argv)
+    if args.compare and not os.path.exists(args.compare):
+        parser.error(f"no baseline at {args.compare}. Baselines are made locally, run with --save-baseline first")
+
+    grid = dict(QUICK_GRID if args.quick else DEFAULT_GRID)
+    for parameter, values in (("series_length", args.series_lengths), ("window_size", args.window_sizes),
+                              ("n_features", args.features), ("batch_size", args.batch_sizes)):
+        if values:
+            grid[parameter] = tuple(values)
+
+    results = run_benchmarks(args.benchmarks, grid, args.repeats, args.warmup)
+    print(results.to_string(float_format=lambda value: f"{value:.4f}"))
+    if args.save_baseline:
+        save_baseline(results, args.save_baseline)
+        print(f"\nBaseline saved to {args.save_baseline}")
+    if args.compare:
+        comparison = compare(results, load_baseline(args.compare), args.threshold, args.memory_threshold)
+        print(f"\nCompared with {args.compare}:")
+        print(comparison.to_string(float_format=lambda value: f"{value:.4f}"))
+        regressions = comparison[comparison["regression"]]
+        if len(regressions):
+            print(f"\n{len(regressions)} regression(s):")
+            for benchmark, params in regressions.index:
+                row = regressions.loc[(benchmark, params)]
+                print(f"  {benchmark} [{params}]: time x{row['time_ratio']:.2f}, memory x{row['memory_ratio']:.2f}")
+            return 1
+        print("\nNo regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""
+Per-call prediction latency of an LSTMForecasting model served through model.predict, a direct
+model call and the compiled serving function (with and without XLA):
+
+    python -m benchmarks.bench_serving --window-size 60 --repeats 50
+"""
+import argparse
+import time
+
+import numpy as np
+
+from src.create_model import LSTMForecasting
+from src.serving import ServingModel
+
+
+def time_call(fn, X, repeats):
+    # The first call traces and compiles, so it is excluded from the timing
+    fn(X)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn(X)
+    return (time.perf_counter() - start) / repeats
+
+
+def run_benchmark(window_size=60, n_features=1, batch_sizes=(1, 32, 1024), repeats=50):
+    """
+    Returns the mean latency in milliseconds of each prediction path for every batch size.
+    """
+    model = LSTMForecasting(
+        input_size=window_size,
+        lstm_hidden_size=50,
+        linear_hidden_size=10,
+        lstm_num_layers=2,
+        linear_num_layers=2,
+        output_size=1
+    )
+    model(np.zeros((1, window_size, n_features), dtype=np.float32))
+    paths = {
+        "model.predict": lambda X: model.predict(X, verbose=0),
+        "model call": lambda X: model(X, training=False),
+        "serving": ServingModel(model, n_features).predict,
+        "serving (XLA)": ServingModel(model, n_features, jit_compile=True).predict,
+    }
+    results = {}
+    for batch_size in batch_sizes:
+        X = np.random.rand(batch_size, window_size, n_features).astype(np.float32)
+        results[batch_size] = {name: time_call(fn, X, repeats) * 1000 for name, fn in paths.items()}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--window-size", type=int, default=60)
+    parser.add_argument("--features", type=int, default=1)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 32, 1024])
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+
+    results = run_benchmark(args.window_size, args.features, args.batch_sizes, args.repeats)
+    names = list(next(iter(results.values())))
+    print(f"{'batch size':>10} " + " ".join(f"{name:>15}" for name in names) + "   (ms per call)")
+    for batch_size, latencies in results.items():
+        print(f"{batch_size:>10} " + " ".join(f"{latencies[name]:>15.3f}" for name in names))
+
+
+if __name__ == "__main__":
+    main()
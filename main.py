@@ -2,42 +2,38 @@
 ########################################################### IMPORTS ###################################################
 #######################################################################################################################
 
+import importlib
+
 import streamlit as st
 from streamlit_option_menu import option_menu
 
-from src.plotting import *
-from src.data_handling import *
-from src.constants import *
-from src.create_model import *
-from src.pages.HomePage import HomePage
-from src.pages.ContactPage import ContactPage
-from src.pages.DataGatheringPage import DataGathering
-from src.pages.DataAnalysisPage import DataAnalysis
-from src.pages.DataPreprocessingPage import DataPreprocessing
-from src.pages.ModelPage import ModelPage
-from src.pages.ResultsPage import ResultsPage
-
 #######################################################################################################################
-########################################################### CACHE FUNCTIONS ###########################################
+########################################################### LAZY PAGES ################################################
 #######################################################################################################################
 
-gather_data=st.cache_data(gather_data)
-plot_stats=st.cache_data(plot_stats)
-LSTMForecasting= st.cache_resource(LSTMForecasting)
+# Page modules are imported the first time their page is rendered, so heavy libraries are only
+# imported by the pages that need them, e.g. TensorFlow by the Model training and Results pages.
+# Measure the import cost of each module with: python -m benchmarks.bench_imports
+PAGE_CLASSES = {
+    "Home": ("src.pages.HomePage", "HomePage"),
+    "Data gathering": ("src.pages.DataGatheringPage", "DataGathering"),
+    "Data analysis": ("src.pages.DataAnalysisPage", "DataAnalysis"),
+    "Data preprocessing": ("src.pages.DataPreprocessingPage", "DataPreprocessing"),
+    "Model training": ("src.pages.ModelPage", "ModelPage"),
+    "Results": ("src.pages.ResultsPage", "ResultsPage"),
+    "Contact Me": ("src.pages.ContactPage", "ContactPage"),
+}
+
+def load_page(name):
+    module_name, class_name = PAGE_CLASSES[name]
+    # importlib caches the modules, so each page module is only imported once per process
+    return getattr(importlib.import_module(module_name), class_name)(name)
+
 #######################################################################################################################
 ########################################################## MAIN STREAMLIT SECTION #####################################
 #######################################################################################################################
 
 if __name__ == "__main__":
-    pages = {
-        "Home": HomePage("Home"),
-        "Data gathering": DataGathering("Data gathering"),
-        "Data analysis": DataAnalysis("Data analysis"),
-        "Data preprocessing": DataPreprocessing("Data preprocessing"),
-        "Model training": ModelPage("Model training"),
-        "Results": ResultsPage("Results"),
-        "Contact Me": ContactPage("Contact Me")
-    }
     st.set_page_config(
         page_title="LTSM Forecasting App",
         page_icon="chart_with_upwards_trend",
@@ -70,7 +66,7 @@ if __name__ == "__main__":
             #orientation = "horizontal",
             )
     try:
-        if selected in pages:
-            pages[selected].render()
+        if selected in PAGE_CLASSES:
+            load_page(selected).render()
     except Exception as e:
         st.error(e)
\ No newline at end of file
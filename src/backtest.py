@@ -0,0 +1,233 @@
+"""
+Walk-forward (rolling-origin) backtesting of LSTMForecasting models.
+
+Instead of the single train/validation/test cut of split_dataset_sequentially, the series is
+split into several folds whose test periods follow each other in time. Every fold trains a model on
+the data before its test period and is evaluated on the test period only, which shows how stable
+the forecasting error is over time.
+
+The series is windowed once into a strided view (see construct_lstm_data) and every fold is a set
+of index ranges into that view, so no fold re-windows the data.
+"""
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import MinMaxScaler
+
+from src.create_model import LSTMForecasting
+from src.data_handling import construct_lstm_data, inverse_scale_target
+from src.predictions import compute_metrics
+from src.sweep import DEFAULT_PARAMS, limit_threads
+from src.train_model import train_model
+
+BACKTEST_MODES = ("expanding", "sliding")
+METRIC_COLUMNS = ["rmse", "mae", "mape", "best_val_loss"]
+
+
+def walk_forward_folds(
+        n_sequences: int,
+        n_folds: int = 5,
+        val_size: float = 0.1,
+        test_size: float = 0.1,
+        mode: str = "expanding"
+    ) -> list[tuple[slice, slice, slice]]:
+    """
+    Splits the sequences of a series into walk-forward folds.
+
+    The test periods of the folds are consecutive and end with the last sequence. Each fold validates
+    on the sequences right before its test period and trains on the sequences before those, either
+    from the start of the series ("expanding") or over a window of fixed length ("sliding").
+
+    Args:
+    - n_sequences: The number of sequences of the series, as returned by construct_lstm_data
+    - n_folds: The number of folds
+    - val_size: The fraction of the sequences used for validation in each fold
+    - test_size: The fraction of the sequences tested in each fold
+    - mode: "expanding" or "sliding"
+
+    Returns:
+    - The (train, validation, test) slices of the sequences of each fold, in chronological order
+    """
+    if mode not in BACKTEST_MODES:
+        raise ValueError(f"mode must be one of {', '.join(BACKTEST_MODES)}")
+    if n_folds < 1:
+        raise ValueError("n_folds must be at least 1")
+    n_val = max(1, int(n_sequences * val_size))
+    n_test = max(1, int(n_sequences * test_size))
+    # The training sequences of the first fold, which is also the length of every sliding window
+    n_train = n_sequences - n_folds * n_test - n_val
+    if n_train < 1:
+        raise ValueError("The series is too short for this number of folds and split sizes.")
+
+    folds = []
+    for fold in range(n_folds):
+        val_start = n_train + fold * n_test
+        test_start = val_start + n_val
+        train_start = 0 if mode == "expanding" else fold * n_test
+        folds.append((
+            slice(train_start, val_start),
+            slice(val_start, test_start),
+            slice(test_start, test_start + n_test)
+        ))
+    return folds
+
+
+def _fold_data(series, windows, fold, sequence_size, target_index):
+    train = fold[0]
+    # Fitted on the rows the training sequences are made of, so nothing after them leaks into the scaling
+    scaler = MinMaxScaler(feature_range=(-1, 1)).fit(series[train.start:train.stop + sequence_size])
+    data = []
+    for sequences in fold:
+        # Scaling the views of the fold makes the contiguous copies the model is trained on
+        X = windows[sequences] * scaler.scale_ + scaler.min_
+        y = series[sequences.start + sequence_size:sequences.stop + sequence_size, target_index]
+        y = y * scaler.scale_[target_index] + scaler.min_[target_index]
+        data += [X.astype(np.float32), y.astype(np.float32)]
+    return data, scaler
+
+
+def _run_fold(series, windows, fold, sequence_size, target_index, params, initial_weights=None):
+    params = {**DEFAULT_PARAMS, **params}
+    start_time = time.time()
+    (X_train, y_train, X_val, y_val, X_test, _), scaler = _fold_data(series, windows, fold, sequence_size, target_index)
+    model = LSTMForecasting(
+        input_size=sequence_size,
+        lstm_hidden_size=params["lstm_hidden_size"],
+        lstm_num_layers=params["lstm_num_layers"],
+        linear_num_layers=params["linear_num_layers"],
+        linear_hidden_size=params["linear_hidden_size"],
+        output_size=1
+    )
+    if initial_weights is not None:
+        # Builds the model so that the previous fold's weights can be set
+        model(X_train[:1])
+        model.set_weights(initial_weights)
+    model, history = train_model(
+        model,
+        learning_rate=params["learning_rate"],
+        epochs=params["epochs"],
+        batch_size=params["batch_size"],
+        X_train=X_train,
+        y_train=y_train,
+        X_val=X_val,
+        y_val=y_val
+    )
+
+    test = fold[2]
+    predicted = inverse_scale_target(scaler, model.predict(X_test, verbose=0), target_index)
+    actual = series[test.start + sequence_size:test.stop + sequence_size, target_index]
+    result = {
+        "n_train": len(X_train),
+        "n_val": len(X_val),
+        "n_test": len(X_test),
+        **compute_metrics(actual, predicted),
+        "best_val_loss": float(np.min(history["val_loss"])),
+        "epochs_run": len(history["loss"]),
+        "duration": time.time() - start_time,
+    }
+    return result, model
+
+
+# Per worker state, set once by _init_worker instead of being sent with every fold
+_worker = {}
+
+
+def _init_worker(series, sequence_size, target_index, threads_per_worker):
+    limit_threads(threads_per_worker)
+    # Each worker windows the series once and reuses the view for all of its folds
+    windows, _ = construct_lstm_data(series, sequence_size, copy=False)
+    _worker.update(series=series, windows=windows, sequence_size=sequence_size, target_index=target_index)
+
+
+def _run_fold_in_worker(fold, params):
+    result, _ = _run_fold(
+        _worker["series"], _worker["windows"], fold, _worker["sequence_size"], _worker["target_index"], params
+    )
+    return result
+
+
+def walk_forward_backtest(
+        data: pd.DataFrame | pd.Series | np.ndarray,
+        window_size: int = 8,
+        n_folds: int = 5,
+        val_size: float = 0.1,
+        test_size: float = 0.1,
+        mode: str = "expanding",
+        params: dict = None,
+        warm_start: bool = False,
+        max_workers: int = None,
+        threads_per_worker: int = 1,
+        target_index: int = 0
+    ) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Trains and evaluates one LSTMForecasting model per walk-forward fold.
+
+    Args:
+    - data: The series to backtest, with one column per feature, e.g. data[stock][[feature]] as returned by gather_data
+    - window_size: Time frame to use for prediction
+    - n_folds, val_size, test_size, mode: The folds, see walk_forward_folds
+    - params: The model and training parameters, see sweep.DEFAULT_PARAMS for the keys and defaults
+    - warm_start: Whether each fold starts from the weights trained on the previous fold. The folds
+      then depend on each other and are trained one after the other
+    - max_workers: The number of worker processes training folds in parallel. Defaults to the CPU count
+      divided by threads_per_worker. With 1, the folds are trained in the current process
+    - threads_per_worker: The number of TensorFlow threads of each worker
+    - target_index: Column index of the predicted feature
+
+    Returns:
+    - A DataFrame with one row per fold: its test period, its number of sequences, the error metrics of
+      its test period in the original units and its training statistics. Folds that failed have their
+      error message in the "error" column
+    - A DataFrame with the mean, standard deviation, minimum and maximum of the metrics across folds
+    """
+    index = data.index if isinstance(data, (pd.DataFrame, pd.Series)) else None
+    series = np.asarray(data, dtype=np.float64)
+    if series.ndim == 1:
+        series = series[:, None]
+    windows, _ = construct_lstm_data(series, window_size, copy=False)
+    folds = walk_forward_folds(len(windows), n_folds, val_size, test_size, mode)
+    params = params or {}
+    if max_workers is None:
+        max_workers = max(1, (os.cpu_count() or 1) // threads_per_worker)
+
+    results = {}
+    if warm_start or max_workers == 1:
+        weights = None
+        for i, fold in enumerate(folds):
+            try:
+                results[i], model = _run_fold(series, windows, fold, window_size, target_index, params, weights)
+                weights = model.get_weights() if warm_start else None
+            except Exception as e:
+                results[i] = {"error": str(e)}
+    else:
+        # TensorFlow is not fork-safe, so workers are started from a fresh interpreter
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(
+            max_workers=min(max_workers, len(folds)),
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(series, window_size, target_index, threads_per_worker)
+        ) as executor:
+            futures = {executor.submit(_run_fold_in_worker, fold, params): i for i, fold in enumerate(folds)}
+            for future in as_completed(futures):
+                try:
+                    results[futures[future]] = future.result()
+                except Exception as e:
+                    results[futures[future]] = {"error": str(e)}
+
+    rows = []
+    for i, (_, _, test) in enumerate(folds):
+        row = {"fold": i}
+        if index is not None:
+            # Sequence i predicts row i + window_size
+            row.update(test_start=index[test.start + window_size], test_end=index[test.stop - 1 + window_size])
+        row.update(results[i])
+        row.setdefault("error", None)
+        rows.append(row)
+    fold_results = pd.DataFrame(rows).set_index("fold")
+    summary = fold_results.reindex(columns=METRIC_COLUMNS).agg(["mean", "std", "min", "max"])
+    return fold_results, summary
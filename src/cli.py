@@ -0,0 +1,183 @@
+"""
+Headless runner of the forecasting pipeline, for scheduled retrains outside Streamlit:
+
+    python -m src.cli --tickers AAPL NVDA --period 2y --epochs 50 --output-dir ./runs/nightly
+
+Each run gathers the data, splits, preprocesses, trains and predicts, then writes the model, the
+training history, the forecasts and the error metrics of every ticker to the output directory.
+"""
+import argparse
+import json
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.create_model import LSTMForecasting
+from src.data_handling import gather_data_concurrently, preprocess_data, split_datasets_sequentially
+from src.data_store import OHLCVStore
+from src.features import compute_features, parse_feature_set
+from src.numpy_inference import export_weights
+from src.predictions import compute_metrics, predict
+from src.profiling import TrainingProfiler
+from src.quantization import QUANTIZATION_MODES, export_tflite, quantization_report
+from src.train_model import train_model
+
+logger = logging.getLogger(__name__)
+
+SPLIT_NAMES = ("Train", "Validation", "Test")
+
+
+def _train_and_predict(splits, args, output_dir, progress_callback):
+    X_train, y_train, X_val, y_val, X_test, y_test, scalers = preprocess_data(*splits, seq_size=args.window_size, target_index=0)
+    model = LSTMForecasting(
+        input_size=args.window_size,
+        lstm_hidden_size=args.lstm_neurons,
+        lstm_num_layers=args.lstm_layers,
+        linear_num_layers=args.hidden_layers,
+        linear_hidden_size=args.hidden_neurons,
+        output_size=1
+    )
+    os.makedirs(output_dir, exist_ok=True)
+    profiler = None
+    if args.profile or args.trace_epochs:
+        profiler = TrainingProfiler(trace_dir=os.path.join(output_dir, "trace"), trace_epochs=args.trace_epochs)
+    model, history = train_model(
+        model,
+        learning_rate=args.learning_rate,
+        epochs=args.epochs,
+        batch_size=args.batch_size,
+        X_train=X_train,
+        y_train=y_train,
+        X_val=X_val,
+        y_val=y_val,
+        model_path=os.path.join(output_dir, "model.keras"),
+        progress_callback=progress_callback,
+        early_stopping_patience=args.early_stopping_patience,
+        reduce_lr_patience=args.reduce_lr_patience,
+        time_budget=args.time_budget,
+        profiler=profiler
+    )
+    if profiler is not None:
+        profiler.to_json(os.path.join(output_dir, "profile.json"))
+        profiler.to_csv(os.path.join(output_dir, "profile"))
+    pd.DataFrame(history).set_index("epoch").to_csv(os.path.join(output_dir, "history.csv"))
+    # TensorFlow-free copy of the weights for serving, see NumpyLSTMForecasting
+    export_weights(model, os.path.join(output_dir, "model.npz"))
+    if args.tflite:
+        X_test_all = np.concatenate(list(X_test.values()))
+        y_test_all = np.concatenate(list(y_test.values()))
+        export_tflite(model, os.path.join(output_dir, "model.tflite"), n_features=X_test_all.shape[-1], quantization=args.tflite)
+        # Errors are compared in scaled units, since every ticker has its own scaler
+        report = quantization_report(model, X_test_all, y_test_all, modes=(args.tflite,))
+        report.to_csv(os.path.join(output_dir, "quantization.csv"))
+    return predict(model, X_train, X_val, X_test, y_train, y_val, y_test, scalers)
+
+
+def run_pipeline(args: argparse.Namespace, downloader=None, progress_callback=None) -> dict:
+    """
+    Runs the whole pipeline for the tickers in args and writes its outputs to args.output_dir.
+
+    Args:
+    - args: The parsed command line arguments, see parse_args
+    - downloader: Optional downloader passed to gather_data_concurrently
+    - progress_callback: Optional training progress callback passed to train_model
+
+    Returns:
+    - The metrics per ticker and split, along with the tickers that could not be downloaded
+    """
+    store = OHLCVStore(args.store) if args.store else None
+    data, failures = gather_data_concurrently(args.tickers, args.period, downloader=downloader, store=store)
+    for stock, error in failures.items():
+        logger.error(f"Skipping {stock}: {error}")
+    if not data:
+        raise ValueError("No data could be downloaded for any ticker.")
+
+    # The feature to predict comes first, followed by the input indicators if any
+    columns = args.feature
+    if args.features:
+        feature_set = parse_feature_set(args.features)
+        data = {stock: compute_features(df, feature_set, args.feature) for stock, df in data.items()}
+        columns = list(next(iter(data.values())).columns)
+
+    train_size, val_size, test_size = args.split_sizes
+    splits = split_datasets_sequentially(data, columns, train_size, val_size, test_size)
+
+    # One global model over every ticker, or one model per ticker
+    if args.global_model:
+        groups = {"global": list(data)}
+    else:
+        groups = {stock: [stock] for stock in data}
+
+    forecasts = []
+    metrics = {}
+    for group, stocks in groups.items():
+        logger.info(f"Training {group} model on {', '.join(stocks)}")
+        group_splits = tuple({stock: split[stock] for stock in stocks} for split in splits)
+        predictions = _train_and_predict(group_splits, args, os.path.join(args.output_dir, group), progress_callback)
+
+        for stock in stocks:
+            metrics[stock] = {}
+            for name, split, prediction in zip(SPLIT_NAMES, group_splits, predictions):
+                # Each prediction targets the bar that follows its input sequence
+                actual = split[stock].iloc[args.window_size:, 0]
+                metrics[stock][name] = compute_metrics(actual.to_numpy(), prediction[stock])
+                forecasts.append(pd.DataFrame({
+                    "ticker": stock,
+                    "split": name,
+                    "actual": actual.to_numpy(),
+                    "predicted": prediction[stock],
+                }, index=actual.index))
+
+    pd.concat(forecasts).rename_axis("date").to_csv(os.path.join(args.output_dir, "forecasts.csv"))
+    results = {"metrics": metrics, "failures": failures}
+    with open(os.path.join(args.output_dir, "metrics.json"), "w") as f:
+        json.dump(results, f, indent=2)
+    return results
+
+
+def parse_args(argv: list[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Train LSTM forecasting models without the Streamlit app.")
+    parser.add_argument("--tickers", nargs="+", required=True, help="Stock symbols to train on")
+    parser.add_argument("--period", default="1y", help="History to download, in the format accepted by yfinance")
+    parser.add_argument("--feature", default="Close", help="Column to predict")
+    parser.add_argument("--features", nargs="*", default=[], metavar="INDICATOR[:WINDOW]",
+                        help="Input indicators added to the feature, e.g. log_return rsi:14, see src.features.INDICATORS")
+    parser.add_argument("--window-size", type=int, default=8, help="Time frame to use for prediction")
+    parser.add_argument("--split-sizes", type=float, nargs=3, default=(0.7, 0.1, 0.2), metavar=("TRAIN", "VAL", "TEST"))
+    parser.add_argument("--lstm-layers", type=int, default=2)
+    parser.add_argument("--lstm-neurons", type=int, default=50)
+    parser.add_argument("--hidden-layers", type=int, default=2)
+    parser.add_argument("--hidden-neurons", type=int, default=10)
+    parser.add_argument("--epochs", type=int, default=150)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--learning-rate", type=float, default=0.001)
+    parser.add_argument("--early-stopping-patience", type=int, default=None,
+                        help="Stop after this many epochs without validation loss improvement")
+    parser.add_argument("--reduce-lr-patience", type=int, default=None,
+                        help="Halve the learning rate after this many epochs without validation loss improvement")
+    parser.add_argument("--time-budget", type=float, default=None, help="Training time limit per model, in seconds")
+    parser.add_argument("--profile", action="store_true",
+                        help="Record the training timings to profile.json and profile/*.csv in the output directory")
+    parser.add_argument("--trace-epochs", type=int, nargs=2, default=None, metavar=("FIRST", "LAST"),
+                        help="Capture a TensorFlow profiler trace of these epochs, counted from 1, in trace/")
+    parser.add_argument("--global-model", action="store_true", help="Fit a single model over all tickers")
+    parser.add_argument("--tflite", choices=QUANTIZATION_MODES, default=None,
+                        help="Also export a TFLite model with this quantization, along with its accuracy report")
+    parser.add_argument("--store", default=None, help="Directory of the on-disk OHLCV store, disabled by default")
+    parser.add_argument("--output-dir", default="./runs/", help="Where the models, forecasts and metrics are written")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] = None) -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    args = parse_args(argv)
+    results = run_pipeline(args)
+    logger.info(f"Wrote results to {args.output_dir}")
+    if results["failures"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,9 @@
 import tensorflow as tf
+import keras
 from keras import layers
 
+# Registered so that keras.models.load_model can rebuild the model from a saved file
+@keras.saving.register_keras_serializable()
 class LSTMForecasting(tf.keras.Model):
     def __init__(self, input_size, lstm_hidden_size, linear_hidden_size, 
                  lstm_num_layers, linear_num_layers, output_size, **kwargs):
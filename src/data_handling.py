@@ -1,21 +1,141 @@
 import pandas as pd
 import yfinance as yf
 import numpy as np
-from sklearn.preprocessing import MinMaxScaler
+from numpy.lib.stride_tricks import sliding_window_view
 import asyncio
+from functools import partial
 from pytickersymbols import PyTickerSymbols
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    # scikit-learn is slow to import and only needed for preprocessing, see scale_data
+    from sklearn.preprocessing import MinMaxScaler
 
 
 async def fetch_data():
     return PyTickerSymbols().get_all_stocks()
 
-async def download_data(stock,period):
-    return yf.download(stock, period=period)
+def yf_download(stock: str, period: str, start=None) -> pd.DataFrame:
+    """
+    Blocking single-ticker download from Yahoo Finance. This is the default
+    downloader used by gather_data; any callable with the same signature can
+    be passed instead (e.g. an offline stub in tests). When start is given
+    the bars from start on are downloaded and period is ignored.
+    """
+    # Single level columns ("Close" rather than ("Close", stock)), so features can be selected by name
+    if start is not None:
+        return yf.download(stock, start=start, progress=False, threads=False, multi_level_index=False)
+    return yf.download(stock, period=period, progress=False, threads=False, multi_level_index=False)
+
+async def download_data(stock, period, downloader=yf_download):
+    # The downloader is blocking, so run it in the default thread pool to let
+    # several tickers download at the same time.
+    return await asyncio.to_thread(downloader, stock, period)
+
+async def _download_with_retry(stock, period, downloader, semaphore, retries, backoff):
+    async with semaphore:
+        for attempt in range(retries + 1):
+            try:
+                stock_data = await download_data(stock, period, downloader)
+                # yfinance reports most failures as an empty frame rather than an exception
+                if stock_data is None or stock_data.empty:
+                    raise ValueError(f"No data found for stock symbol: {stock}")
+                return stock_data
+            except Exception:
+                if attempt == retries:
+                    raise
+                await asyncio.sleep(backoff * 2 ** attempt)
 
+async def _download_all(stocks, period, downloader, max_concurrency, retries, backoff):
+    semaphore = asyncio.Semaphore(max_concurrency)
+    results = await asyncio.gather(
+        *(_download_with_retry(stock, period, downloader, semaphore, retries, backoff) for stock in stocks),
+        return_exceptions=True
+    )
+    data, failures = {}, {}
+    for stock, result in zip(stocks, results):
+        if isinstance(result, Exception):
+            failures[stock] = str(result)
+        else:
+            data[stock] = result
+    return data, failures
+
+def _validate_gather_args(stocks, period):
+    if stocks is None:
+        stocks = ["AAPL"]
+    if period is None:
+        period = "1y"
+
+    if not isinstance(stocks, list):
+        raise TypeError("Stocks must be a list of strings.")
+    if not isinstance(period, str):
+        raise TypeError("Period must be a string.")
+
+    # Drop duplicated symbols while keeping the requested order
+    return list(dict.fromkeys(stocks)), period.strip()
+
+def _prepare_stock_data(df: pd.DataFrame) -> pd.DataFrame:
+    if not isinstance(df.index, pd.DatetimeIndex):
+        df.index = pd.to_datetime(df.index)
+    df['change_percent'] = df['Close'].pct_change() * 100
+    return df
+
+def gather_data_concurrently(
+    stocks: list[str] = ["AAPL","TSLA", "NVDA", "AMZN", "GOOGL"],
+    period: str = "1y",
+    max_concurrency: int = 8,
+    retries: int = 2,
+    backoff: float = 0.5,
+    downloader=None,
+    store=None
+    ) -> tuple[dict[str,pd.DataFrame], dict[str,str]]:
+    """
+    Downloads the stock data for the given stocks concurrently, tolerating
+    failures of individual symbols.
+
+    Args:
+        stocks (List[str]): List of stock symbols.
+        period (str): The period for which to download the data, in the
+            format accepted by yfinance.
+        max_concurrency (int): Maximum number of downloads running at the
+            same time.
+        retries (int): Number of extra attempts per symbol after a failed
+            download.
+        backoff (float): Delay in seconds before the first retry. It doubles
+            on every following retry.
+        downloader (Callable[[str, str], pd.DataFrame]): Blocking function
+            downloading a single symbol. Defaults to yf_download.
+        store (OHLCVStore): Optional on-disk store. When given, only the
+            bars missing from the store are downloaded, and the downloader
+            must also accept a start keyword (see OHLCVStore.refresh).
+
+    Returns:
+        tuple: (data, failures) where data maps each downloaded stock to its
+        DataFrame and failures maps each failed stock to its error message.
+    """
+    stocks, period = _validate_gather_args(stocks, period)
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1.")
+    if retries < 0:
+        raise ValueError("retries must be non-negative.")
+    if downloader is None:
+        downloader = yf_download
+    if store is not None:
+        downloader = partial(store.refresh, downloader=downloader)
+
+    data, failures = asyncio.run(_download_all(stocks, period, downloader, max_concurrency, retries, backoff))
+    for df in data.values():
+        _prepare_stock_data(df)
+    return data, failures
 
 def gather_data(
     stocks: list[str] = ["AAPL","TSLA", "NVDA", "AMZN", "GOOGL"],
-    period: str = "1y"
+    period: str = "1y",
+    max_concurrency: int = 8,
+    retries: int = 2,
+    backoff: float = 0.5,
+    downloader=None,
+    store=None
     ) -> dict[str,pd.DataFrame]:
     """
     Downloads the stock data for given stocks and period. The data is
@@ -27,41 +147,27 @@ def gather_data(
         period (str): The period for which to download the data. This
             should be a string in the format accepted by yfinance.
             Default is "2y".
+        max_concurrency, retries, backoff, downloader, store: See
+            gather_data_concurrently.
 
     Returns:
         dict[ str,pd.DataFrame]: a dictionary with the stock name as key and its corresponding downloaded data as value.
-    """
-    if stocks is None:
-        stocks = ["AAPL"]
-    if period is None:
-        period = "1y"
 
-    if not isinstance(stocks, list):
-        raise TypeError("Stocks must be a list of strings.")
-    if not isinstance(period, str):
-        raise TypeError("Period must be a string.")
-
-    period = period.strip()
-
-    try:
-        data = {}
-        for stock in stocks:
-            stock_data = asyncio.run(download_data(stock, period))
-            if stock_data.empty:
-                raise ValueError(f"No data found for stock symbol: {stock}")
-            data[stock] = stock_data
-    except Exception as e:
-        raise ValueError(f"Error downloading data: {e}")
-
-    for stock, df in data.items():
-        if not isinstance(df.index, pd.DatetimeIndex):
-            df.index = pd.to_datetime(df.index)
-        df['change_percent'] = df['Close'].pct_change() * 100
+    Raises:
+        ValueError: If any of the stocks could not be downloaded. Use
+            gather_data_concurrently to keep the successful downloads instead.
+    """
+    data, failures = gather_data_concurrently(stocks, period, max_concurrency, retries, backoff, downloader, store)
+    if failures:
+        raise ValueError("Error downloading data: " + "; ".join(failures.values()))
     return data
 
 def split_dataset_sequentially(data: dict[str,pd.DataFrame], target: list[str,str], train_size: float = 0.7, val_size: float = 0.1, test_size: float = 0.2) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
     """
     Splits the dataset sequentially into training, validation, and test subsets.
+
+    target is [stock, column], where column can also be a list of columns to split a multivariate
+    dataset, e.g. the features returned by compute_features.
     """
     assert isinstance(data, dict), "Expected 'data' to be a dictionary"
     assert train_size + val_size + test_size == 1.0, "Sizes must sum up to 1.0"
@@ -80,13 +186,40 @@ def split_dataset_sequentially(data: dict[str,pd.DataFrame], target: list[str,st
         val_end += 1
     
     # Ensure test set gets the remainder
-    train_data = data.iloc[:train_end].to_frame()
-    val_data = data.iloc[train_end:val_end].to_frame()
-    test_data = data.iloc[val_end:].to_frame()
+    if isinstance(data, pd.Series):
+        data = data.to_frame()
+    train_data = data.iloc[:train_end]
+    val_data = data.iloc[train_end:val_end]
+    test_data = data.iloc[val_end:]
 
     return train_data, val_data, test_data
 
-def construct_lstm_data(data: np.ndarray, sequence_size: int = 8) -> tuple[np.ndarray, np.ndarray]:
+def split_datasets_sequentially(data: dict[str,pd.DataFrame], feature: str | list[str], train_size: float = 0.7, val_size: float = 0.1, test_size: float = 0.2) -> tuple[dict[str,pd.DataFrame], dict[str,pd.DataFrame], dict[str,pd.DataFrame]]:
+    """
+    Splits the same feature, or list of features, of every stock in data sequentially, see split_dataset_sequentially.
+
+    Returns:
+        tuple: (train, val, test) dictionaries with the stock name as key.
+    """
+    splits = {stock: split_dataset_sequentially(data, [stock, feature], train_size, val_size, test_size) for stock in data}
+    return tuple({stock: split[i] for stock, split in splits.items()} for i in range(3))
+
+def concatenate_windows(X: dict[str,np.ndarray], y: dict[str,np.ndarray]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Merges the sequences of several stocks into one training set, one stock after another. The
+    sequences are not ordered by date, model.fit shuffles them so that each batch mixes stocks.
+
+    Args:
+        X (dict[str,np.ndarray]): LSTM input sequences per stock.
+        y (dict[str,np.ndarray]): Target values per stock, in the same order as X.
+
+    Returns:
+        tuple: The concatenated (X, y) arrays.
+    """
+    stocks = list(X)
+    return np.concatenate([X[stock] for stock in stocks]), np.concatenate([y[stock] for stock in stocks])
+
+def construct_lstm_data(data: np.ndarray, sequence_size: int = 8, copy: bool = True, target_index: int = None) -> tuple[np.ndarray, np.ndarray]:
     """
     Construct input data (X) and target data (y) for LSTM model from a numpy array.
 
@@ -98,6 +231,14 @@ def construct_lstm_data(data: np.ndarray, sequence_size: int = 8) -> tuple[np.nd
     sequence_size : int, default=8
         Number of previous time steps to use as input features for predicting the next time step.
 
+    copy : bool, default=True
+        If False, data_X is returned as a read-only strided view over data instead of a new array,
+        so no memory is allocated for the sequences. The view must not outlive data.
+
+    target_index : int, default=None
+        Column of data to use as target. If None, every column is a target, which only makes sense
+        for univariate data.
+
     Returns:
     --------
     data_X : numpy.ndarray
@@ -116,33 +257,32 @@ def construct_lstm_data(data: np.ndarray, sequence_size: int = 8) -> tuple[np.nd
     if sequence_size <= 0 or sequence_size >= n_samples:
         raise ValueError("sequence_size must be positive and less than the number of samples in data.")
 
-    data_X = []
-    data_y = []
-
-    # Constructing the sequences for LSTM input
-    for i in range(n_samples - sequence_size):
-        data_X.append(data[i:i + sequence_size])
-        data_y.append(data[i + sequence_size])
+    # Constructing the sequences for LSTM input. sliding_window_view puts the window axis last,
+    # so it is moved right after the sample axis. The last window has no target and is dropped.
+    data_X = np.moveaxis(sliding_window_view(data, sequence_size, axis=0), -1, 1)[:-1]
+    data_y = data[sequence_size:] if target_index is None else data[sequence_size:, target_index]
 
-    return np.array(data_X), np.squeeze(np.array(data_y))  # Sq
+    if copy:
+        return np.array(data_X), np.squeeze(np.array(data_y))
+    data_y = np.squeeze(data_y)
+    data_y.flags.writeable = False
+    return data_X, data_y
 
-def preprocess_data(
+def scale_data(
     train_data: pd.DataFrame, 
     val_data: pd.DataFrame, 
-    test_data: pd.DataFrame, 
-    seq_size: int
-) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    test_data: pd.DataFrame
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, "MinMaxScaler"]:
     """
-    Preprocesses the data for LSTM by normalizing and splitting into sequences.
+    Normalizes the data splits to the (-1, 1) range, fitting the scaler on the training data only.
 
     Args:
         train_data (pd.DataFrame): The training data.
         val_data (pd.DataFrame): The validation data.
         test_data (pd.DataFrame): The testing data.
-        seq_size (int): The sequence size for LSTM.
 
     Returns:
-        tuple: Processed (X_train, y_train, X_val, y_val, X_test, y_test).
+        tuple: The scaled (train, val, test) arrays and the fitted scaler.
     """
     # Ensure no missing or infinite values
     if train_data.isnull().values.any() or val_data.isnull().values.any() or test_data.isnull().values.any():
@@ -151,14 +291,70 @@ def preprocess_data(
         raise ValueError("Input data contains infinite values.")
     
     # Normalize the data
+    from sklearn.preprocessing import MinMaxScaler
     scaler = MinMaxScaler(feature_range=(-1, 1))
-    train_data_scaled = pd.DataFrame(scaler.fit_transform(train_data), columns=train_data.columns, index=train_data.index)
-    val_data_scaled = pd.DataFrame(scaler.transform(val_data), columns=val_data.columns, index=val_data.index)
-    test_data_scaled = pd.DataFrame(scaler.transform(test_data), columns=test_data.columns, index=test_data.index)
+    train_data_scaled = scaler.fit_transform(train_data)
+    val_data_scaled = scaler.transform(val_data)
+    test_data_scaled = scaler.transform(test_data)
+
+    return train_data_scaled, val_data_scaled, test_data_scaled, scaler
+
+def inverse_scale_target(scaler: "MinMaxScaler", values: np.ndarray, target_index: int = 0) -> np.ndarray:
+    """
+    Inverts the scaling of a single feature, without padding the values to the scaler's full width
+    as scaler.inverse_transform requires.
+
+    Args:
+        scaler (MinMaxScaler): The fitted scaler returned by scale_data or preprocess_data.
+        values (np.ndarray): Scaled values of the target feature, of any shape.
+        target_index (int): Column index of the target feature in the data the scaler was fitted on.
+
+    Returns:
+        np.ndarray: The values in the original units, flattened to 1-D.
+    """
+    if not hasattr(scaler, "scale_"):
+        raise ValueError("The scaler must be fitted before inverting the scaling.")
+    if not -len(scaler.scale_) <= target_index < len(scaler.scale_):
+        raise IndexError(f"target_index {target_index} is out of range for a scaler fitted on {len(scaler.scale_)} features.")
+    return (np.ravel(values) - scaler.min_[target_index]) / scaler.scale_[target_index]
+
+def preprocess_data(
+    train_data: pd.DataFrame | dict[str,pd.DataFrame], 
+    val_data: pd.DataFrame | dict[str,pd.DataFrame], 
+    test_data: pd.DataFrame | dict[str,pd.DataFrame], 
+    seq_size: int,
+    target_index: int = None
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Preprocesses the data for LSTM by normalizing and splitting into sequences.
+
+    Args:
+        train_data (pd.DataFrame): The training data.
+        val_data (pd.DataFrame): The validation data.
+        test_data (pd.DataFrame): The testing data.
+        seq_size (int): The sequence size for LSTM.
+        target_index (int): Column to use as target when the data has several features, see
+            construct_lstm_data.
+
+    Returns:
+        tuple: Processed (X_train, y_train, X_val, y_val, X_test, y_test, scaler).
+
+    Several stocks can be preprocessed at once by passing dictionaries with the stock name as key
+    (see split_datasets_sequentially). Every stock is then scaled with its own scaler and each
+    returned value is a dictionary with the stock name as key.
+    """
+    if isinstance(train_data, dict):
+        results = {
+            stock: preprocess_data(train_data[stock], val_data[stock], test_data[stock], seq_size, target_index)
+            for stock in train_data
+        }
+        return tuple({stock: result[i] for stock, result in results.items()} for i in range(7))
+
+    train_data_scaled, val_data_scaled, test_data_scaled, scaler = scale_data(train_data, val_data, test_data)
 
     # Split data into sequences
-    X_train, y_train = construct_lstm_data(train_data_scaled.to_numpy(), seq_size)
-    X_val, y_val = construct_lstm_data(val_data_scaled.to_numpy(), seq_size)
-    X_test, y_test = construct_lstm_data(test_data_scaled.to_numpy(), seq_size)
+    X_train, y_train = construct_lstm_data(train_data_scaled, seq_size, target_index=target_index)
+    X_val, y_val = construct_lstm_data(val_data_scaled, seq_size, target_index=target_index)
+    X_test, y_test = construct_lstm_data(test_data_scaled, seq_size, target_index=target_index)
 
-    return X_train, y_train, X_val, y_val, X_test, y_test, scaler
\ No newline at end of file
+    return X_train, y_train, X_val, y_val, X_test, y_test, scaler
@@ -0,0 +1,185 @@
+import json
+import os
+import threading
+
+import pandas as pd
+
+DEFAULT_STORE_PATH = "./data/"
+
+# Offsets for the yfinance period strings that map to a fixed look-back window
+PERIOD_OFFSETS = {
+    "1d": pd.DateOffset(days=1),
+    "5d": pd.DateOffset(days=5),
+    "1mo": pd.DateOffset(months=1),
+    "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6),
+    "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2),
+    "5y": pd.DateOffset(years=5),
+    "10y": pd.DateOffset(years=10),
+}
+
+# Stored history may start a few days after the requested start because of weekends and holidays
+COVERAGE_TOLERANCE = pd.Timedelta(days=7)
+
+
+def period_start(period: str, now: pd.Timestamp) -> pd.Timestamp | None:
+    """
+    Returns the first timestamp covered by a yfinance period string, or None
+    for "max" (the whole available history).
+
+    Raises:
+        ValueError: If the period is not a known yfinance period.
+    """
+    if period == "max":
+        return None
+    if period == "ytd":
+        return now.normalize().replace(month=1, day=1)
+    if period not in PERIOD_OFFSETS:
+        raise ValueError(f"Unsupported period for the data store: {period}")
+    return now.normalize() - PERIOD_OFFSETS[period]
+
+
+# Locks of the manifests, shared by the stores on the same directory, since every Streamlit
+# session builds its own store
+_manifest_locks = {}
+_manifest_locks_lock = threading.Lock()
+
+
+def _manifest_lock(root: str) -> threading.Lock:
+    with _manifest_locks_lock:
+        return _manifest_locks.setdefault(os.path.realpath(root), threading.Lock())
+
+
+class OHLCVStore:
+    """
+    Local Parquet store of downloaded OHLCV bars, with one file per ticker.
+
+    Each ticker is written in full the first time it is requested. Later
+    requests only download the bars from the last stored timestamp on and
+    merge them into the stored history.
+    """
+    def __init__(self, root: str = DEFAULT_STORE_PATH):
+        self.root = root
+        self._manifest_path = os.path.join(root, "manifest.json")
+        self._lock = _manifest_lock(root)
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, stock: str) -> str:
+        return os.path.join(self.root, f"{stock}.parquet")
+
+    def _read_manifest(self) -> dict:
+        if not os.path.exists(self._manifest_path):
+            return {}
+        with open(self._manifest_path) as f:
+            return json.load(f)
+
+    def _dump_manifest(self, manifest: dict, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump(manifest, f)
+
+    def _write_atomic(self, path: str, write) -> None:
+        # Write to a temporary file first so readers never see a partial file
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        write(tmp_path)
+        os.replace(tmp_path, path)
+
+    def load(self, stock: str) -> pd.DataFrame | None:
+        """
+        Returns the stored bars of a ticker, or None if it is not stored.
+        """
+        path = self._path(stock)
+        if not os.path.exists(path):
+            return None
+        return pd.read_parquet(path)
+
+    def last_timestamp(self, stock: str) -> pd.Timestamp | None:
+        """
+        Returns the timestamp of the most recent stored bar of a ticker.
+        """
+        df = self.load(stock)
+        if df is None or df.empty:
+            return None
+        return df.index[-1]
+
+    def write(self, stock: str, df: pd.DataFrame, period: str | None = None) -> None:
+        """
+        Replaces the stored bars of a ticker.
+
+        Args:
+            stock (str): The ticker symbol.
+            df (pd.DataFrame): The bars to store, indexed by timestamp.
+            period (str): The period the bars were downloaded for. Only
+                "max" is recorded, since any other period can be checked
+                against the first stored timestamp.
+        """
+        self._write_atomic(self._path(stock), df.to_parquet)
+        with self._lock:
+            manifest = self._read_manifest()
+            manifest[stock] = {"max": period == "max"}
+            self._write_atomic(self._manifest_path, lambda path: self._dump_manifest(manifest, path))
+
+    def append(self, stock: str, new_bars: pd.DataFrame) -> pd.DataFrame:
+        """
+        Merges newly downloaded bars into the stored history of a ticker.
+        Bars with an already stored timestamp replace the stored ones, since
+        the last bar of a trading day may have been stored before the close.
+
+        Returns:
+            pd.DataFrame: The full merged history.
+        """
+        return self._merge(stock, self.load(stock), new_bars)
+
+    def _merge(self, stock, stored, new_bars):
+        if new_bars is None or new_bars.empty:
+            return stored
+        merged = pd.concat([stored, new_bars]) if stored is not None else new_bars
+        merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+        self._write_atomic(self._path(stock), merged.to_parquet)
+        return merged
+
+    def covers(self, stock: str, period: str) -> bool:
+        """
+        Checks whether the stored history of a ticker reaches back to the
+        start of the requested period.
+        """
+        return self._covers(stock, self.load(stock), period)
+
+    def _covers(self, stock, stored, period):
+        if stored is None or stored.empty:
+            return False
+        start = period_start(period, pd.Timestamp.now(tz=stored.index.tz))
+        if start is None:
+            return self._read_manifest().get(stock, {}).get("max", False)
+        return stored.index[0] <= start + COVERAGE_TOLERANCE
+
+    def refresh(self, stock: str, period: str, downloader) -> pd.DataFrame:
+        """
+        Returns the bars of a ticker for the requested period, downloading
+        only what is missing from the store.
+
+        Args:
+            stock (str): The ticker symbol.
+            period (str): The period in the format accepted by yfinance.
+            downloader (Callable): Blocking downloader called as
+                downloader(stock, period) for a full download and as
+                downloader(stock, period, start=timestamp) for an
+                incremental one.
+
+        Returns:
+            pd.DataFrame: The bars within the requested period.
+        """
+        stored = self.load(stock)
+        if self._covers(stock, stored, period):
+            new_bars = downloader(stock, period, start=stored.index[-1])
+            stock_data = self._merge(stock, stored, new_bars)
+        else:
+            stock_data = downloader(stock, period)
+            if stock_data is None or stock_data.empty:
+                return stock_data
+            self.write(stock, stock_data, period)
+
+        start = period_start(period, pd.Timestamp.now(tz=stock_data.index.tz))
+        if start is not None:
+            stock_data = stock_data[stock_data.index >= start]
+        return stock_data.copy()
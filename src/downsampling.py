@@ -0,0 +1,171 @@
+"""
+Server-side downsampling of the series plotted with Plotly.
+
+A chart cannot show more points than it has pixels, so long series are reduced to a budget of
+points per trace before the figure is built, which bounds the size of the figure sent to the
+browser and its render time whatever the length of the history.
+"""
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+# Points kept per trace, about the width in pixels of a wide chart
+DEFAULT_MAX_POINTS = 2000
+# Traces with more points than this are drawn with WebGL
+WEBGL_THRESHOLD = 1000
+
+
+def _as_numeric(x) -> np.ndarray:
+    x = pd.Index(x)
+    if isinstance(x, pd.DatetimeIndex):
+        # Nanoseconds since the epoch, timezones included
+        return x.as_unit("ns").asi8.astype(float)
+    return np.asarray(x, dtype=float)
+
+
+def lttb(x, y, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets downsampling. The points are split into n_out - 2 buckets and,
+    in each bucket, the point forming the largest triangle with the point kept in the previous
+    bucket and the average of the next bucket is kept, along with the first and last points.
+
+    Args:
+    - x: The x values, numbers or datetimes, in increasing order
+    - y: The y values, without NaNs
+    - n_out: The number of points to keep
+
+    Returns:
+    - The sorted indices of the points to keep
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = _as_numeric(x)
+    y = np.asarray(y, dtype=float)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    # Averages of every bucket, from cumulative sums, followed by the last point for the last bucket
+    x_sums = np.concatenate([[0], np.cumsum(x)])
+    y_sums = np.concatenate([[0], np.cumsum(y)])
+    sizes = np.diff(edges)
+    x_means = np.append((x_sums[edges[1:]] - x_sums[edges[:-1]]) / sizes, x[-1])
+    y_means = np.append((y_sums[edges[1:]] - y_sums[edges[:-1]]) / sizes, y[-1])
+
+    selected = np.empty(n_out, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        # Twice the area of the triangles, the factor does not change the argmax
+        areas = np.abs(
+            (x[a] - x_means[i + 1]) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (y_means[i + 1] - y[a])
+        )
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax(y, n_out: int) -> np.ndarray:
+    """
+    Min-max bucketing: the points are split into n_out / 2 buckets and the lowest and highest
+    points of each bucket are kept, so every spike of the series stays visible.
+
+    Args:
+    - y: The y values, without NaNs
+    - n_out: The number of points to keep
+
+    Returns:
+    - The sorted indices of the points to keep
+    """
+    n = len(y)
+    n_buckets = n_out // 2
+    if n_out >= n or n_buckets < 1:
+        return np.arange(n)
+    buckets = np.arange(n) * n_buckets // n
+    # Sorting by bucket then value puts the min of each bucket first and its max last
+    order = np.lexsort((np.asarray(y), buckets))
+    starts = np.searchsorted(buckets[order], np.arange(n_buckets))
+    ends = np.append(starts[1:], n) - 1
+    return np.unique(np.concatenate([order[starts], order[ends]]))
+
+
+DOWNSAMPLING_METHODS = {"lttb": lttb, "minmax": lambda x, y, n_out: minmax(y, n_out)}
+
+
+def downsample(x, y, max_points: int = DEFAULT_MAX_POINTS, method: str = "lttb") -> tuple[pd.Index, np.ndarray]:
+    """
+    Reduces a series to at most max_points points. NaNs are dropped first.
+
+    Args:
+    - x, y: The series to downsample
+    - max_points: The number of points to keep. If None, the series is kept whole
+    - method: "lttb" to keep the shape of the series or "minmax" to keep its extremes
+
+    Returns:
+    - The downsampled x values, as a pandas Index, and y values
+    """
+    if method not in DOWNSAMPLING_METHODS:
+        raise ValueError(f"method must be one of {', '.join(DOWNSAMPLING_METHODS)}")
+    x = pd.Index(x)
+    y = np.asarray(y, dtype=float)
+    if max_points is None or len(y) <= max_points:
+        return x, y
+    valid = ~np.isnan(y)
+    x, y = x[valid], y[valid]
+    indices = DOWNSAMPLING_METHODS[method](x, y, max_points)
+    return x[indices], y[indices]
+
+
+def line_trace(x, y, max_points: int = DEFAULT_MAX_POINTS, method: str = "lttb", **kwargs) -> go.Scatter | go.Scattergl:
+    """
+    Builds a line trace of the downsampled series, drawn with WebGL when it keeps more than
+    WEBGL_THRESHOLD points. The other arguments are passed to the trace.
+    """
+    x, y = downsample(x, y, max_points, method)
+    trace = go.Scattergl if len(y) > WEBGL_THRESHOLD else go.Scatter
+    return trace(x=x, y=y, **kwargs)
+
+
+def histogram_trace(values, nbins: int, max_points: int = DEFAULT_MAX_POINTS, **kwargs) -> go.Histogram:
+    """
+    Builds a histogram trace. Beyond max_points values, the counts are computed here and only the
+    bins are sent, instead of every value.
+    """
+    values = np.asarray(values, dtype=float)
+    if max_points is None or len(values) <= max_points:
+        return go.Histogram(x=values, nbinsx=nbins, **kwargs)
+    counts, edges = np.histogram(values[~np.isnan(values)], bins=nbins)
+    return go.Histogram(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=counts,
+        histfunc="sum",
+        xbins=dict(start=edges[0], end=edges[-1], size=edges[1] - edges[0]),
+        **kwargs
+    )
+
+
+def distribution_sample(values, max_points: int = DEFAULT_MAX_POINTS) -> np.ndarray:
+    """
+    Reduces values to max_points evenly spaced quantiles, which keeps their distribution, including
+    the min, max and quartiles, for box and violin plots.
+    """
+    values = np.asarray(values, dtype=float)
+    if max_points is None or len(values) <= max_points:
+        return values
+    return np.quantile(values[~np.isnan(values)], np.linspace(0, 1, max_points))
+
+
+def resample_ohlcv(df: pd.DataFrame, max_bars: int = DEFAULT_MAX_POINTS) -> pd.DataFrame:
+    """
+    Merges consecutive bars so that at most max_bars remain: each merged bar opens at the first
+    open, closes at the last close, spans the highest high and lowest low and sums the volume.
+    """
+    if max_bars is None or len(df) <= max_bars:
+        return df
+    bar_size = -(-len(df) // max_bars)
+    groups = np.arange(len(df)) // bar_size
+    aggregations = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+    resampled = df.groupby(groups).agg({column: how for column, how in aggregations.items() if column in df.columns})
+    resampled.index = df.index[::bar_size]
+    return resampled
@@ -0,0 +1,187 @@
+"""
+Feature engineering for multivariate LSTM inputs.
+
+Each indicator is computed over the whole OHLCV frame of a ticker with vectorised pandas and NumPy
+rolling operations. A feature set lists the indicators to compute along with their parameters, e.g.
+
+    [("log_return", {}), ("rolling_mean", {"window": 20}), ("rsi", {"window": 14})]
+
+and compute_features returns the target column followed by one column per indicator output, ready
+for split_dataset_sequentially and preprocess_data. FeatureEngine caches every indicator column
+separately, so changing the parameter of one indicator only computes that indicator again.
+"""
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+def returns(data: pd.DataFrame, target: str) -> pd.Series:
+    return data[target].pct_change()
+
+
+def log_returns(data: pd.DataFrame, target: str) -> pd.Series:
+    return np.log(data[target]).diff()
+
+
+def rolling_mean(data: pd.DataFrame, target: str, window: int = 20) -> pd.Series:
+    return data[target].rolling(window).mean()
+
+
+def rolling_std(data: pd.DataFrame, target: str, window: int = 20) -> pd.Series:
+    return data[target].rolling(window).std()
+
+
+def rsi(data: pd.DataFrame, target: str, window: int = 14) -> pd.Series:
+    """
+    Relative Strength Index between 0 and 100, with Wilder's smoothing of the gains and losses.
+    """
+    change = data[target].diff()
+    # Wilder's smoothing is an exponential moving average with alpha = 1 / window
+    gain = change.clip(lower=0).ewm(alpha=1 / window, adjust=False, min_periods=window).mean()
+    loss = (-change).clip(lower=0).ewm(alpha=1 / window, adjust=False, min_periods=window).mean()
+    # A window without losses has an infinite relative strength, i.e. an RSI of 100
+    return (100 - 100 / (1 + gain / loss)).where(loss != 0, 100.0)
+
+
+def volume_zscore(data: pd.DataFrame, target: str, window: int = 20) -> pd.Series:
+    volume = data["Volume"].astype(float)
+    rolling = volume.rolling(window)
+    return (volume - rolling.mean()) / rolling.std().replace(0, np.nan)
+
+
+def calendar(data: pd.DataFrame, target: str) -> pd.DataFrame:
+    """
+    Day of the week and month of the year, encoded as points on a circle so that the last day of a
+    cycle is next to the first one.
+    """
+    day_of_week = 2 * np.pi * data.index.dayofweek.to_numpy() / 7
+    month = 2 * np.pi * (data.index.month.to_numpy() - 1) / 12
+    return pd.DataFrame({
+        "day_of_week_sin": np.sin(day_of_week),
+        "day_of_week_cos": np.cos(day_of_week),
+        "month_sin": np.sin(month),
+        "month_cos": np.cos(month),
+    }, index=data.index)
+
+
+# Maps each indicator name to its function and default parameters
+INDICATORS = {
+    "return": (returns, {}),
+    "log_return": (log_returns, {}),
+    "rolling_mean": (rolling_mean, {"window": 20}),
+    "rolling_std": (rolling_std, {"window": 20}),
+    "rsi": (rsi, {"window": 14}),
+    "volume_zscore": (volume_zscore, {"window": 20}),
+    "calendar": (calendar, {}),
+}
+
+
+def _normalize_feature(name: str, params: dict = None) -> tuple[str, tuple]:
+    if name not in INDICATORS:
+        raise ValueError(f"Unknown indicator {name}. Available indicators: {', '.join(INDICATORS)}")
+    defaults = INDICATORS[name][1]
+    params = {**defaults, **(params or {})}
+    unknown = set(params) - set(defaults)
+    if unknown:
+        raise ValueError(f"Unknown parameters for {name}: {', '.join(sorted(unknown))}")
+    return name, tuple(sorted(params.items()))
+
+
+def parse_feature_set(features: list[str]) -> list[tuple[str, dict]]:
+    """
+    Parses indicators written as "name" or "name:window", e.g. ["log_return", "rsi:14"], into a feature set.
+    """
+    feature_set = []
+    for feature in features:
+        name, _, window = feature.partition(":")
+        feature_set.append((name, {"window": int(window)} if window else {}))
+    return feature_set
+
+
+def _indicator(data: pd.DataFrame, target: str, name: str, params: tuple) -> pd.DataFrame:
+    function = INDICATORS[name][0]
+    values = function(data, target, **dict(params))
+    if isinstance(values, pd.Series):
+        suffix = "_".join(str(value) for _, value in params)
+        values = values.rename(f"{name}_{suffix}" if suffix else name).to_frame()
+    return values
+
+
+def _assemble(data: pd.DataFrame, target: str, columns: list[pd.DataFrame]) -> pd.DataFrame:
+    features = pd.concat([data[[target]]] + columns, axis=1)
+    # Rolling indicators are undefined over their first window, so those rows are dropped
+    return features.replace([np.inf, -np.inf], np.nan).dropna()
+
+
+def compute_features(data: pd.DataFrame, feature_set: list[tuple[str, dict]], target: str = "Close") -> pd.DataFrame:
+    """
+    Computes a feature set over the OHLCV data of a ticker, without caching.
+
+    Args:
+    - data: The OHLCV data of a ticker, as returned by gather_data
+    - feature_set: The (indicator, parameters) pairs to compute, see INDICATORS for their names and defaults
+    - target: The column to predict
+
+    Returns:
+    - A DataFrame with the target as first column followed by the indicators, without the rows where
+      an indicator is undefined
+    """
+    columns = [_indicator(data, target, *_normalize_feature(name, params)) for name, params in feature_set]
+    return _assemble(data, target, columns)
+
+
+def fingerprint_frame(data: pd.DataFrame) -> str:
+    """
+    Returns a hash of the index and values of a DataFrame, which changes whenever new bars are added.
+    """
+    return hashlib.blake2b(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes(), digest_size=16).hexdigest()
+
+
+class FeatureEngine:
+    """
+    Computes feature sets like compute_features, caching both the assembled feature frame of every
+    (ticker, feature set) and each indicator column on its own. Asking for a feature set that differs
+    by a single indicator or parameter reuses the cached columns of the other indicators.
+
+    Entries are keyed by a fingerprint of the OHLCV data, so refreshed data is never served stale
+    features, and the least recently used entries are dropped beyond max_entries.
+    """
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._columns = OrderedDict()
+        self._frames = OrderedDict()
+        self.computed = 0
+
+    def _get(self, cache: OrderedDict, key, compute):
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+        value = cache[key] = compute()
+        if len(cache) > self.max_entries:
+            cache.popitem(last=False)
+        return value
+
+    def _column(self, data, fingerprint, ticker, target, name, params):
+        def compute():
+            self.computed += 1
+            return _indicator(data, target, name, params)
+        return self._get(self._columns, (ticker, fingerprint, target, name, params), compute)
+
+    def compute(self, ticker: str, data: pd.DataFrame, feature_set: list[tuple[str, dict]], target: str = "Close") -> pd.DataFrame:
+        """
+        Computes a feature set over the OHLCV data of a ticker, see compute_features.
+        """
+        features = tuple(_normalize_feature(name, params) for name, params in feature_set)
+        fingerprint = fingerprint_frame(data)
+
+        def assemble():
+            columns = [self._column(data, fingerprint, ticker, target, name, params) for name, params in features]
+            return _assemble(data, target, columns)
+
+        return self._get(self._frames, (ticker, fingerprint, target, features), assemble)
+
+    def clear(self) -> None:
+        self._columns.clear()
+        self._frames.clear()
@@ -0,0 +1,156 @@
+"""
+Process-wide cache of the figures built by src.plotting.
+
+Streamlit runs every session in the same process, so figures cached here are built once and then
+served to every session asking for the same chart. Entries are keyed by a content hash of the
+plotted data along with the plot parameters, so refreshed data never gets a stale figure. Figures
+are stored serialized, Plotly figures as JSON and Matplotlib figures as PNG bytes, so that the
+cache size is known and no session can modify a figure another session is given.
+"""
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+
+DEFAULT_MAX_BYTES = 256 * 1024 ** 2
+
+
+def fingerprint(*values) -> str:
+    """
+    Returns a hash of the content of DataFrames, Series, arrays, and of dicts, lists and tuples of
+    them. Other values are hashed by their repr.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+
+    def update(value):
+        if isinstance(value, (pd.DataFrame, pd.Series)):
+            digest.update(repr(list(value.columns) if isinstance(value, pd.DataFrame) else value.name).encode())
+            digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+        elif isinstance(value, np.ndarray):
+            digest.update(repr((value.dtype, value.shape)).encode())
+            digest.update(np.ascontiguousarray(value).tobytes())
+        elif isinstance(value, dict):
+            digest.update(b"{")
+            for key in value:
+                update(key)
+                update(value[key])
+            digest.update(b"}")
+        elif isinstance(value, (list, tuple)):
+            digest.update(b"[")
+            for item in value:
+                update(item)
+            digest.update(b"]")
+        else:
+            digest.update(repr(value).encode())
+        digest.update(b",")
+
+    for value in values:
+        update(value)
+    return digest.hexdigest()
+
+
+def serialize_figure(fig) -> tuple[str, bytes]:
+    """
+    Serializes a Plotly figure to JSON or a Matplotlib figure to PNG bytes. The Matplotlib figure is
+    closed, since only its image is kept.
+    """
+    if fig is None:
+        return "none", b""
+    if isinstance(fig, go.Figure):
+        return "plotly", fig.to_json().encode()
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", bbox_inches="tight")
+    plt.close(fig)
+    return "png", buffer.getvalue()
+
+
+def deserialize_figure(kind: str, data: bytes):
+    """
+    Returns a new Plotly figure, the PNG bytes of a Matplotlib figure, or None, see serialize_figure.
+    """
+    if kind == "plotly":
+        return pio.from_json(data.decode())
+    if kind == "png":
+        return data
+    return None
+
+
+class FigureCache:
+    """
+    Thread-safe cache of serialized figures, evicting the least recently used ones beyond max_bytes.
+    """
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def size(self) -> int:
+        """
+        Returns the total size in bytes of the cached figures.
+        """
+        return self._size
+
+    def get(self, key: str):
+        """
+        Returns the figures cached under key, or None.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return tuple(deserialize_figure(kind, data) for kind, data in entry)
+
+    def put(self, key: str, figures: tuple) -> tuple:
+        """
+        Caches figures under key.
+
+        Returns:
+        - The figures as get returns them, Matplotlib figures being replaced by their PNG bytes
+        """
+        entry = tuple(serialize_figure(fig) for fig in figures)
+        entry_size = sum(len(data) for _, data in entry)
+        with self._lock:
+            if key in self._entries:
+                self._size -= sum(len(data) for _, data in self._entries.pop(key))
+            if entry_size <= self.max_bytes:
+                self._entries[key] = entry
+                self._size += entry_size
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= sum(len(data) for _, data in evicted)
+        return tuple(deserialize_figure(kind, data) for kind, data in entry)
+
+    def get_or_build(self, key: str, build) -> tuple:
+        """
+        Returns the figures cached under key, building and caching them with build() on a miss.
+        Concurrent misses on the same key may each build the figures.
+        """
+        figures = self.get(key)
+        if figures is None:
+            figures = build()
+            figures = self.put(key, figures if isinstance(figures, tuple) else (figures,))
+        return figures
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+# Shared by every session of the app
+FIGURE_CACHE = FigureCache()
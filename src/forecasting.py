@@ -0,0 +1,87 @@
+"""
+Recursive multi-step forecasting with trained LSTMForecasting models.
+
+Each forecast step feeds the previous prediction back as the next input. With the default
+"stateful" method, the window is run through the LSTM layers once and their hidden and cell
+states are carried from step to step, so every new step costs a single LSTM timestep instead of a
+full window. The "window" method slides the window and re-runs it for every step instead, which
+matches how the model was trained on fixed-length windows, at window times the cost.
+"""
+import numpy as np
+
+from src.data_handling import inverse_scale_target
+from src.numpy_inference import NumpyLSTMForecasting
+
+FORECAST_METHODS = ("stateful", "window")
+
+
+def forecast(model, window: np.ndarray, n_steps: int, method: str = "stateful") -> np.ndarray:
+    """
+    Forecasts the next n_steps values after the window, feeding each prediction back as input.
+
+    With the stateful method, the forecast of step k equals the model's prediction over the whole
+    sequence made of the window followed by the first k - 1 forecasts, which keeps the window's
+    history instead of dropping its oldest values like the window method does.
+
+    Args:
+    - model: A trained LSTMForecasting model, or a NumpyLSTMForecasting
+    - window: The last scaled sequence, of shape (window, features), or a batch of sequences of
+      shape (batch_size, window, features). The model must predict every feature, so that its
+      predictions can be fed back, i.e. output_size must equal the number of features
+    - n_steps: The number of future steps to forecast
+    - method: "stateful" to carry the LSTM states across steps, or "window" to re-run the slid window
+
+    Returns:
+    - The scaled forecasts of shape (n_steps, features), or (batch_size, n_steps, features) for a batch
+    """
+    if method not in FORECAST_METHODS:
+        raise ValueError(f"method must be one of {', '.join(FORECAST_METHODS)}")
+    if n_steps < 1:
+        raise ValueError("n_steps must be a positive integer.")
+    if not isinstance(model, NumpyLSTMForecasting):
+        model = NumpyLSTMForecasting.from_model(model)
+
+    x = np.asarray(window, dtype=np.float32)
+    single = x.ndim == 2
+    if single:
+        x = x[None]
+    if x.ndim != 3:
+        raise ValueError("window must be of shape (window, features) or (batch_size, window, features).")
+    if x.shape[-1] != model.output_size:
+        raise ValueError(
+            f"The model predicts {model.output_size} values per step but the window has {x.shape[-1]} features, "
+            "so its predictions cannot be fed back as inputs."
+        )
+
+    forecasts = np.empty((len(x), n_steps, x.shape[-1]), dtype=np.float32)
+    if method == "stateful":
+        prediction, states = model.run(x)
+        forecasts[:, 0] = prediction
+        for step in range(1, n_steps):
+            # Only the new timestep runs through the LSTM layers, from the carried states
+            prediction, states = model.run(prediction[:, None, :], states)
+            forecasts[:, step] = prediction
+    else:
+        for step in range(n_steps):
+            prediction = model.predict(x)
+            forecasts[:, step] = prediction
+            x = np.concatenate([x[:, 1:], prediction[:, None, :]], axis=1)
+
+    return forecasts[0] if single else forecasts
+
+
+def forecast_prices(model, window: np.ndarray, scaler, n_steps: int, method: str = "stateful") -> np.ndarray:
+    """
+    Forecasts the next n_steps values of a univariate series and inverse scales them.
+
+    Args:
+    - model: A trained LSTMForecasting model, or a NumpyLSTMForecasting
+    - window: The last scaled sequence, of shape (window, 1)
+    - scaler: The fitted MinMaxScaler returned by preprocess_data
+    - n_steps: The number of future steps to forecast
+    - method: See forecast
+
+    Returns:
+    - The forecasts in the original units, of shape (n_steps,)
+    """
+    return inverse_scale_target(scaler, forecast(model, window, n_steps, method))
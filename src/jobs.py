@@ -0,0 +1,319 @@
+"""
+Background training jobs, so that a training run does not block the Streamlit script run that
+started it and is not lost when the user navigates away or reconnects.
+
+TrainingJobManager trains the submitted models on a fixed number of worker threads. Every job is
+recorded in a JSON file with its status, progress and per-epoch losses, which pages poll, and the
+trained model is stored in the ModelRegistry, so results outlive the session that submitted them.
+The timings of every training are recorded by a TrainingProfiler and kept next to the job records.
+Queued jobs are served round-robin across their owners, so a user submitting many jobs does not
+delay the jobs of the others.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+
+from keras.callbacks import Callback
+
+from src.create_model import LSTMForecasting
+from src.model_registry import ModelRegistry
+from src.profiling import TrainingProfiler
+from src.train_model import train_model
+
+DEFAULT_JOBS_PATH = "./jobs/"
+# Statuses a job does not leave
+FINISHED_STATUSES = ("completed", "failed", "cancelled", "interrupted")
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobProgressCallback(Callback):
+    """
+    Records the progress of a training job after every epoch, and stops the training once the job
+    is cancelled.
+    """
+    def __init__(self, manager: "TrainingJobManager", job_id: str):
+        super().__init__()
+        self.manager = manager
+        self.job_id = job_id
+
+    def on_batch_end(self, batch, logs=None):
+        if self.manager.is_cancelled(self.job_id):
+            self.model.stop_training = True
+
+    def on_epoch_end(self, epoch, logs=None):
+        self.manager._update(
+            self.job_id,
+            epoch=epoch + 1,
+            append={"loss": float(logs["loss"]), "val_loss": float(logs["val_loss"])}
+        )
+        if self.manager.is_cancelled(self.job_id):
+            self.model.stop_training = True
+
+
+class TrainingJobManager:
+    """
+    Queue of training jobs run by background worker threads.
+
+    Args:
+    - root: Directory where the job records are persisted
+    - max_workers: The number of jobs trained at the same time
+    - registry: Where trained models are stored, defaults to ModelRegistry()
+    - start: Whether the workers start right away, see start
+    """
+    def __init__(self, root: str = DEFAULT_JOBS_PATH, max_workers: int = 1, registry: ModelRegistry = None, start: bool = True):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.root = root
+        self.max_workers = max_workers
+        self.registry = registry if registry is not None else ModelRegistry()
+        os.makedirs(root, exist_ok=True)
+        self._condition = threading.Condition()
+        self._jobs = {}
+        # Queued job ids of every owner, the owner served last being moved to the end
+        self._queues = OrderedDict()
+        self._payloads = {}
+        self._cancelled = set()
+        self._stopping = False
+        self._workers = []
+        self._load()
+        if start:
+            self.start()
+
+    def _path(self, job_id: str) -> str:
+        return os.path.join(self.root, f"{job_id}.json")
+
+    def _profile_path(self, job_id: str) -> str:
+        return os.path.join(self.root, "profiles", f"{job_id}.json")
+
+    def _load(self):
+        for name in os.listdir(self.root):
+            if not name.endswith(".json"):
+                continue
+            with open(os.path.join(self.root, name)) as f:
+                job = json.load(f)
+            if job["status"] not in FINISHED_STATUSES:
+                # The training data of a job only lives in memory, so its run cannot be resumed
+                job["status"] = "interrupted"
+                self._save(job)
+            self._jobs[job["id"]] = job
+
+    def _save(self, job: dict):
+        tmp_path = self._path(job["id"]) + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(job, f)
+        os.replace(tmp_path, self._path(job["id"]))
+
+    def _update(self, job_id: str, append: dict = None, **fields):
+        with self._condition:
+            job = self._jobs[job_id]
+            job.update(fields)
+            for name, value in (append or {}).items():
+                job[name].append(value)
+            self._save(job)
+
+    def start(self) -> None:
+        """
+        Starts the worker threads.
+        """
+        if self._workers:
+            return
+        for i in range(self.max_workers):
+            worker = threading.Thread(target=self._work, name=f"training-worker-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stops the workers once their current job is done. Queued jobs stay queued.
+        """
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        if wait:
+            for worker in self._workers:
+                worker.join()
+
+    def submit(self, owner: str, key: str, model_params: dict, train_params: dict, data: tuple) -> str:
+        """
+        Queues a training job.
+
+        Args:
+        - owner: Who submitted the job, e.g. the client id of the Model page. Owners are served in turn
+        - key: The ModelRegistry key of the run. If the registry already holds it, the job completes without training
+        - model_params: The arguments of LSTMForecasting
+        - train_params: The arguments of train_model other than the model and data, e.g. learning_rate, epochs and batch_size
+        - data: The (X_train, y_train, X_val, y_val) arrays
+
+        Returns:
+        - The id of the job
+        """
+        job_id = uuid.uuid4().hex
+        job = {
+            "id": job_id,
+            "owner": owner,
+            "key": key,
+            "status": "queued",
+            "epochs": int(train_params.get("epochs", 100)),
+            "epoch": 0,
+            "loss": [],
+            "val_loss": [],
+            "error": None,
+            "submitted_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+        }
+        with self._condition:
+            self._jobs[job_id] = job
+            self._payloads[job_id] = (model_params, train_params, data)
+            self._queues.setdefault(owner, deque()).append(job_id)
+            self._save(job)
+            self._condition.notify()
+        return job_id
+
+    def get(self, job_id: str) -> dict | None:
+        """
+        Returns a copy of the record of a job, or None if there is no such job.
+        """
+        with self._condition:
+            job = self._jobs.get(job_id)
+            return None if job is None else {**job, "loss": list(job["loss"]), "val_loss": list(job["val_loss"])}
+
+    def jobs(self, owner: str = None) -> list[dict]:
+        """
+        Returns the records of every job, or of the jobs of an owner, the most recent first.
+        """
+        with self._condition:
+            jobs = [self.get(job_id) for job_id, job in self._jobs.items() if owner is None or job["owner"] == owner]
+        return sorted(jobs, key=lambda job: job["submitted_at"], reverse=True)
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancels a queued job, or stops a running one at the end of its current batch.
+
+        Returns:
+        - Whether the job was still queued or running
+        """
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if job is None or job["status"] in FINISHED_STATUSES:
+                return False
+            if job["status"] == "queued":
+                self._queues[job["owner"]].remove(job_id)
+                self._payloads.pop(job_id, None)
+                job.update(status="cancelled", finished_at=time.time())
+                self._save(job)
+                self._condition.notify_all()
+            else:
+                self._cancelled.add(job_id)
+            return True
+
+    def is_cancelled(self, job_id: str) -> bool:
+        return job_id in self._cancelled
+
+    def result(self, job_id: str):
+        """
+        Returns the trained (model, history) of a completed job, or None.
+        """
+        job = self.get(job_id)
+        if job is None or job["status"] != "completed":
+            return None
+        return self.registry.get(job["key"])
+
+    def profile(self, job_id: str) -> dict | None:
+        """
+        Returns the training profile of a completed job, see TrainingProfiler.to_dict, or None if the
+        job did not train, e.g. because its model was already in the registry.
+        """
+        path = self._profile_path(job_id)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def wait(self, job_id: str, timeout: float = None) -> dict:
+        """
+        Blocks until a job is finished or the timeout expires, and returns its record.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        with self._condition:
+            while self._jobs[job_id]["status"] not in FINISHED_STATUSES:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+        return self.get(job_id)
+
+    def _next_job(self) -> str | None:
+        # Round-robin over the owners with queued jobs
+        for owner, queue in self._queues.items():
+            if queue:
+                self._queues.move_to_end(owner)
+                return queue.popleft()
+        return None
+
+    def _work(self):
+        while True:
+            with self._condition:
+                job_id = self._next_job()
+                while job_id is None and not self._stopping:
+                    self._condition.wait()
+                    job_id = self._next_job()
+                if job_id is None:
+                    return
+                payload = self._payloads.pop(job_id)
+                self._jobs[job_id].update(status="running", started_at=time.time())
+                self._save(self._jobs[job_id])
+            self._run(job_id, *payload)
+
+    def _run(self, job_id, model_params, train_params, data):
+        job = self.get(job_id)
+        try:
+            if job["key"] not in self.registry:
+                X_train, y_train, X_val, y_val = data
+                # Only the per-epoch totals are kept, the profile being loaded into every session showing the job
+                profiler = TrainingProfiler(record_batches=False)
+                model, history = train_model(
+                    LSTMForecasting(**model_params),
+                    X_train=X_train,
+                    y_train=y_train,
+                    X_val=X_val,
+                    y_val=y_val,
+                    progress_callback=JobProgressCallback(self, job_id),
+                    profiler=profiler,
+                    **train_params
+                )
+                if self.is_cancelled(job_id):
+                    raise JobCancelled()
+                self.registry.put(job["key"], model, history)
+                profiler.to_json(self._profile_path(job_id))
+            status, error = "completed", None
+        except JobCancelled:
+            status, error = "cancelled", None
+        except Exception as e:
+            status, error = "failed", str(e)
+        with self._condition:
+            self._cancelled.discard(job_id)
+            self._jobs[job_id].update(status=status, error=error, finished_at=time.time())
+            self._save(self._jobs[job_id])
+            self._condition.notify_all()
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> TrainingJobManager:
+    """
+    Returns the job manager shared by every session of the app, creating it on first use.
+    """
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = TrainingJobManager()
+        return _manager
@@ -0,0 +1,153 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+from keras.models import load_model
+
+# Imported so that LSTMForecasting is registered before any model is loaded
+import src.create_model
+
+DEFAULT_REGISTRY_PATH = "./models/registry/"
+DEFAULT_MAX_BYTES = 500 * 1024 ** 2
+
+
+def fingerprint_arrays(*arrays: np.ndarray) -> str:
+    """
+    Returns a content hash of the given arrays, covering their shapes and dtypes as well as their values.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        digest.update(f"{array.shape}|{array.dtype}".encode())
+        digest.update(array.data)
+    return digest.hexdigest()
+
+
+class ModelRegistry:
+    """
+    On-disk cache of trained models keyed by everything that determines the result of a training
+    run, so that a retrain with identical settings and data returns the stored model instead.
+
+    Each entry is a directory holding the model and its training history. When the entries
+    exceed max_bytes, the least recently used ones are removed.
+    """
+    def __init__(self, root: str = DEFAULT_REGISTRY_PATH, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(root, exist_ok=True)
+
+    @staticmethod
+    def make_key(
+            ticker: str,
+            feature: str,
+            window_size: int,
+            split_sizes: tuple[float, float, float],
+            model_config: dict,
+            optimizer_config: dict,
+            data: tuple[np.ndarray, ...]
+    ) -> str:
+        """
+        Builds the cache key of a training run.
+
+        Args:
+        - ticker: The stock symbol
+        - feature: The predicted feature
+        - window_size: The sequence size of the LSTM input
+        - split_sizes: The (train, validation, test) fractions
+        - model_config: The model's get_config()
+        - optimizer_config: Training settings such as learning rate, epochs and batch size
+        - data: The training and validation arrays
+
+        Returns:
+        - A hex digest identifying the run
+        """
+        # The layer name is auto-generated per instance and does not affect training
+        model_config = {k: v for k, v in model_config.items() if k != "name"}
+        settings = json.dumps({
+            "ticker": ticker,
+            "feature": feature,
+            "window_size": window_size,
+            "split_sizes": list(split_sizes),
+            "model_config": model_config,
+            "optimizer_config": optimizer_config,
+            "data": fingerprint_arrays(*data),
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(settings.encode()).hexdigest()
+
+    def _entry(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.exists(os.path.join(self._entry(key), "model.keras"))
+
+    def get(self, key: str):
+        """
+        Returns the stored (model, history) of a key, or None on a cache miss.
+        """
+        if key not in self:
+            return None
+        entry = self._entry(key)
+        model = load_model(os.path.join(entry, "model.keras"))
+        with open(os.path.join(entry, "history.json")) as f:
+            history = json.load(f)
+        # Mark the entry as recently used for the eviction
+        os.utime(entry)
+        return model, history
+
+    def put(self, key: str, model, history: dict) -> None:
+        """
+        Stores a trained model and its history under a key, evicting old entries if needed.
+        """
+        tmp_entry = tempfile.mkdtemp(dir=self.root, prefix=".tmp_")
+        try:
+            model.save(os.path.join(tmp_entry, "model.keras"))
+            with open(os.path.join(tmp_entry, "history.json"), "w") as f:
+                json.dump({k: [float(v) for v in values] for k, values in history.items()}, f)
+            # Another session may have stored the same key meanwhile, in which case it is kept
+            if key not in self:
+                os.replace(tmp_entry, self._entry(key))
+        finally:
+            shutil.rmtree(tmp_entry, ignore_errors=True)
+        self.evict(keep=key)
+
+    def _entries(self) -> list[tuple[str, float, int]]:
+        entries = []
+        for name in os.listdir(self.root):
+            entry = os.path.join(self.root, name)
+            if name.startswith(".") or not os.path.isdir(entry):
+                continue
+            size = sum(os.path.getsize(os.path.join(entry, file)) for file in os.listdir(entry))
+            entries.append((name, os.path.getmtime(entry), size))
+        return entries
+
+    def size(self) -> int:
+        """
+        Returns the disk size of all stored entries in bytes.
+        """
+        return sum(size for _, _, size in self._entries())
+
+    def evict(self, keep: str = None) -> list[str]:
+        """
+        Removes the least recently used entries until the registry fits in max_bytes.
+
+        Args:
+        - keep: A key that must not be evicted, typically the one just stored
+
+        Returns:
+        - The evicted keys
+        """
+        entries = sorted(self._entries(), key=lambda entry: entry[1])
+        total = sum(size for _, _, size in entries)
+        evicted = []
+        for key, _, size in entries:
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            shutil.rmtree(self._entry(key), ignore_errors=True)
+            total -= size
+            evicted.append(key)
+        return evicted
@@ -0,0 +1,149 @@
+"""
+TensorFlow-free inference for trained LSTMForecasting models.
+
+export_weights saves the LSTM and Dense weights of a trained model to a .npz file, and
+NumpyLSTMForecasting reproduces LSTMForecasting.call with NumPy only, so forecasts can be served
+without importing TensorFlow. This module must not import TensorFlow or Keras.
+"""
+import numpy as np
+
+
+def _sigmoid(x):
+    # Equal to 1 / (1 + exp(-x)) without overflowing for large negative x
+    return 0.5 * (1.0 + np.tanh(0.5 * x))
+
+
+def extract_weights(model) -> dict[str, np.ndarray]:
+    """
+    Extracts the weights of a trained LSTMForecasting model into a flat dict of arrays.
+
+    Args:
+    - model: A built LSTMForecasting model
+
+    Returns:
+    - The kernels and biases of every LSTM layer, hidden Dense layer and of the output layer
+    """
+    weights = {}
+    for i, layer in enumerate(model.lstm_layers):
+        kernel, recurrent_kernel, bias = layer.get_weights()
+        weights[f"lstm_{i}_kernel"] = kernel
+        weights[f"lstm_{i}_recurrent_kernel"] = recurrent_kernel
+        weights[f"lstm_{i}_bias"] = bias
+    for i, layer in enumerate(model.linear_layers):
+        weights[f"linear_{i}_kernel"], weights[f"linear_{i}_bias"] = layer.get_weights()
+    weights["fc_kernel"], weights["fc_bias"] = model.fc.get_weights()
+    return weights
+
+
+def export_weights(model, path: str, compressed: bool = True) -> None:
+    """
+    Saves the weights of a trained LSTMForecasting model to a .npz file that can be loaded with
+    NumpyLSTMForecasting.load.
+    """
+    save = np.savez_compressed if compressed else np.savez
+    save(path, **extract_weights(model))
+
+
+class NumpyLSTMForecasting:
+    """
+    NumPy forward pass of LSTMForecasting: stacked LSTM layers (Keras gate order i, f, c, o with
+    tanh and sigmoid activations), ReLU Dense layers and a linear output layer on the last timestep.
+    """
+    def __init__(self, weights: dict[str, np.ndarray]):
+        self.lstm_layers = []
+        i = 0
+        while f"lstm_{i}_kernel" in weights:
+            self.lstm_layers.append(tuple(
+                np.asarray(weights[f"lstm_{i}_{name}"], dtype=np.float32)
+                for name in ("kernel", "recurrent_kernel", "bias")
+            ))
+            i += 1
+        self.linear_layers = []
+        i = 0
+        while f"linear_{i}_kernel" in weights:
+            self.linear_layers.append((
+                np.asarray(weights[f"linear_{i}_kernel"], dtype=np.float32),
+                np.asarray(weights[f"linear_{i}_bias"], dtype=np.float32)
+            ))
+            i += 1
+        if not self.lstm_layers or "fc_kernel" not in weights:
+            raise ValueError("The weights do not describe an LSTMForecasting model.")
+        self.fc = (np.asarray(weights["fc_kernel"], dtype=np.float32), np.asarray(weights["fc_bias"], dtype=np.float32))
+
+    @classmethod
+    def load(cls, path: str) -> "NumpyLSTMForecasting":
+        with np.load(path) as weights:
+            return cls(dict(weights))
+
+    @classmethod
+    def from_model(cls, model) -> "NumpyLSTMForecasting":
+        return cls(extract_weights(model))
+
+    @property
+    def output_size(self) -> int:
+        return self.fc[0].shape[1]
+
+    @staticmethod
+    def _lstm(x, kernel, recurrent_kernel, bias, state=None):
+        batch_size, timesteps, _ = x.shape
+        units = recurrent_kernel.shape[0]
+        # The input projection of every timestep is computed in a single matmul
+        x_projected = x @ kernel + bias
+        if state is None:
+            h = np.zeros((batch_size, units), dtype=np.float32)
+            c = np.zeros((batch_size, units), dtype=np.float32)
+        else:
+            h, c = state
+        outputs = np.empty((batch_size, timesteps, units), dtype=np.float32)
+        for t in range(timesteps):
+            z = x_projected[:, t] + h @ recurrent_kernel
+            i = _sigmoid(z[:, :units])
+            f = _sigmoid(z[:, units:2 * units])
+            c = f * c + i * np.tanh(z[:, 2 * units:3 * units])
+            o = _sigmoid(z[:, 3 * units:])
+            h = o * np.tanh(c)
+            outputs[:, t] = h
+        return outputs, (h, c)
+
+    def run(self, x: np.ndarray, states: list = None) -> tuple[np.ndarray, list]:
+        """
+        Runs the sequences from the given LSTM states and returns the predictions along with the final
+        states, so that a later call can continue the sequences without running them again.
+
+        Args:
+        - x: Input sequences of shape (batch_size, timesteps, features)
+        - states: The (h, c) state of every LSTM layer returned by a previous call, or None to start
+          from zero states like LSTMForecasting.call
+
+        Returns:
+        - The predictions of shape (batch_size, output_size) and the final LSTM states
+        """
+        x = np.asarray(x, dtype=np.float32)
+        if states is None:
+            states = [None] * len(self.lstm_layers)
+        final_states = []
+        for (kernel, recurrent_kernel, bias), state in zip(self.lstm_layers, states):
+            x, state = self._lstm(x, kernel, recurrent_kernel, bias, state)
+            final_states.append(state)
+        # Only the last LSTM layer's last timestep feeds the Dense layers
+        x = x[:, -1]
+        for kernel, bias in self.linear_layers:
+            x = np.maximum(x @ kernel + bias, 0)
+        kernel, bias = self.fc
+        return x @ kernel + bias, final_states
+
+    def predict(self, x: np.ndarray) -> np.ndarray:
+        """
+        Predicts the next value of each sequence.
+
+        Args:
+        - x: Input sequences of shape (batch_size, timesteps, features), or (batch_size, features)
+          for a single timestep as accepted by LSTMForecasting.call
+
+        Returns:
+        - The predictions of shape (batch_size, output_size)
+        """
+        x = np.asarray(x, dtype=np.float32)
+        if x.ndim < 3:
+            x = x[:, None, :]
+        return self.run(x)[0]
@@ -1,6 +1,7 @@
 import streamlit as st
 from src.pages.Page import Page
 from src.plotting import *
+from src.running_stats import RunningStats
 class DataAnalysis(Page):
     def render(self):
         st.header("Data Analysis")
@@ -8,28 +9,31 @@ class DataAnalysis(Page):
             raise Exception("No data available. Please gather data first from the 'Data Gathering' page.")
         stock_selected = list(st.session_state.stock_data.keys())[0]
         data = st.session_state.stock_data[stock_selected]
-        stats = data['Close'].agg(['mean', 'std', 'min', 'max'])
-        missing_values = data['Close'].isnull().sum()
+        # Kept across reruns, so only the bars added by a data refresh are added to the statistics
+        running_stats = st.session_state.setdefault("running_stats", {})
+        if stock_selected not in running_stats:
+            running_stats[stock_selected] = RunningStats(window=20)
+        stats = running_stats[stock_selected].update(data['Close']).summary()
+        rolling_stats = running_stats[stock_selected].rolling_summary()
         left_col, right_col = st.columns(2)
         with left_col:
             st.write("Analyzing stock data for:", stock_selected)
             st.write("Mean: ", stats['mean'])
             st.write("STD: ", stats['std'])
+            st.write("Mean (last 20 bars): ", rolling_stats['mean'])
+            st.write("STD (last 20 bars): ", rolling_stats['std'])
         with right_col:
             st.write("Min: ", stats['min'])
             st.write("Max: ", stats['max'])
-            st.write("Missing values: ", missing_values)
+            st.write("Missing values: ", stats['missing'])
+            st.write("Min (last 20 bars): ", rolling_stats['min'])
+            st.write("Max (last 20 bars): ", rolling_stats['max'])
 
-        fig_candlestick, fig = st.session_state.get("figs", (None, None))
-        if fig_candlestick is None or fig is None or st.session_state.stock_data_key != stock_selected:
-            try:
-                fig_candlestick, fig = plot_stats(st.session_state.stock_data, stock_selected)
-                st.session_state.figs = (fig_candlestick, fig)
-                st.session_state.stock_data_key = stock_selected
-                st.pyplot(fig_candlestick)
-                st.plotly_chart(fig, use_container_width=True)
-            except Exception as e:
-                raise Exception(f"Error analyzing stock data") from e
-        else:
-            st.pyplot(fig_candlestick)
-            st.plotly_chart(fig, use_container_width=True)
+        # Built once per stock and data content for every session, see src.figure_cache
+        try:
+            candlestick_png, fig = cached_plot_stats(st.session_state.stock_data, stock_selected)
+        except Exception as e:
+            raise Exception(f"Error analyzing stock data") from e
+        if candlestick_png is not None:
+            st.image(candlestick_png)
+        st.plotly_chart(fig, use_container_width=True)
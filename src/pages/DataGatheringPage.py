@@ -4,6 +4,7 @@ import pandas as pd
 
 from src.pages.Page import Page
 from src.data_handling import *
+from src.data_store import OHLCVStore
 
 class DataGathering(Page):
     def render(self):
@@ -25,7 +26,7 @@ class DataGathering(Page):
         if stock_selected:
             # Fetch stock data every time the user selects a new stock
             try:
-                stock_data = gather_data(stocks=[stock_selected])
+                stock_data = gather_data(stocks=[stock_selected], store=OHLCVStore())
                 
                 if stock_selected not in stock_data:
                     raise Exception(f"Error: {stock_selected} is not available in Yahoo Finance database.")
@@ -1,6 +1,7 @@
 import streamlit as st
 from src.pages.Page import Page
 from src.data_handling import *
+from src.features import INDICATORS, FeatureEngine
 from src.plotting import *
 
 class DataPreprocessing(Page):
@@ -30,22 +31,49 @@ class DataPreprocessing(Page):
                 # key="feature_selected"
             )
 
+        indicators = st.multiselect(
+            "Additional input features",
+            options=list(INDICATORS),
+            help="Indicators computed from the stock data and fed to the model along with the feature to predict"
+        )
+        feature_set = []
+        if indicators:
+            param_cols = st.columns(len(indicators))
+            for param_col, name in zip(param_cols, indicators):
+                params = {}
+                if "window" in INDICATORS[name][1]:
+                    with param_col:
+                        params["window"] = int(st.number_input(
+                            f"{name} window", min_value=2, value=INDICATORS[name][1]["window"], step=1
+                        ))
+                feature_set.append((name, params))
+
         try:
             # Convert window_size to integer and handle possible conversion errors
             window_size = int(window_size_input)
             st.session_state.window_size = window_size  # Ensure it's stored as an integer
             st.session_state.feature_selected = feature_selected
+            st.session_state.feature_set = feature_set
+            st.session_state.split_sizes = (0.7, 0.1, 0.2)
+            # Indicator columns are cached across reruns, so only the ones whose parameters changed are computed
+            if "feature_engine" not in st.session_state:
+                st.session_state.feature_engine = FeatureEngine()
+            features = st.session_state.feature_engine.compute(
+                stock_selected, data[stock_selected], feature_set, target=st.session_state.feature_selected
+            )
+            train_size, val_size, test_size = st.session_state.split_sizes
             train_data, val_data, test_data = split_dataset_sequentially(
-                data,
-                [stock_selected, st.session_state.feature_selected],
-                train_size=0.7,
-                val_size=0.1,
-                test_size=0.2
+                {stock_selected: features},
+                [stock_selected, list(features.columns)],
+                train_size=train_size,
+                val_size=val_size,
+                test_size=test_size
             )
+            # The feature to predict is the first column, the only one plotted
             splitted_data = {
-                "Train": train_data,
-                "Validation": val_data,
-                "Test": test_data
+                "Train": train_data.iloc[:, :1],
+                "Validation": val_data.iloc[:, :1],
+                "Test": test_data.iloc[:, :1]
             }
             st.session_state.splitted_data = splitted_data
 
@@ -54,14 +82,15 @@ class DataPreprocessing(Page):
                 "Validation": "orange",
                 "Test": "darkred"
             }
-            st.pyplot(plot_splitted_stock_data(splitted_data, colors))
+            st.image(cached_plot_splitted_stock_data(splitted_data, colors))
 
             # Preprocess the data
             X_train, y_train, X_val, y_val, X_test, y_test, scaler = preprocess_data(
                 train_data=train_data,
                 val_data=val_data,
                 test_data=test_data,
-                seq_size=window_size
+                seq_size=window_size,
+                target_index=0
             )
             st.session_state.X_train = X_train
             st.session_state.y_train = y_train
@@ -1,9 +1,16 @@
+import os
+import uuid
+
 import streamlit as st
 from src.pages.Page import Page
 from src.create_model import *
 from src.train_model import *
 from src.plotting import *
 from src.predictions import *
+from src.model_registry import ModelRegistry
+from src.jobs import FINISHED_STATUSES, get_job_manager
+import pandas as pd
+from src.sweep import random_search_space, run_sweep
 
 class ModelPage(Page):
     def render(self):
@@ -26,7 +33,7 @@ class ModelPage(Page):
             raise Exception("No data available. Please gather data first from the 'Data Gathering' page.")
         # st.write("Current Session State:", st.session_state)
         # Check if preprocessing is done
-        required_keys = ["window_size", "feature_selected", "X_train", "y_train"]
+        required_keys = ["window_size", "feature_selected", "split_sizes", "X_train", "y_train"]
         missing_keys = [key for key in required_keys if st.session_state.get(key) is None]
         if missing_keys:
             raise Exception(f"Missing preprocessing data: {', '.join(missing_keys)}. Please complete Data Preprocessing first.") from e 
@@ -43,27 +50,158 @@ class ModelPage(Page):
                 n_epochs = st.number_input('No. of Epochs', step=1, min_value=1,  value=150, max_value=500, key="n_epochs")
                 batch_size = st.number_input('Batch Size', step=1, min_value=1, value=16, max_value=100, key="batch_size")
                 learning_rate = st.number_input('Learning Rate', value=0.001,  step=0.0001, min_value=0.000001, max_value=1.0, key="learning_rate",format="%0.4f")
+                st.divider()
+                # 0 disables each of the convergence controls
+                early_stopping_patience = st.number_input('Early Stopping Patience (epochs, 0 = off)', step=1, min_value=0, value=20, max_value=500, key="early_stopping_patience")
+                reduce_lr_patience = st.number_input('Reduce LR on Plateau Patience (epochs, 0 = off)', step=1, min_value=0, value=10, max_value=500, key="reduce_lr_patience")
+                time_budget = st.number_input('Time Budget (minutes, 0 = off)', step=1, min_value=0, value=0, max_value=600, key="time_budget")
             # Button to train the model
         train_click = st.button('Train LSTM Model', type="primary")
+        # Training runs in a background job, so it goes on if the user leaves the page. The job id is
+        # also kept in the URL, so the job can be found again after a reconnect
+        manager = get_job_manager()
         if train_click:
             try:
-                model = LSTMForecasting(
+                model_params = dict(
                     input_size=st.session_state.window_size,
                     lstm_hidden_size=st.session_state.lstm_neurons,
                     lstm_num_layers=st.session_state.lstm_layers,
                     linear_num_layers=st.session_state.linear_hidden_layers,
                     linear_hidden_size=st.session_state.linear_hidden_neurons,
                     output_size=1
-                )                 
-                model, history= train_model(model, 
-                                            learning_rate=st.session_state.learning_rate,
-                                            epochs=st.session_state.n_epochs,
-                                            batch_size=st.session_state.batch_size, 
-                                            X_train=st.session_state.X_train,
-                                            y_train=st.session_state.y_train, 
-                                            X_val=st.session_state.X_val,
-                                            y_val=st.session_state.y_val)  
-                st.session_state.model = model
-                st.session_state.history = history
+                )
+                train_params = dict(
+                    learning_rate=st.session_state.learning_rate,
+                    epochs=st.session_state.n_epochs,
+                    batch_size=st.session_state.batch_size,
+                    early_stopping_patience=st.session_state.early_stopping_patience or None,
+                    reduce_lr_patience=st.session_state.reduce_lr_patience or None,
+                    time_budget=st.session_state.time_budget * 60 or None
+                )
+                # A model already trained with the same settings and data is reused by the job
+                key = ModelRegistry.make_key(
+                    ticker=st.session_state.stock_selected,
+                    feature=st.session_state.feature_selected,
+                    window_size=st.session_state.window_size,
+                    split_sizes=st.session_state.split_sizes,
+                    model_config=LSTMForecasting(**model_params).get_config(),
+                    optimizer_config={"optimizer": "adam", **train_params},
+                    data=(st.session_state.X_train, st.session_state.y_train,
+                          st.session_state.X_val, st.session_state.y_val)
+                )
+                job_id = manager.submit(
+                    owner=client_id(),
+                    key=key,
+                    model_params=model_params,
+                    train_params=train_params,
+                    data=(st.session_state.X_train, st.session_state.y_train,
+                          st.session_state.X_val, st.session_state.y_val)
+                )
+                st.session_state.job_id = job_id
+                st.query_params["job"] = job_id
             except Exception as e:
                 raise Exception("Error training the model") from e
+
+        jobs = manager.jobs(owner=client_id())
+        # After a reconnect, the job in the URL or else the most recent job of the client is shown
+        job_id = st.session_state.get("job_id") or st.query_params.get("job") or (jobs[0]["id"] if jobs else None)
+        job = manager.get(job_id) if job_id else None
+        if job is not None and job["owner"] == client_id():
+            # Only unfinished jobs are polled
+            if job["status"] in FINISHED_STATUSES:
+                render_job(manager, job_id)
+            else:
+                poll_job(manager, job_id)
+
+        with st.expander("Training jobs"):
+            if jobs:
+                st.dataframe(pd.DataFrame([{
+                    "job": job["id"][:8],
+                    "status": job["status"],
+                    "epoch": f"{job['epoch']}/{job['epochs']}",
+                    "loss": job["loss"][-1] if job["loss"] else None,
+                    "val_loss": job["val_loss"][-1] if job["val_loss"] else None,
+                    "submitted": pd.Timestamp(job["submitted_at"], unit="s"),
+                } for job in jobs]))
+            else:
+                st.write("No training jobs yet.")
+
+        with st.expander("Hyperparameter sweep"):
+            st.write("Trains random configurations within the slider ranges in parallel worker processes "
+                     "and ranks them by validation loss. Trials falling behind the others are stopped early.")
+            sweep_left, sweep_right = st.columns(2)
+            with sweep_left:
+                n_trials = st.number_input('No. of Trials', step=1, min_value=1, value=8, max_value=200, key="n_trials")
+            with sweep_right:
+                max_workers = st.number_input('Worker Processes', step=1, min_value=1, value=os.cpu_count() or 1, key="sweep_workers")
+            if st.button('Run Sweep'):
+                try:
+                    space = {
+                        "lstm_num_layers": (1, 5),
+                        "lstm_hidden_size": (1, 50),
+                        "linear_num_layers": (1, 5),
+                        "linear_hidden_size": (1, 50),
+                        "batch_size": [16, 32, 64],
+                        "learning_rate": (0.0001, 0.01),
+                        "epochs": [st.session_state.n_epochs],
+                    }
+                    with st.spinner("Running sweep..."):
+                        st.session_state.leaderboard = run_sweep(
+                            random_search_space(space, n_trials=n_trials),
+                            X_train=st.session_state.X_train,
+                            y_train=st.session_state.y_train,
+                            X_val=st.session_state.X_val,
+                            y_val=st.session_state.y_val,
+                            max_workers=max_workers
+                        )
+                except Exception as e:
+                    raise Exception("Error running the hyperparameter sweep") from e
+            if "leaderboard" in st.session_state:
+                st.dataframe(st.session_state.leaderboard)
+
+
+def client_id() -> str:
+    """
+    Returns the id of the browser client owning the training jobs. It is kept in the URL, so unlike
+    the session id it survives reconnects and is shared by the tabs opened from the same URL.
+    """
+    if "client" not in st.query_params:
+        st.query_params["client"] = uuid.uuid4().hex
+    return st.query_params["client"]
+
+
+@st.fragment(run_every="2s")
+def poll_job(manager, job_id):
+    """
+    Shows the progress of an unfinished training job, polled every 2 seconds. Once the job is
+    finished, the whole page reruns, which renders it without polling.
+    """
+    if manager.get(job_id)["status"] in FINISHED_STATUSES:
+        st.rerun()
+    render_job(manager, job_id)
+
+
+def render_job(manager, job_id):
+    """
+    Shows the progress of a training job, and loads its model once it completes.
+    """
+    job = manager.get(job_id)
+    st.progress(job["epoch"] / job["epochs"] if job["epochs"] else 0.0)
+    status_text = f"Job {job_id[:8]}: {job['status']}, epoch {job['epoch']}/{job['epochs']}"
+    if job["loss"]:
+        status_text += f" - Loss: {job['loss'][-1]:.4f}, Val Loss: {job['val_loss'][-1]:.4f}"
+    st.text(status_text)
+    if job["loss"]:
+        st.line_chart(pd.DataFrame({"loss": job["loss"], "val_loss": job["val_loss"]}))
+    if job["status"] not in FINISHED_STATUSES:
+        if st.button("Cancel training"):
+            manager.cancel(job_id)
+    elif job["status"] == "failed":
+        st.error(f"Training failed: {job['error']}")
+    elif job["status"] == "completed" and st.session_state.get("loaded_job") != job_id:
+        result = manager.result(job_id)
+        if result is not None:
+            st.session_state.model, st.session_state.history = result
+            st.session_state.training_profile = manager.profile(job_id)
+            st.session_state.loaded_job = job_id
+            st.success("Training complete. See the results in the Results page.")
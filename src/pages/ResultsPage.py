@@ -2,6 +2,12 @@ import streamlit as st
 from src.pages.Page import Page
 from src.plotting import *
 from src.predictions import *
+from src.serving import ServingModel
+from src.forecasting import forecast_prices
+from src.profiling import profile_frames
+import json
+import numpy as np
+import pandas as pd
 
 class ResultsPage(Page):
     def render(self):
@@ -19,10 +25,18 @@ class ResultsPage(Page):
         try: 
             history=st.session_state.history
             model=st.session_state.model
-            st.plotly_chart(plot_training_performance(history))
+            st.plotly_chart(cached_plot_training_performance(history))
+            profile = st.session_state.get("training_profile")
+            if profile:
+                self.render_profile(profile)
+            # Compile the forward pass once per trained model, so reruns of the page skip the tracing
+            serving_model = st.session_state.get("serving_model")
+            if serving_model is None or serving_model.model is not model:
+                serving_model = ServingModel(model, n_features=st.session_state.X_train.shape[-1])
+                st.session_state.serving_model = serving_model
             # Predict stock price for all data splits
             train_results, val_results, test_results = predict(
-                model=  model,
+                model=  serving_model,
                 X_train=st.session_state.X_train,
                 X_validate=st.session_state.X_val,
                 X_test=st.session_state.X_test,
@@ -46,5 +60,45 @@ class ResultsPage(Page):
                 "Test": "darkred"
             }
             st.plotly_chart(plot_actual_vs_predicted_stock_data(actual_data, predicted_data, colors))
+
+            # Forecast the days that follow the test split, starting from its last window. The
+            # predictions can only be fed back as inputs when the model has no other input features
+            if st.session_state.X_test.shape[-1] > 1:
+                return
+            n_steps = st.number_input("Forecast horizon (days)", min_value=1, max_value=365, value=30, step=1)
+            # The sliding window matches the fixed-length windows the model was trained on, the
+            # stateful method is faster but runs the model over ever longer sequences
+            method = st.radio(
+                "Forecast method", ["window", "stateful"], horizontal=True,
+                format_func={"window": "Sliding window", "stateful": "Stateful (faster)"}.get
+            )
+            X_test, y_test = st.session_state.X_test, st.session_state.y_test
+            last_window = np.concatenate([X_test[-1, 1:], np.reshape(y_test[-1], (1, -1))])
+            forecasts = forecast_prices(model, last_window, st.session_state.scaler, int(n_steps), method=method)
+            last_date = actual_data["Test"].index[-1]
+            forecast_dates = pd.bdate_range(last_date, periods=int(n_steps) + 1)[1:]
+            st.line_chart(pd.DataFrame({"Forecast": forecasts}, index=forecast_dates))
         except Exception as e:
-            raise TypeError(e) from e
\ No newline at end of file
+            raise TypeError(e) from e
+
+    def render_profile(self, profile):
+        """
+        Renders the timings of the training recorded by a TrainingProfiler, and the buttons to export them.
+        """
+        epochs, batches = profile_frames(profile)
+        if epochs.empty:
+            return
+        summary = profile["summary"]
+        with st.expander("Training profile"):
+            columns = st.columns(4)
+            columns[0].metric("Mean epoch time", f"{summary['mean_epoch_s']:.2f} s")
+            columns[1].metric("Throughput", f"{summary['samples_per_s'] or 0:,.0f} samples/s")
+            columns[2].metric("Callback overhead", f"{(summary['overhead_fraction'] or 0):.1%}")
+            columns[3].metric("Peak RSS", f"{summary['peak_rss_mb'] or 0:,.0f} MB")
+            st.plotly_chart(plot_training_profile(epochs))
+            st.dataframe(epochs)
+            export_columns = st.columns(3)
+            export_columns[0].download_button("Download JSON", json.dumps(profile), file_name="training_profile.json", mime="application/json")
+            export_columns[1].download_button("Download epochs CSV", epochs.to_csv(), file_name="training_epochs.csv", mime="text/csv")
+            if not batches.empty:
+                export_columns[2].download_button("Download batches CSV", batches.to_csv(), file_name="training_batches.csv", mime="text/csv")
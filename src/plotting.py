@@ -1,5 +1,4 @@
 import pandas as pd
-import mplfinance as mpf
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import matplotlib.colors as mcolors
@@ -7,9 +6,17 @@ import matplotlib.pyplot as plt
 # import logging
 import matplotlib.dates as mdates
 import numpy as np
+from src.figure_cache import FIGURE_CACHE, fingerprint
+from src.downsampling import DEFAULT_MAX_POINTS, distribution_sample, histogram_trace, line_trace, resample_ohlcv
 # logging.basicConfig(level=logging.DEBUG)
 
-def plot_stats(data: dict[str, pd.DataFrame], stock) -> tuple[plt.Figure | None, go.Figure]:
+def plot_stats(data: dict[str, pd.DataFrame], stock, max_points: int = DEFAULT_MAX_POINTS) -> tuple[plt.Figure | None, go.Figure]:
+    """
+    Plots the candlestick chart and the daily percentage change of a stock.
+
+    Every trace is reduced to at most max_points points before the figures are built (see
+    src.downsampling), so long histories do not slow the browser down. None keeps every point.
+    """
     try:
         # logging.debug(f"Entering plot_stats function with stock: {stock}")
         
@@ -44,8 +51,10 @@ def plot_stats(data: dict[str, pd.DataFrame], stock) -> tuple[plt.Figure | None,
         )
         fig_candlestick = None
         if all(col in df.columns for col in ['Open', 'High', 'Low', 'Close']):
+            # Imported here since only the candlestick chart needs it
+            import mplfinance as mpf
             s = mpf.make_mpf_style(base_mpf_style='yahoo')
-            fig_candlestick, ax = mpf.plot(df, type='candle', style=s, 
+            fig_candlestick, ax = mpf.plot(resample_ohlcv(df, max_points), type='candle', style=s, 
                     title=f'Candlestick Chart for {stock}',
                     ylabel='Price ($)', 
                     mav=(10,20,50), 
@@ -56,9 +65,10 @@ def plot_stats(data: dict[str, pd.DataFrame], stock) -> tuple[plt.Figure | None,
 
         # Daily Percentage Change
         fig.add_trace(
-            go.Scatter(
-                x=df.index, 
-                y=df['change_percent'], 
+            line_trace(
+                df.index, 
+                df['change_percent'], 
+                max_points,
                 mode='lines', 
                 name=f'{stock} stock', 
                 line=dict(color=colors[stock], width=2),
@@ -69,21 +79,26 @@ def plot_stats(data: dict[str, pd.DataFrame], stock) -> tuple[plt.Figure | None,
 
         # Distribution of Daily Percentage Change
         fig.add_trace(
-            go.Histogram(
-                x=df['change_percent'], 
+            histogram_trace(
+                df['change_percent'], 
+                200,
+                max_points,
                 name=f'{stock} stock', 
                 opacity=0.7, 
-                nbinsx=200, 
                 marker_color=colors[stock],
                 showlegend=True
             ), 
             row=1, col=2 
         )
 
+        # The box and violin plots only need the distribution, which quantiles keep
+        change_percent = distribution_sample(df['change_percent'], max_points)
+        downsampled = len(change_percent) < len(df)
+
         # Boxplot
         fig.add_trace(
             go.Box(
-                y=df['change_percent'], 
+                y=change_percent, 
                 name=f'{stock} stock', 
                 line=dict(color=colors[stock]),
                 opacity=0.6,
@@ -95,12 +110,13 @@ def plot_stats(data: dict[str, pd.DataFrame], stock) -> tuple[plt.Figure | None,
         # Violin plot
         fig.add_trace(
             go.Violin(
-                y=df['change_percent'], 
+                y=change_percent, 
                 name=f'{stock} stock', 
                 line=dict(color=colors[stock]),
                 box_visible=True, 
                 meanline_visible=True, 
-                points='all', 
+                # Quantiles are not actual observations, so they are not drawn as points
+                points=False if downsampled else 'all', 
                 opacity=0.6,
                 showlegend=False
             ),
@@ -194,6 +210,42 @@ def plot_training_performance(history):
     )
     return fig
 
+def plot_training_profile(epochs: pd.DataFrame) -> go.Figure:
+    """
+    Plots where the time of every training epoch went, along with the training throughput.
+
+    Args:
+    - epochs: The epoch rows of a training profile, see src.profiling.profile_frames
+
+    Returns:
+    - A Plotly figure with the compute, callback overhead and validation time of every epoch as stacked
+      bars, and the samples per second as a line on a second axis.
+    """
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+    for column, name, color in (("overhead_s", "Callback Overhead", "orange"),
+                                ("compute_s", "Compute", "blue"),
+                                ("validation_s", "Validation", "gray")):
+        fig.add_trace(go.Bar(x=epochs.index, y=epochs[column], name=name, marker_color=color))
+    fig.add_trace(go.Scatter(
+        x=epochs.index,
+        y=epochs["samples_per_s"],
+        mode='lines',
+        name='Samples/s',
+        line=dict(color='green')
+    ), secondary_y=True)
+    fig.update_layout(
+        title="Training Profile",
+        barmode="stack",
+        xaxis_title="Epochs",
+        legend_title="Time",
+        width=900,
+        height=500,
+        margin=dict(l=40, r=40, t=40, b=40),
+    )
+    fig.update_yaxes(title_text="Seconds", secondary_y=False)
+    fig.update_yaxes(title_text="Samples/s", secondary_y=True)
+    return fig
+
 # def plot_actual_vs_predicted_stock_data(actual_data, predicted_data, colors):
 #     """
 #     Plots the actual vs predicted stock data for training, validation, and test sets.
@@ -239,7 +291,7 @@ def plot_training_performance(history):
 
 #     return fig
 
-def plot_actual_vs_predicted_stock_data(actual_data, predicted_data, colors):
+def plot_actual_vs_predicted_stock_data(actual_data, predicted_data, colors, max_points=DEFAULT_MAX_POINTS):
     """
     Plots the actual vs predicted stock data for training, validation, and test sets using Plotly.
 
@@ -247,6 +299,7 @@ def plot_actual_vs_predicted_stock_data(actual_data, predicted_data, colors):
     - actual_data: dict containing 'Train', 'Validation', and 'Test' actual dataframes.
     - predicted_data: dict containing 'Train', 'Validation', and 'Test' numpy arrays (predictions).
     - colors: dict defining the colors for each dataset ('Train', 'Validation', 'Test').
+    - max_points: Maximum number of points per trace, see src.downsampling. None keeps every point.
 
     Returns:
     - fig: Plotly figure object for rendering in Streamlit.
@@ -255,9 +308,10 @@ def plot_actual_vs_predicted_stock_data(actual_data, predicted_data, colors):
 
     # Plot actual data (thicker and more transparent)
     for label, df in actual_data.items():
-        fig.add_trace(go.Scatter(
-            x=df.index,
-            y=df.values.squeeze(),  # assuming df has a single column (for stock prices)
+        fig.add_trace(line_trace(
+            df.index,
+            df.values.squeeze(),  # assuming df has a single column (for stock prices)
+            max_points,
             mode='lines',
             name=f"{label} Actual",
             line=dict(color=colors[label], width=4),  # Thicker line
@@ -268,18 +322,20 @@ def plot_actual_vs_predicted_stock_data(actual_data, predicted_data, colors):
     for label, predictions in predicted_data.items():
         if len(predictions) == len(actual_data[label]):
             # Align the predictions to the same index as the actual data
-            fig.add_trace(go.Scatter(
-                x=actual_data[label].index,
-                y=predictions,
+            fig.add_trace(line_trace(
+                actual_data[label].index,
+                predictions,
+                max_points,
                 mode='lines',
                 name=f"{label} Predicted",
                 line=dict(color=colors[label], width=2, dash='dash')  # Thinner and dashed line
             ))
         else:
             # Align to the end of the actual data (in case predictions are shorter)
-            fig.add_trace(go.Scatter(
-                x=actual_data[label].index[-len(predictions):],
-                y=predictions,
+            fig.add_trace(line_trace(
+                actual_data[label].index[-len(predictions):],
+                predictions,
+                max_points,
                 mode='lines',
                 name=f"{label} Predicted",
                 line=dict(color=colors[label], width=2, dash='dash')  # Thinner and dashed line
@@ -295,4 +351,38 @@ def plot_actual_vs_predicted_stock_data(actual_data, predicted_data, colors):
         template='plotly_white'
     )
 
-    return fig
\ No newline at end of file
+    return fig
+
+
+def cached_plot_stats(data: dict[str, pd.DataFrame], stock, max_points: int = DEFAULT_MAX_POINTS, cache=FIGURE_CACHE) -> tuple[bytes | None, go.Figure]:
+    """
+    plot_stats through the process-wide figure cache, keyed by the content of the stock's data.
+
+    Returns:
+    - The candlestick chart as PNG bytes, or None, and the Plotly figure
+    """
+    if isinstance(data, dict) and stock in data and isinstance(data[stock], pd.DataFrame):
+        key = fingerprint("plot_stats", data[stock], stock, max_points)
+    else:
+        # Invalid inputs are not cached, so plot_stats raises its usual errors
+        return plot_stats(data, stock, max_points)
+    return cache.get_or_build(key, lambda: plot_stats(data, stock, max_points))
+
+
+def cached_plot_splitted_stock_data(dataframes, colors, cache=FIGURE_CACHE) -> bytes:
+    """
+    plot_splitted_stock_data through the process-wide figure cache.
+
+    Returns:
+    - The figure as PNG bytes
+    """
+    key = fingerprint("plot_splitted_stock_data", dataframes, colors)
+    return cache.get_or_build(key, lambda: plot_splitted_stock_data(dataframes, colors))[0]
+
+
+def cached_plot_training_performance(history, cache=FIGURE_CACHE) -> go.Figure:
+    """
+    plot_training_performance through the process-wide figure cache.
+    """
+    key = fingerprint("plot_training_performance", {name: np.asarray(values) for name, values in history.items()})
+    return cache.get_or_build(key, lambda: plot_training_performance(history))[0]
@@ -1,35 +1,57 @@
 import numpy as np
+from src.data_handling import inverse_scale_target
 
-def predict(model, X_train, X_validate, X_test, y_train, y_validate, y_test, scaler):
+def predict(model, X_train, X_validate, X_test, y_train, y_validate, y_test, scaler, batch_size=1024, target_index=0):
     """
-    Predicts and inversely transforms the predicted and actual data.
-    
+    Predicts and inversely transforms the predicted data.
+
+    The three splits are predicted in a single model.predict call and the predictions are inverse
+    scaled at once, instead of once per split.
+
     Args:
     - model: Trained model for making predictions.
     - X_train: Training data features.
     - X_validate: Validation data features.
     - X_test: Testing data features.
-    - y_train: Actual training data labels.
-    - y_validate: Actual validation data labels.
-    - y_test: Actual testing data labels.
-    - scaler: Scaler used for inverse transformation (e.g., StandardScaler or MinMaxScaler).
+    - y_train, y_validate, y_test: Actual data labels. Unused, kept for backwards compatibility.
+    - scaler: Fitted MinMaxScaler used for the inverse transformation.
+    - batch_size: Number of sequences per forward pass.
+    - target_index: Column index of the predicted feature in the data the scaler was fitted on.
+
+    X_train, X_validate, X_test and scaler can also be dictionaries with the stock name as key, as returned
+    by preprocess_data for several stocks. All stocks are still predicted in a single pass.
 
     Returns:
-    - A tuple containing the inversely transformed predictions and actual data for training, validation, and test sets.
+    - A tuple containing the inversely transformed predictions for training, validation, and test sets.
+      With dictionary inputs, each prediction set is a dictionary with the stock name as key.
+    """
+    multi_stock = isinstance(X_train, dict)
+    if not multi_stock:
+        X_train, X_validate, X_test, scaler = {None: X_train}, {None: X_validate}, {None: X_test}, {None: scaler}
+    splits = (X_train, X_validate, X_test)
+    blocks = [(stock, i) for stock in X_train for i in range(len(splits))]
+
+    X_all = np.concatenate([splits[i][stock] for stock, i in blocks], axis=0)
+    y_all_predict = model.predict(X_all, batch_size=batch_size, verbose=0)
+
+    # Split the predictions back into stocks and train, validation and test, inverse scaling each stock with its own scaler
+    split_points = np.cumsum([len(splits[i][stock]) for stock, i in blocks])[:-1]
+    predictions = tuple({} for _ in splits)
+    for (stock, i), y_predict in zip(blocks, np.split(y_all_predict, split_points)):
+        predictions[i][stock] = inverse_scale_target(scaler[stock], y_predict, target_index)
+
+    if not multi_stock:
+        return tuple(prediction[None] for prediction in predictions)
+    return predictions
+
+
+def compute_metrics(actual: np.ndarray, predicted: np.ndarray) -> dict[str, float]:
+    """
+    Returns the RMSE, MAE and MAPE (in percent) of the predictions.
     """
-    # Make predictions
-    y_train_predict = model.predict(X_train)
-    y_validate_predict = model.predict(X_validate)
-    y_test_predict = model.predict(X_test)
-
-    # Inverse transform actual data
-    y_train_inv = scaler.inverse_transform(np.concatenate((y_train.reshape(-1, 1), np.ones((len(y_train.reshape(-1, 1)), 5))), axis=1))[:, 0]
-    y_validate_inv = scaler.inverse_transform(np.concatenate((y_validate.reshape(-1, 1), np.ones((len(y_validate.reshape(-1, 1)), 5))), axis=1))[:, 0]
-    y_test_inv = scaler.inverse_transform(np.concatenate((y_test.reshape(-1, 1), np.ones((len(y_test.reshape(-1, 1)), 5))), axis=1))[:, 0]
-
-    # Inverse transform predicted data
-    y_train_predict_inv = scaler.inverse_transform(np.concatenate((y_train_predict, np.ones((len(y_train_predict), 5))), axis=1))[:, 0]
-    y_validate_predict_inv = scaler.inverse_transform(np.concatenate((y_validate_predict, np.ones((len(y_validate_predict), 5))), axis=1))[:, 0]
-    y_test_predict_inv = scaler.inverse_transform(np.concatenate((y_test_predict, np.ones((len(y_test_predict), 5))), axis=1))[:, 0]
-
-    return y_train_predict_inv, y_validate_predict_inv, y_test_predict_inv
+    errors = predicted - actual
+    return {
+        "rmse": float(np.sqrt(np.mean(errors ** 2))),
+        "mae": float(np.mean(np.abs(errors))),
+        "mape": float(np.mean(np.abs(errors / actual)) * 100),
+    }
@@ -0,0 +1,212 @@
+"""
+Instrumentation of model training, to see where the training time goes.
+
+TrainingProfiler is a Keras callback recording the wall time of every epoch and batch, the time
+spent in the train step versus between batches, the throughput in samples per second and the peak
+memory of the process. It can also capture a TensorFlow profiler trace over a range of
+epochs, to be opened in TensorBoard. The recorded profile is exported as JSON or CSV.
+"""
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from keras.callbacks import Callback
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+def peak_rss_mb() -> float:
+    """
+    Returns the peak resident set size of the process in MB, or NaN where it cannot be measured.
+    """
+    if resource is None:
+        return np.nan
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS and in kilobytes elsewhere
+    return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024
+
+
+def _without_nans(row: dict) -> dict:
+    return {name: None if isinstance(value, float) and np.isnan(value) else value for name, value in row.items()}
+
+
+class TrainingProfiler(Callback):
+    """
+    Records per-epoch and per-batch timings of a training run.
+
+    The compute time of a batch is the time of the train step, which with Keras 3 includes fetching
+    the batch from the input pipeline. Its overhead is the time between the end of the previous
+    batch, or the start of the epoch, and the start of the batch, spent in the other callbacks, such
+    as the progress reporting, and in the training loop. The epoch time also includes the validation.
+
+    Args:
+    - batch_size: The number of samples per batch, used for the throughput. train_model sets it
+    - n_samples: The number of training samples per epoch, used for the size of the last batch. train_model sets it
+    - record_batches: Whether a row is kept for every batch, besides the per-epoch totals
+    - trace_dir: Where the TensorFlow profiler trace is written, if trace_epochs is given
+    - trace_epochs: The (first, last) epochs, counted from 1, traced by the TensorFlow profiler
+    """
+    def __init__(self, batch_size: int = None, n_samples: int = None, record_batches: bool = True,
+                 trace_dir: str = "./profiles/", trace_epochs: tuple[int, int] = None):
+        super().__init__()
+        if trace_epochs is not None and not 1 <= trace_epochs[0] <= trace_epochs[1]:
+            raise ValueError("trace_epochs must be a (first, last) range of epochs starting from 1")
+        self.batch_size = batch_size
+        self.n_samples = n_samples
+        self.record_batches = record_batches
+        self.trace_dir = trace_dir
+        self.trace_epochs = trace_epochs
+        self.epochs = []
+        self.batches = []
+        self.total_time = 0.0
+        self._tracing = False
+
+    def _batch_samples(self, batch: int) -> float:
+        if self.batch_size is None:
+            return np.nan
+        if self.n_samples is None:
+            return self.batch_size
+        return max(0, min(self.batch_size, self.n_samples - batch * self.batch_size))
+
+    def _start_trace(self):
+        import tensorflow as tf
+        os.makedirs(self.trace_dir, exist_ok=True)
+        tf.profiler.experimental.start(self.trace_dir)
+        self._tracing = True
+
+    def _stop_trace(self):
+        import tensorflow as tf
+        tf.profiler.experimental.stop()
+        self._tracing = False
+
+    def on_train_begin(self, logs=None):
+        self.epochs = []
+        self.batches = []
+        self._train_start = time.perf_counter()
+
+    def on_epoch_begin(self, epoch, logs=None):
+        if self.trace_epochs is not None and epoch + 1 == self.trace_epochs[0]:
+            self._start_trace()
+        self._epoch_start = self._batch_end = time.perf_counter()
+        self._epoch_overhead = self._epoch_compute = 0.0
+        self._epoch_batches = 0
+        self._epoch_samples = 0.0
+
+    def on_train_batch_begin(self, batch, logs=None):
+        self._batch_start = time.perf_counter()
+
+    def on_train_batch_end(self, batch, logs=None):
+        now = time.perf_counter()
+        overhead = self._batch_start - self._batch_end
+        compute = now - self._batch_start
+        samples = self._batch_samples(batch)
+        self._epoch_overhead += overhead
+        self._epoch_compute += compute
+        self._epoch_batches += 1
+        self._epoch_samples += samples
+        self._batch_end = now
+        if self.record_batches:
+            self.batches.append({
+                "epoch": len(self.epochs) + 1,
+                "batch": batch + 1,
+                "overhead_s": overhead,
+                "compute_s": compute,
+                "samples": samples,
+                "samples_per_s": samples / (overhead + compute) if overhead + compute > 0 else np.nan,
+            })
+
+    def on_epoch_end(self, epoch, logs=None):
+        now = time.perf_counter()
+        logs = logs or {}
+        epoch_time = now - self._epoch_start
+        self.epochs.append({
+            "epoch": epoch + 1,
+            "time_s": epoch_time,
+            "overhead_s": self._epoch_overhead,
+            "compute_s": self._epoch_compute,
+            # Validation and the callbacks run after the last batch
+            "validation_s": now - self._batch_end,
+            "batches": self._epoch_batches,
+            "samples": self._epoch_samples,
+            "samples_per_s": self._epoch_samples / (self._epoch_overhead + self._epoch_compute) if self._epoch_batches else np.nan,
+            "peak_rss_mb": peak_rss_mb(),
+            "loss": float(logs["loss"]) if "loss" in logs else np.nan,
+            "val_loss": float(logs["val_loss"]) if "val_loss" in logs else np.nan,
+        })
+        if self._tracing and epoch + 1 >= self.trace_epochs[1]:
+            self._stop_trace()
+
+    def on_train_end(self, logs=None):
+        # Training may stop before the last traced epoch
+        if self._tracing:
+            self._stop_trace()
+        self.total_time = time.perf_counter() - self._train_start
+
+    def epochs_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.epochs).set_index("epoch") if self.epochs else pd.DataFrame()
+
+    def batches_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.batches).set_index(["epoch", "batch"]) if self.batches else pd.DataFrame()
+
+    def summary(self) -> dict[str, float]:
+        """
+        Returns the totals of the run: its time, mean epoch time, throughput, share of the batch time
+        spent outside the train step, and peak memory.
+        """
+        epochs = self.epochs_frame()
+        if epochs.empty:
+            return {"epochs": 0, "total_s": self.total_time}
+        batch_time = epochs["overhead_s"].sum() + epochs["compute_s"].sum()
+        return {
+            "epochs": len(epochs),
+            "total_s": self.total_time,
+            "mean_epoch_s": float(epochs["time_s"].mean()),
+            "samples_per_s": float(epochs["samples"].sum() / batch_time) if batch_time > 0 else np.nan,
+            "overhead_fraction": float(epochs["overhead_s"].sum() / batch_time) if batch_time > 0 else np.nan,
+            "peak_rss_mb": float(epochs["peak_rss_mb"].max()),
+        }
+
+    def to_dict(self) -> dict:
+        """
+        Returns the summary, epoch rows and batch rows of the profile, see profile_frames.
+        """
+        return {"summary": self.summary(), "epochs": list(self.epochs), "batches": list(self.batches)}
+
+    def to_json(self, path: str) -> None:
+        """
+        Writes the profile to a JSON file, see to_dict.
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        profile = self.to_dict()
+        # NaNs are written as null, so the file stays valid JSON
+        profile["summary"] = _without_nans(profile["summary"])
+        profile["epochs"] = [_without_nans(row) for row in profile["epochs"]]
+        profile["batches"] = [_without_nans(row) for row in profile["batches"]]
+        with open(path, "w") as f:
+            json.dump(profile, f)
+
+    def to_csv(self, directory: str) -> None:
+        """
+        Writes the epoch and batch rows of the profile to epochs.csv and batches.csv in directory.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.epochs_frame().to_csv(os.path.join(directory, "epochs.csv"))
+        if self.record_batches:
+            self.batches_frame().to_csv(os.path.join(directory, "batches.csv"))
+
+
+def profile_frames(profile: dict) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Returns the epoch and batch rows of a profile, as returned by TrainingProfiler.to_dict or read
+    back from its JSON file, as DataFrames.
+    """
+    epochs = pd.DataFrame(profile.get("epochs", []))
+    batches = pd.DataFrame(profile.get("batches", []))
+    return (epochs.set_index("epoch") if not epochs.empty else epochs,
+            batches.set_index(["epoch", "batch"]) if not batches.empty else batches)
@@ -0,0 +1,146 @@
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import tensorflow as tf
+
+try:
+    from ai_edge_litert.interpreter import Interpreter
+except ImportError:
+    # tf.lite.Interpreter is deprecated in favour of the ai_edge_litert package, but still works
+    Interpreter = tf.lite.Interpreter
+
+from src.data_handling import inverse_scale_target
+
+QUANTIZATION_MODES = ("none", "dynamic", "float16")
+
+
+def export_tflite(model, path: str = None, n_features: int = 1, quantization: str = "dynamic", batch_size: int = 1) -> bytes:
+    """
+    Converts a trained LSTMForecasting model to TensorFlow Lite for CPU serving.
+
+    The TFLite converter needs static shapes for the LSTM loop, so the model is exported with a
+    fixed batch size, see TFLiteForecasting for predicting any number of sequences.
+
+    Args:
+    - model: A trained LSTMForecasting model
+    - path: Where the .tflite file is written. Nothing is written if None
+    - n_features: The number of features of each timestep
+    - quantization: "none" for float32, "dynamic" for dynamic-range int8 weights, or "float16" for float16 weights
+    - batch_size: The fixed batch size of the exported model
+
+    Returns:
+    - The serialized TFLite model
+    """
+    if quantization not in QUANTIZATION_MODES:
+        raise ValueError(f"quantization must be one of {', '.join(QUANTIZATION_MODES)}")
+
+    saved_model_dir = tempfile.mkdtemp(prefix="ltsm_saved_model_")
+    try:
+        model.export(
+            saved_model_dir,
+            input_signature=[tf.TensorSpec((batch_size, model.input_size, n_features), tf.float32)],
+            verbose=False
+        )
+        converter = tf.lite.TFLiteConverter.from_saved_model(saved_model_dir)
+        if quantization != "none":
+            converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        if quantization == "float16":
+            converter.target_spec.supported_types = [tf.float16]
+        tflite_model = converter.convert()
+    finally:
+        shutil.rmtree(saved_model_dir, ignore_errors=True)
+
+    if path is not None:
+        with open(path, "wb") as f:
+            f.write(tflite_model)
+    return tflite_model
+
+
+class TFLiteForecasting:
+    """
+    Runs a model exported with export_tflite. Its predict method accepts the arguments of
+    model.predict, so it can be used in its place, e.g. with predictions.predict.
+    """
+    def __init__(self, tflite_model: bytes | str):
+        if isinstance(tflite_model, str):
+            self.interpreter = Interpreter(model_path=tflite_model)
+        else:
+            self.interpreter = Interpreter(model_content=tflite_model)
+        self.interpreter.allocate_tensors()
+        self.input = self.interpreter.get_input_details()[0]
+        self.output = self.interpreter.get_output_details()[0]
+        self.batch_size = self.input["shape"][0]
+
+    def predict(self, X: np.ndarray, batch_size=None, verbose=0) -> np.ndarray:
+        """
+        Predicts the next value of each sequence, in chunks of the exported batch size.
+        The batch_size and verbose arguments are ignored.
+        """
+        X = np.asarray(X, dtype=np.float32)
+        outputs = []
+        for start in range(0, len(X), self.batch_size):
+            chunk = X[start:start + self.batch_size]
+            n_sequences = len(chunk)
+            if n_sequences < self.batch_size:
+                # The last chunk is padded to the fixed batch size
+                chunk = np.concatenate([chunk, np.zeros((self.batch_size - n_sequences,) + chunk.shape[1:], dtype=np.float32)])
+            self.interpreter.set_tensor(self.input["index"], chunk)
+            self.interpreter.invoke()
+            outputs.append(self.interpreter.get_tensor(self.output["index"])[:n_sequences])
+        return np.concatenate(outputs)
+
+
+def quantization_report(
+        model,
+        X_test: np.ndarray,
+        y_test: np.ndarray,
+        scaler=None,
+        modes: tuple[str, ...] = QUANTIZATION_MODES,
+        batch_size: int = 1
+    ) -> pd.DataFrame:
+    """
+    Compares the TFLite exports of a model against the float Keras model on the test split.
+
+    Args:
+    - model: A trained LSTMForecasting model
+    - X_test, y_test: The test split returned by preprocess_data
+    - scaler: If given, errors are reported in the original units instead of the scaled ones
+    - modes: The quantization modes to compare
+    - batch_size: The fixed batch size of the exports
+
+    Returns:
+    - A DataFrame indexed by mode with the model size in bytes, the test RMSE, the RMSE delta and the
+      largest prediction difference against the Keras model, and the mean latency per sequence in ms
+    """
+    def to_units(values):
+        return np.ravel(values) if scaler is None else inverse_scale_target(scaler, values)
+
+    actual = to_units(y_test)
+    reference = to_units(model.predict(X_test, verbose=0))
+    reference_rmse = float(np.sqrt(np.mean((reference - actual) ** 2)))
+
+    rows = {"keras": {
+        "size_bytes": None,
+        "rmse": reference_rmse,
+        "rmse_delta": 0.0,
+        "max_abs_diff": 0.0,
+        "latency_ms": None,
+    }}
+    for mode in modes:
+        tflite_model = export_tflite(model, n_features=X_test.shape[-1], quantization=mode, batch_size=batch_size)
+        forecaster = TFLiteForecasting(tflite_model)
+        start = time.perf_counter()
+        predictions = to_units(forecaster.predict(X_test))
+        latency = (time.perf_counter() - start) / len(X_test)
+        rmse = float(np.sqrt(np.mean((predictions - actual) ** 2)))
+        rows[mode] = {
+            "size_bytes": len(tflite_model),
+            "rmse": rmse,
+            "rmse_delta": rmse - reference_rmse,
+            "max_abs_diff": float(np.max(np.abs(predictions - reference))),
+            "latency_ms": latency * 1000,
+        }
+    return pd.DataFrame.from_dict(rows, orient="index").rename_axis("model")
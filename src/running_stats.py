@@ -0,0 +1,137 @@
+"""
+Summary statistics of a price series that are updated with the new bars of every data refresh,
+instead of being recomputed over the whole history.
+"""
+import numpy as np
+import pandas as pd
+
+
+class RunningStats:
+    """
+    Running count, mean, variance, min, max and null count of a series, along with the same
+    statistics over its last window bars.
+
+    The mean and variance follow Welford's algorithm, merging each batch of new bars at once with
+    the pairwise update of Chan et al., so an update costs O(new bars + window) whatever the
+    length of the history.
+    """
+    def __init__(self, window: int = 20):
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        self.window = window
+        self.reset()
+
+    def reset(self) -> None:
+        self.count = 0
+        self.nulls = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = np.nan
+        self.max = np.nan
+        self.first_index = None
+        self.last_index = None
+        # The last window values, nulls included, for the rolling statistics
+        self._tail = np.empty(0)
+
+    def update(self, series: pd.Series) -> "RunningStats":
+        """
+        Adds the bars of series that come after the last bar already seen, so the whole refreshed
+        series can be passed on every call. If series no longer starts with the first bar seen, its
+        history was rewritten and the statistics are computed again from scratch.
+
+        Args:
+        - series: The values to summarize, with a sorted index
+
+        Returns:
+        - The updated statistics
+        """
+        if len(series) == 0:
+            return self
+        if self.first_index is not None and series.index[0] != self.first_index:
+            self.reset()
+        if self.last_index is None:
+            new = series
+        else:
+            # The index is sorted, so the new bars are found with a binary search
+            start = series.index.searchsorted(self.last_index, side="right")
+            if start > 0 and series.index[start - 1] == self.last_index and not self._same(series.iloc[start - 1], self._tail[-1]):
+                # The last bar seen was corrected, e.g. it was stored before the close, so its old
+                # value is taken out of the statistics and the new one added with the new bars
+                if not self._remove(self._tail[-1]):
+                    self.reset()
+                    return self.update(series)
+                self._tail = self._tail[:-1]
+                start -= 1
+            new = series.iloc[start:]
+        if len(new) == 0:
+            return self
+
+        values = new.to_numpy(dtype=float)
+        valid = values[~np.isnan(values)]
+        self.nulls += len(values) - len(valid)
+        if len(valid):
+            n = len(valid)
+            batch_mean = valid.mean()
+            batch_m2 = ((valid - batch_mean) ** 2).sum()
+            total = self.count + n
+            delta = batch_mean - self.mean
+            self.mean += delta * n / total
+            self._m2 += batch_m2 + delta ** 2 * self.count * n / total
+            self.count = total
+            self.min = np.fmin(self.min, valid.min())
+            self.max = np.fmax(self.max, valid.max())
+
+        self._tail = np.concatenate([self._tail, values])[-self.window:]
+        if self.first_index is None:
+            self.first_index = series.index[0]
+        self.last_index = new.index[-1]
+        return self
+
+    @staticmethod
+    def _same(a, b) -> bool:
+        return a == b or (np.isnan(a) and np.isnan(b))
+
+    def _remove(self, value: float) -> bool:
+        # Reverse Welford update. The min and max cannot be undone, so a value equal to either is
+        # not removed and False is returned, the statistics then having to be computed again
+        if np.isnan(value):
+            self.nulls -= 1
+            return True
+        if value == self.min or value == self.max:
+            return False
+        total = self.count - 1
+        mean = (self.count * self.mean - value) / total
+        self._m2 -= (value - mean) * (value - self.mean)
+        self.mean = mean
+        self.count = total
+        return True
+
+    @property
+    def variance(self) -> float:
+        # Sample variance, like pandas
+        return self._m2 / (self.count - 1) if self.count > 1 else np.nan
+
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(self.variance))
+
+    def summary(self) -> dict[str, float]:
+        """
+        Returns the mean, standard deviation, min, max and number of missing values of every bar seen.
+        """
+        return {"mean": self.mean if self.count else np.nan, "std": self.std, "min": self.min, "max": self.max, "missing": self.nulls}
+
+    def rolling_summary(self) -> dict[str, float]:
+        """
+        Returns the mean, standard deviation, min, max and number of missing values of the last window bars.
+        """
+        tail = self._tail[~np.isnan(self._tail)]
+        if len(tail) == 0:
+            return {"mean": np.nan, "std": np.nan, "min": np.nan, "max": np.nan, "missing": len(self._tail)}
+        return {
+            "mean": float(tail.mean()),
+            "std": float(tail.std(ddof=1)) if len(tail) > 1 else np.nan,
+            "min": float(tail.min()),
+            "max": float(tail.max()),
+            "missing": len(self._tail) - len(tail),
+        }
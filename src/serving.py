@@ -0,0 +1,59 @@
+import numpy as np
+import tensorflow as tf
+
+
+def make_serving_function(model, n_features: int = 1, jit_compile: bool = False):
+    """
+    Compiles the forward pass of an LSTMForecasting model for a fixed input signature of
+    (None, window, features), where window is the model's input_size.
+
+    The Python branches of LSTMForecasting.call on the input rank are resolved once when the
+    function is traced, and since the batch dimension is left unknown, calls with any batch size
+    reuse the same graph instead of retracing.
+
+    Args:
+    - model: A trained LSTMForecasting model
+    - n_features: The number of features of each timestep
+    - jit_compile: Whether to compile the graph with XLA
+
+    Returns:
+    - A tf.function mapping a float32 tensor of sequences to the predictions
+    """
+    @tf.function(
+        input_signature=[tf.TensorSpec(shape=(None, model.input_size, n_features), dtype=tf.float32)],
+        jit_compile=jit_compile
+    )
+    def serve(x):
+        return model(x, training=False)
+
+    return serve
+
+
+class ServingModel:
+    """
+    Wraps a trained model with a compiled serving function, to run repeated predictions without
+    the per-call overhead of model.predict.
+
+    Its predict method accepts the arguments of model.predict, so it can be used in its place,
+    e.g. with predictions.predict.
+    """
+    def __init__(self, model, n_features: int = 1, jit_compile: bool = False):
+        self.model = model
+        self.serve = make_serving_function(model, n_features, jit_compile)
+
+    def predict(self, X: np.ndarray, batch_size: int = 1024, verbose=0) -> np.ndarray:
+        """
+        Predicts the next value of each sequence.
+
+        Args:
+        - X: Input sequences of shape (n_sequences, window, features)
+        - batch_size: Maximum number of sequences per forward pass, bounding the memory used
+        - verbose: Unused, accepted for compatibility with model.predict
+
+        Returns:
+        - The predictions as a numpy array
+        """
+        X = np.asarray(X, dtype=np.float32)
+        if len(X) <= batch_size:
+            return self.serve(X).numpy()
+        return np.concatenate([self.serve(X[i:i + batch_size]).numpy() for i in range(0, len(X), batch_size)])
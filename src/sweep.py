@@ -0,0 +1,213 @@
+import itertools
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+import tensorflow as tf
+from keras.callbacks import Callback
+
+from src.create_model import LSTMForecasting
+from src.train_model import train_model
+
+# Values used for the parameters a search space leaves out, matching the Model page defaults
+DEFAULT_PARAMS = {
+    "lstm_num_layers": 2,
+    "lstm_hidden_size": 50,
+    "linear_num_layers": 2,
+    "linear_hidden_size": 10,
+    "epochs": 150,
+    "batch_size": 16,
+    "learning_rate": 0.001,
+}
+
+
+def grid_search_space(space: dict[str, list]) -> list[dict]:
+    """
+    Expands a search space into every combination of its values.
+
+    Args:
+    - space: Maps each parameter of DEFAULT_PARAMS to the list of values to try
+
+    Returns:
+    - A list of trial parameters
+    """
+    unknown = set(space) - set(DEFAULT_PARAMS)
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters: {', '.join(sorted(unknown))}")
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+
+
+def random_search_space(space: dict[str, list | tuple], n_trials: int, seed: int = None) -> list[dict]:
+    """
+    Samples trials at random from a search space.
+
+    Args:
+    - space: Maps each parameter of DEFAULT_PARAMS to either a list of values to choose from, or a
+      (low, high) tuple sampled uniformly for integers and log-uniformly for floats
+    - n_trials: The number of trials to sample
+    - seed: The random seed
+
+    Returns:
+    - A list of trial parameters
+    """
+    unknown = set(space) - set(DEFAULT_PARAMS)
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters: {', '.join(sorted(unknown))}")
+    rng = random.Random(seed)
+
+    def sample(values):
+        if isinstance(values, list):
+            return rng.choice(values)
+        low, high = values
+        if isinstance(low, int) and isinstance(high, int):
+            return rng.randint(low, high)
+        return float(np.exp(rng.uniform(np.log(low), np.log(high))))
+
+    return [{name: sample(values) for name, values in space.items()} for _ in range(n_trials)]
+
+
+class MedianPruningCallback(Callback):
+    """
+    Stops a trial whose val_loss is worse than the median val_loss of the other trials at the same
+    epoch. The val_loss of every trial is shared through a dict proxy, so trials running in other
+    processes are taken into account.
+    """
+    def __init__(self, shared_history, lock, warmup_epochs=5, min_trials=2):
+        super().__init__()
+        self.shared_history = shared_history
+        self.lock = lock
+        self.warmup_epochs = warmup_epochs
+        self.min_trials = min_trials
+        self.pruned = False
+
+    def on_epoch_end(self, epoch, logs=None):
+        val_loss = logs["val_loss"]
+        with self.lock:
+            others = self.shared_history.get(epoch, [])
+            # Reassigned rather than appended to, so the change reaches the dict proxy
+            self.shared_history[epoch] = others + [val_loss]
+        if epoch >= self.warmup_epochs and len(others) >= self.min_trials and val_loss > np.median(others):
+            self.pruned = True
+            self.model.stop_training = True
+
+
+# Per worker state, set once by _init_worker instead of being sent with every trial
+_worker = {}
+
+
+def limit_threads(threads_per_worker: int) -> None:
+    """
+    Limits the TensorFlow thread pools of a worker process, so that concurrent workers do not
+    oversubscribe the CPU. It must run before the worker executes any TensorFlow op.
+    """
+    tf.config.threading.set_intra_op_parallelism_threads(threads_per_worker)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+
+def _init_worker(data, shared_history, lock, threads_per_worker, warmup_epochs, min_trials):
+    limit_threads(threads_per_worker)
+    _worker.update(
+        data=data,
+        shared_history=shared_history,
+        lock=lock,
+        warmup_epochs=warmup_epochs,
+        min_trials=min_trials,
+    )
+
+
+def _run_trial(params):
+    X_train, y_train, X_val, y_val = _worker["data"]
+    params = {**DEFAULT_PARAMS, **params}
+    start_time = time.time()
+    model = LSTMForecasting(
+        input_size=X_train.shape[1],
+        lstm_hidden_size=params["lstm_hidden_size"],
+        lstm_num_layers=params["lstm_num_layers"],
+        linear_num_layers=params["linear_num_layers"],
+        linear_hidden_size=params["linear_hidden_size"],
+        output_size=1
+    )
+    pruning_callback = MedianPruningCallback(
+        _worker["shared_history"], _worker["lock"], _worker["warmup_epochs"], _worker["min_trials"]
+    )
+    _, history = train_model(
+        model,
+        learning_rate=params["learning_rate"],
+        epochs=params["epochs"],
+        batch_size=params["batch_size"],
+        X_train=X_train,
+        y_train=y_train,
+        X_val=X_val,
+        y_val=y_val,
+        callbacks=[pruning_callback]
+    )
+    return {
+        "best_val_loss": float(np.min(history["val_loss"])),
+        "epochs_run": len(history["loss"]),
+        "pruned": pruning_callback.pruned,
+        "duration": time.time() - start_time,
+    }
+
+
+def run_sweep(
+        trials: list[dict],
+        X_train: np.ndarray,
+        y_train: np.ndarray,
+        X_val: np.ndarray,
+        y_val: np.ndarray,
+        max_workers: int = None,
+        threads_per_worker: int = 1,
+        warmup_epochs: int = 5,
+        min_trials: int = 2
+    ) -> pd.DataFrame:
+    """
+    Trains one LSTMForecasting model per trial in parallel worker processes and ranks the trials.
+
+    Args:
+    - trials: The trial parameters, see grid_search_space and random_search_space
+    - X_train, y_train, X_val, y_val: The preprocessed training and validation data
+    - max_workers: The number of worker processes. Defaults to the CPU count divided by threads_per_worker
+    - threads_per_worker: The number of TensorFlow threads of each worker
+    - warmup_epochs: Epochs every trial runs before it can be pruned
+    - min_trials: Number of other trials that must have reached an epoch before pruning at that epoch
+
+    Returns:
+    - A leaderboard DataFrame with one row per trial, sorted by best validation loss. Trials that
+      failed have their error message in the "error" column
+    """
+    if not trials:
+        raise ValueError("At least one trial is required")
+    if threads_per_worker < 1:
+        raise ValueError("threads_per_worker must be at least 1")
+    if max_workers is None:
+        max_workers = max(1, (os.cpu_count() or 1) // threads_per_worker)
+
+    # TensorFlow is not fork-safe, so workers are started from a fresh interpreter
+    context = multiprocessing.get_context("spawn")
+    with context.Manager() as manager:
+        shared_history = manager.dict()
+        lock = manager.Lock()
+        with ProcessPoolExecutor(
+            max_workers=min(max_workers, len(trials)),
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=((X_train, y_train, X_val, y_val), shared_history, lock, threads_per_worker, warmup_epochs, min_trials)
+        ) as executor:
+            futures = {executor.submit(_run_trial, params): (trial, params) for trial, params in enumerate(trials)}
+            rows = []
+            for future in as_completed(futures):
+                trial, params = futures[future]
+                row = {"trial": trial, **{**DEFAULT_PARAMS, **params}}
+                try:
+                    row.update(future.result(), error=None)
+                except Exception as e:
+                    row.update(best_val_loss=np.inf, error=str(e))
+                rows.append(row)
+
+    leaderboard = pd.DataFrame(rows).sort_values("best_val_loss", kind="stable").reset_index(drop=True)
+    return leaderboard
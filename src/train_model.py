@@ -1,10 +1,23 @@
 from keras import optimizers
-from keras.callbacks import ModelCheckpoint, Callback
+from keras.callbacks import ModelCheckpoint, Callback, EarlyStopping, ReduceLROnPlateau
 from keras.models import Sequential
 from keras.models import load_model
 
+import logging
+import os
+import shutil
+import tempfile
+import time
+
 import numpy as np
 import streamlit as st
+import tensorflow as tf
+
+from src.data_handling import concatenate_windows
+from src.profiling import TrainingProfiler
+
+BEST_WEIGHTS_MODES = ("memory", "checkpoint")
+
 # Custom callback to update Streamlit during training
 class StreamlitProgressCallback(Callback):
     def __init__(self, total_epochs):
@@ -20,6 +33,118 @@ class StreamlitProgressCallback(Callback):
         self.progress_bar.progress(progress_percentage)
         self.status_text.text(f"Epoch {self.epoch_counter}/{self.total_epochs} - Loss: {logs['loss']:.4f}, Val Loss: {logs['val_loss']:.4f}")
 
+# Callback reporting progress through logging, for training outside Streamlit
+class LoggingProgressCallback(Callback):
+    def __init__(self, total_epochs, logger=None):
+        super().__init__()
+        self.total_epochs = total_epochs
+        self.logger = logger or logging.getLogger(__name__)
+
+    def on_epoch_end(self, epoch, logs=None):
+        self.logger.info(f"Epoch {epoch + 1}/{self.total_epochs} - Loss: {logs['loss']:.4f}, Val Loss: {logs['val_loss']:.4f}")
+
+
+# Callback keeping a copy of the weights of the epoch with the lowest validation loss, and
+# restoring them at the end of the training
+class BestWeightsCallback(Callback):
+    def __init__(self, monitor="val_loss"):
+        super().__init__()
+        self.monitor = monitor
+        self.best = np.inf
+        self.best_epoch = None
+        self.best_weights = None
+
+    def on_epoch_end(self, epoch, logs=None):
+        current = (logs or {}).get(self.monitor)
+        if current is not None and current < self.best:
+            self.best = current
+            self.best_epoch = epoch
+            # get_weights returns NumPy copies, which later updates do not modify
+            self.best_weights = self.model.get_weights()
+
+    def on_train_end(self, logs=None):
+        if self.best_weights is not None:
+            self.model.set_weights(self.best_weights)
+
+
+# Callback stopping the training once it spends a wall-clock budget, or when the next epoch would exceed it
+class TimeBudgetCallback(Callback):
+    def __init__(self, seconds):
+        super().__init__()
+        self.seconds = seconds
+        self.stopped_epoch = None
+
+    def on_train_begin(self, logs=None):
+        self.start_time = time.monotonic()
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self.epoch = epoch
+        self.epoch_start_time = time.monotonic()
+
+    def on_train_batch_end(self, batch, logs=None):
+        # Stops in the middle of an epoch once the budget is spent
+        if time.monotonic() - self.start_time > self.seconds:
+            self.stopped_epoch = self.epoch
+            self.model.stop_training = True
+
+    def on_epoch_end(self, epoch, logs=None):
+        now = time.monotonic()
+        # Stops when another epoch as long as the last one would not fit in the budget
+        if now - self.start_time + (now - self.epoch_start_time) > self.seconds:
+            self.stopped_epoch = epoch
+            self.model.stop_training = True
+
+
+def default_progress_callback(total_epochs) -> Callback:
+    """
+    Returns a Streamlit progress bar when running inside a Streamlit app, and a logging reporter otherwise.
+    """
+    if st.runtime.exists():
+        return StreamlitProgressCallback(total_epochs)
+    return LoggingProgressCallback(total_epochs)
+
+
+def make_windowed_dataset(
+            series: np.ndarray,
+            sequence_size: int,
+            batch_size: int = 16,
+            shuffle_buffer: int = None,
+            seed: int = None
+    ) -> tf.data.Dataset:
+    """
+    Builds a dataset yielding the same (X, y) sequences as construct_lstm_data, but producing
+    them lazily batch by batch, so only the series itself is kept in memory.
+
+    Args:
+    - series: The scaled series of shape (n_samples, n_features)
+    - sequence_size: Number of previous time steps used to predict the next one
+    - batch_size: The number of sequences per batch
+    - shuffle_buffer: If given, sequences are shuffled within a buffer of this many sequences
+    - seed: The seed of the shuffle
+
+    Returns:
+    - A batched and prefetched tf.data.Dataset of (X, y) pairs
+    """
+    series = np.asarray(series, dtype=np.float32)
+    n_sequences = series.shape[0] - sequence_size
+    if sequence_size <= 0 or n_sequences <= 0:
+        raise ValueError("sequence_size must be positive and less than the number of samples in series.")
+
+    series = tf.constant(series)
+    offsets = tf.range(sequence_size, dtype=tf.int64)
+
+    def gather_sequences(start):
+        # start has shape (batch,), so every sequence of the batch is gathered in one op
+        X = tf.gather(series, start[:, None] + offsets)
+        y = tf.gather(series, start + sequence_size)
+        return X, y
+
+    # Only the start index of each sequence goes through the shuffle and batching
+    dataset = tf.data.Dataset.range(n_sequences)
+    if shuffle_buffer:
+        dataset = dataset.shuffle(shuffle_buffer, seed=seed)
+    dataset = dataset.batch(batch_size).map(gather_sequences, num_parallel_calls=tf.data.AUTOTUNE)
+    return dataset.prefetch(tf.data.AUTOTUNE)
 
 def train_model(
             model: Sequential,
@@ -29,7 +154,20 @@ def train_model(
             X_train: np.ndarray = None,
             y_train: np.ndarray = None,
             X_val: np.ndarray = None,
-            y_val: np.ndarray = None
+            y_val: np.ndarray = None,
+            train_dataset: tf.data.Dataset = None,
+            val_dataset: tf.data.Dataset = None,
+            model_path: str = None,
+            callbacks: list[Callback] = None,
+            progress_callback: Callback = None,
+            early_stopping_patience: int = None,
+            restore_best_weights: bool = True,
+            reduce_lr_patience: int = None,
+            reduce_lr_factor: float = 0.5,
+            min_learning_rate: float = 1e-6,
+            time_budget: float = None,
+            best_weights: str = "memory",
+            profiler: TrainingProfiler = None
     ) -> tuple[Sequential, dict]:
     """
     Trains a model using the given parameters.
@@ -38,21 +176,61 @@ def train_model(
     - model: The model to be trained
     - learning_rate: The learning rate for the optimizer
     - epochs: The number of epochs to train for
+    - batch_size: The batch size, unused when train_dataset is given
     - X_train: The input data for training
     - y_train: The labels for the training data
     - X_val: The input data for validation
     - y_val: The labels for the validation data
+      X_train, y_train, X_val and y_val can also be dictionaries with the stock name as key, as returned by
+      preprocess_data for several stocks. The stocks are then concatenated to fit a single global model
+    - train_dataset: Batched (X, y) dataset used instead of X_train and y_train, see make_windowed_dataset
+    - val_dataset: Batched (X, y) dataset used instead of X_val and y_val
+    - model_path: Where the best model is saved once training ends. If None, the model is not saved
+      in "memory" mode, and is checkpointed to a private temporary file that is removed after
+      training in "checkpoint" mode, so concurrent trainings never overwrite each other
+    - callbacks: Extra Keras callbacks run during training
+    - progress_callback: Callback reporting the training progress, defaults to default_progress_callback(epochs)
+    - early_stopping_patience: If given, training stops after this many epochs without val_loss improvement
+    - restore_best_weights: Whether the returned model has the weights of the epoch with the lowest
+      val_loss. If False, it has the weights of the last epoch run
+    - reduce_lr_patience: If given, the learning rate is multiplied by reduce_lr_factor after this many
+      epochs without val_loss improvement, down to min_learning_rate
+    - reduce_lr_factor: See reduce_lr_patience
+    - min_learning_rate: See reduce_lr_patience
+    - time_budget: If given, training stops at the end of the first batch past this many seconds of
+      wall-clock time, followed by the validation of that epoch, or at the end of an epoch when
+      another epoch as long would exceed the budget
+    - best_weights: How the weights of the best epoch are kept when restore_best_weights is True.
+      "memory" snapshots them in memory and restores them into the model, "checkpoint" saves the
+      model to model_path on every improvement and loads the best one back from disk
+    - profiler: Optional TrainingProfiler recording the timings of the training, see src.profiling
 
     Returns:
     - The trained model
-    - A dictionary of the training history
+    - A dictionary of the training history. Its "epoch" entry lists the epochs actually run, which
+      can be fewer than epochs when training stopped early
     """
     if model is None:
         raise ValueError("Model cannot be null")
-    if X_train is None or y_train is None:
-        raise ValueError("Training data cannot be null")
-    if X_val is None or y_val is None:
-        raise ValueError("Validation data cannot be null")
+    if best_weights not in BEST_WEIGHTS_MODES:
+        raise ValueError(f"best_weights must be one of {', '.join(BEST_WEIGHTS_MODES)}")
+    if train_dataset is not None:
+        if val_dataset is None:
+            raise ValueError("Validation dataset cannot be null")
+        fit_data = dict(x=train_dataset, validation_data=val_dataset)
+    else:
+        if X_train is None or y_train is None:
+            raise ValueError("Training data cannot be null")
+        if X_val is None or y_val is None:
+            raise ValueError("Validation data cannot be null")
+        if isinstance(X_train, dict):
+            # model.fit shuffles the sequences every epoch, which mixes the stocks in each batch
+            X_train, y_train = concatenate_windows(X_train, y_train)
+            X_val, y_val = concatenate_windows(X_val, y_val)
+        fit_data = dict(x=X_train, y=y_train, validation_data=(X_val, y_val), batch_size=batch_size)
+        if profiler is not None:
+            profiler.batch_size = profiler.batch_size or batch_size
+            profiler.n_samples = profiler.n_samples or len(X_train)
 
     # Define loss function, metrics, and optimizer
     loss_fn = "mean_squared_error"
@@ -60,31 +238,68 @@ def train_model(
     optimizer = optimizers.Adam(learning_rate=learning_rate)
     model.compile(optimizer=optimizer, loss=loss_fn)#, metrics=metrics_list)
 
-    # Set model checkpoint path
-    model_location = "./models/"
-    model_name = "model.keras"
-    best_model_checkpoint_callback = ModelCheckpoint(
-        model_location + model_name,
-        monitor="val_loss",
-        save_best_only=True,
-        mode="min",
-        verbose=0
-    )
-    streamlit_progress_callback = StreamlitProgressCallback(epochs)
+    # Keep track of the best model
+    checkpoint_dir = None
+    best_model_callbacks = []
+    if restore_best_weights and best_weights == "memory":
+        best_model_callbacks.append(BestWeightsCallback(monitor="val_loss"))
+    elif restore_best_weights:
+        if model_path is None:
+            checkpoint_dir = tempfile.mkdtemp(prefix="ltsm_checkpoint_")
+            checkpoint_path = os.path.join(checkpoint_dir, "model.keras")
+        else:
+            checkpoint_path = model_path
+        best_model_callbacks.append(ModelCheckpoint(
+            checkpoint_path,
+            monitor="val_loss",
+            save_best_only=True,
+            mode="min",
+            verbose=0
+        ))
+    if progress_callback is None:
+        progress_callback = default_progress_callback(epochs)
+
+    # Convergence controls
+    convergence_callbacks = []
+    if early_stopping_patience is not None:
+        convergence_callbacks.append(EarlyStopping(
+            monitor="val_loss",
+            patience=early_stopping_patience,
+            restore_best_weights=restore_best_weights,
+            mode="min"
+        ))
+    if reduce_lr_patience is not None:
+        convergence_callbacks.append(ReduceLROnPlateau(
+            monitor="val_loss",
+            factor=reduce_lr_factor,
+            patience=reduce_lr_patience,
+            min_lr=min_learning_rate,
+            mode="min"
+        ))
+    if time_budget is not None:
+        convergence_callbacks.append(TimeBudgetCallback(time_budget))
 
 
     # Train the model
     try:
         history = model.fit(
-            x=X_train,
-            y=y_train,
-            validation_data=(X_val, y_val),
+            **fit_data,
             epochs=epochs,
-            batch_size=batch_size,
-            callbacks=[best_model_checkpoint_callback,streamlit_progress_callback]
+            callbacks=([profiler] if profiler is not None else []) + best_model_callbacks + [progress_callback] + convergence_callbacks + list(callbacks or [])
         )
+        if not restore_best_weights or best_weights == "memory":
+            # The model has the weights of the last epoch, or the best weights restored at the end of the training
+            best_model = model
+            if model_path is not None:
+                best_model.save(model_path)
+        else:
+            # Load the best performing model
+            best_model = load_model(checkpoint_path)
     except Exception as e:
         raise RuntimeError(f"Error occurred during model training: {str(e)}")
-    # Load the best performing model
-    best_model = load_model(model_location + model_name)
-    return best_model, history.history
+    finally:
+        if checkpoint_dir is not None:
+            shutil.rmtree(checkpoint_dir, ignore_errors=True)
+    history = dict(history.history)
+    history["epoch"] = [epoch + 1 for epoch in range(len(history["loss"]))]
+    return best_model, history
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.backtest import _fold_data, walk_forward_backtest, walk_forward_folds
+from src.data_handling import construct_lstm_data, preprocess_data
+
+PARAMS = {"lstm_num_layers": 1, "lstm_hidden_size": 4, "linear_num_layers": 1, "linear_hidden_size": 4, "epochs": 2}
+
+@pytest.fixture
+def data():
+    index = pd.bdate_range("2022-01-03", periods=120)
+    return pd.DataFrame({"Close": 100 + np.cumsum(np.random.default_rng(0).normal(0, 1, 120))}, index=index)
+
+@pytest.mark.parametrize("mode", ["expanding", "sliding"])
+def test_folds_are_chronological_and_disjoint(mode):
+    folds = walk_forward_folds(100, n_folds=4, val_size=0.1, test_size=0.1, mode=mode)
+    assert len(folds) == 4
+    assert folds[-1][2].stop == 100
+    for train, val, test in folds:
+        assert train.stop == val.start and val.stop == test.start
+        assert test.stop - test.start == 10 and val.stop - val.start == 10
+    for previous, fold in zip(folds, folds[1:]):
+        assert fold[2].start == previous[2].stop
+        if mode == "expanding":
+            assert fold[0].start == 0
+        else:
+            assert fold[0].stop - fold[0].start == previous[0].stop - previous[0].start
+
+def test_invalid_folds():
+    with pytest.raises(ValueError):
+        walk_forward_folds(20, n_folds=10)
+    with pytest.raises(ValueError):
+        walk_forward_folds(100, mode="anchored")
+
+def test_fold_data_matches_preprocess_data(data):
+    series = data.to_numpy()
+    windows, _ = construct_lstm_data(series, 5, copy=False)
+    train, val, test = walk_forward_folds(len(windows), n_folds=2)[0]
+    (X_train, y_train, X_val, y_val, _, _), scaler = _fold_data(series, windows, (train, val, test), 5, 0)
+
+    # Same training sequences and scaling as preprocess_data on the rows of the training split
+    expected = preprocess_data(data.iloc[:train.stop + 5], data.iloc[:train.stop + 5], data.iloc[:train.stop + 5], 5)
+    np.testing.assert_allclose(X_train, expected[0], rtol=1e-5)
+    np.testing.assert_allclose(y_train, expected[1], rtol=1e-5)
+    # Validation sequences start right after the training ones, with their inputs taken from the training rows
+    np.testing.assert_allclose(X_val[0, :-1], X_train[-1, 1:], rtol=1e-5)
+    np.testing.assert_allclose(X_val[0, -1, 0], y_train[-1], rtol=1e-5)
+
+def test_walk_forward_backtest(data):
+    folds, summary = walk_forward_backtest(data, window_size=5, n_folds=3, params=PARAMS, warm_start=True)
+    assert list(folds.index) == [0, 1, 2]
+    assert folds["error"].isna().all()
+    assert (folds["n_test"] == 11).all()
+    assert folds["test_end"].iloc[-1] == data.index[-1]
+    assert (folds["test_start"].iloc[1:].to_numpy() > folds["test_end"].iloc[:-1].to_numpy()).all()
+    assert list(summary.index) == ["mean", "std", "min", "max"]
+    assert summary.loc["mean", "rmse"] == pytest.approx(folds["rmse"].mean())
+
+def test_walk_forward_backtest_in_parallel(data):
+    folds, _ = walk_forward_backtest(data["Close"].to_numpy(), window_size=5, n_folds=2, params=PARAMS, max_workers=2)
+    assert folds["error"].isna().all()
+    assert np.isfinite(folds["rmse"]).all()
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+from benchmarks.bench_pipeline import (BENCHMARKS, QUICK_GRID, benchmark_parameters, compare, load_baseline,
+                                       main, run_benchmarks, save_baseline, synthetic_features, synthetic_ohlcv)
+
+def test_synthetic_ohlcv():
+    df = synthetic_ohlcv(500, seed=1)
+
+    assert len(df) == 500 and isinstance(df.index, pd.DatetimeIndex)
+    assert (df["High"] >= df[["Open", "Close"]].max(axis=1)).all()
+    assert (df["Low"] <= df[["Open", "Close"]].min(axis=1)).all()
+    assert (df[["Open", "High", "Low", "Close", "Volume"]] > 0).all().all()
+    pd.testing.assert_frame_equal(df, synthetic_ohlcv(500, seed=1))
+
+def test_synthetic_features():
+    features = synthetic_features(100, 7)
+
+    assert list(features.columns[:5]) == ["Close", "Open", "High", "Low", "Volume"]
+    assert features.shape == (100, 7)
+    assert not features.isnull().any().any()
+
+def test_benchmark_parameters():
+    assert benchmark_parameters("construct_lstm_data") == ["series_length", "window_size", "n_features"]
+    assert benchmark_parameters("model_train_step") == ["window_size", "n_features", "batch_size"]
+    assert benchmark_parameters("plot_stats") == ["series_length"]
+
+def test_run_benchmarks_and_baseline(tmp_path):
+    grid = {**QUICK_GRID, "window_size": (4, 8)}
+    results = run_benchmarks(["construct_lstm_data", "split_dataset_sequentially"], grid, repeats=2)
+
+    assert list(results.index) == [
+        ("construct_lstm_data", "series_length=1000,window_size=4,n_features=1"),
+        ("construct_lstm_data", "series_length=1000,window_size=8,n_features=1"),
+        ("split_dataset_sequentially", "series_length=1000,n_features=1"),
+    ]
+    assert (results["min_s"] <= results["median_s"]).all()
+    assert (results["peak_mb"] > 0).all()
+
+    path = str(tmp_path / "baseline.json")
+    save_baseline(results, path)
+    pd.testing.assert_frame_equal(load_baseline(path), results)
+
+def test_run_benchmarks_with_unknown_benchmark():
+    with pytest.raises(ValueError):
+        run_benchmarks(["unknown"], QUICK_GRID)
+
+def test_compare_flags_regressions():
+    index = pd.MultiIndex.from_tuples([("a", "x=1"), ("b", "x=1"), ("c", "x=1"), ("d", "x=1")], names=["benchmark", "params"])
+    baseline = pd.DataFrame({"median_s": 1.0, "min_s": [1.0, 1.0, 1.0, 1e-5], "peak_mb": 10.0}, index=index)
+    results = pd.DataFrame({"median_s": 1.0, "min_s": [1.1, 1.5, 1.0, 3e-5], "peak_mb": [10.0, 10.0, 15.0, 10.0]}, index=index)
+
+    comparison = compare(results, baseline, threshold=0.2, memory_threshold=0.2)
+
+    # d is 3 times slower, but by less than min_time
+    assert list(comparison["regression"]) == [False, True, True, False]
+    np.testing.assert_allclose(comparison["time_ratio"], [1.1, 1.5, 1.0, 3.0])
+
+def test_compare_without_baseline_exits_with_a_message(tmp_path, capsys):
+    with pytest.raises(SystemExit):
+        main(["--compare", str(tmp_path / "missing.json")])
+    assert "--save-baseline" in capsys.readouterr().err
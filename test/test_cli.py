@@ -0,0 +1,55 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.cli import compute_metrics, parse_args, run_pipeline
+
+def stub_downloader(stock, period):
+    if stock == "BAD":
+        return pd.DataFrame()
+    index = pd.date_range(start='2024-01-01', periods=80, name='Date')
+    close = np.linspace(10, 20, 80) + np.random.rand(80)
+    return pd.DataFrame({'Open': close, 'High': close, 'Low': close, 'Close': close, 'Volume': 100}, index=index)
+
+def test_compute_metrics():
+    metrics = compute_metrics(np.array([10.0, 20.0]), np.array([11.0, 18.0]))
+    assert metrics["mae"] == pytest.approx(1.5)
+    assert metrics["rmse"] == pytest.approx(np.sqrt(2.5))
+    assert metrics["mape"] == pytest.approx(10.0)
+
+@pytest.mark.parametrize("global_model", [False, True])
+def test_run_pipeline_writes_outputs(tmp_path, global_model):
+    argv = ["--tickers", "AAPL", "NVDA", "BAD", "--epochs", "2", "--window-size", "4",
+            "--lstm-neurons", "4", "--hidden-neurons", "4", "--output-dir", str(tmp_path)]
+    if global_model:
+        argv += ["--global-model", "--tflite", "float16"]
+    results = run_pipeline(parse_args(argv), downloader=stub_downloader)
+
+    assert list(results["failures"]) == ["BAD"]
+    assert set(results["metrics"]) == {"AAPL", "NVDA"}
+    assert set(results["metrics"]["AAPL"]) == {"Train", "Validation", "Test"}
+
+    with open(tmp_path / "metrics.json") as f:
+        assert json.load(f) == results
+    forecasts = pd.read_csv(tmp_path / "forecasts.csv")
+    assert set(forecasts["ticker"]) == {"AAPL", "NVDA"}
+    assert not forecasts["predicted"].isnull().any()
+    model_dirs = ["global"] if global_model else ["AAPL", "NVDA"]
+    for model_dir in model_dirs:
+        assert (tmp_path / model_dir / "model.keras").exists()
+        assert (tmp_path / model_dir / "history.csv").exists()
+        assert (tmp_path / model_dir / "model.npz").exists()
+    if global_model:
+        assert (tmp_path / "global" / "model.tflite").exists()
+        assert (tmp_path / "global" / "quantization.csv").exists()
+
+def test_run_pipeline_with_features(tmp_path):
+    argv = ["--tickers", "AAPL", "--epochs", "2", "--window-size", "4", "--lstm-neurons", "4",
+            "--hidden-neurons", "4", "--features", "log_return", "rsi:5", "--profile", "--output-dir", str(tmp_path)]
+    results = run_pipeline(parse_args(argv), downloader=stub_downloader)
+    assert set(results["metrics"]["AAPL"]) == {"Train", "Validation", "Test"}
+    forecasts = pd.read_csv(tmp_path / "forecasts.csv")
+    assert not forecasts["predicted"].isnull().any()
+    assert (tmp_path / "AAPL" / "profile.json").exists()
+    assert len(pd.read_csv(tmp_path / "AAPL" / "profile" / "epochs.csv")) == 2
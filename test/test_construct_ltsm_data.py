@@ -56,4 +56,22 @@ def test_construct_lstm_data_with_non_numeric_input_data():
     data = np.array([['a', 'b', 'c'], ['d', 'e', 'f']])
     
     with pytest.raises(TypeError):
-        construct_lstm_data(data, sequence_size=2)
\ No newline at end of file
+        construct_lstm_data(data, sequence_size=2)
+
+def test_construct_lstm_data_view_matches_copy():
+    data = np.random.rand(50, 3)
+    data_X, data_y = construct_lstm_data(data, sequence_size=8)
+    view_X, view_y = construct_lstm_data(data, sequence_size=8, copy=False)
+
+    assert view_X.shape == data_X.shape
+    np.testing.assert_array_equal(view_X, data_X)
+    np.testing.assert_array_equal(view_y, data_y)
+
+def test_construct_lstm_data_view_is_read_only_and_shares_memory():
+    data = np.random.rand(50, 1)
+    view_X, view_y = construct_lstm_data(data, sequence_size=8, copy=False)
+
+    assert np.shares_memory(view_X, data)
+    assert np.shares_memory(view_y, data)
+    assert not view_X.flags.writeable
+    assert not view_y.flags.writeable
@@ -0,0 +1,103 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+from src.data_handling import gather_data
+from src.data_store import OHLCVStore, period_start
+
+TODAY = pd.Timestamp.now().normalize()
+
+def make_bars(start, end):
+    index = pd.date_range(start=start, end=end, freq='D', name='Date')
+    return pd.DataFrame({
+        'Open': 1.0,
+        'High': 2.0,
+        'Low': 0.5,
+        'Close': [float(i + 1) for i in range(len(index))],
+        'Volume': 100
+    }, index=index)
+
+class StubDownloader:
+    def __init__(self, end=TODAY):
+        self.end = end
+        self.calls = []
+
+    def __call__(self, stock, period, start=None):
+        self.calls.append((stock, period, start))
+        if start is None:
+            start = period_start(period, pd.Timestamp.now())
+        return make_bars(start, self.end)
+
+def test_first_request_downloads_full_period(tmp_path):
+    store = OHLCVStore(str(tmp_path))
+    downloader = StubDownloader()
+    df = store.refresh("AAPL", "1mo", downloader)
+    assert downloader.calls == [("AAPL", "1mo", None)]
+    assert df.index[-1] == TODAY
+    assert store.last_timestamp("AAPL") == TODAY
+
+def test_later_request_only_downloads_new_bars(tmp_path):
+    store = OHLCVStore(str(tmp_path))
+    store.refresh("AAPL", "1mo", StubDownloader(end=TODAY - pd.Timedelta(days=3)))
+
+    downloader = StubDownloader()
+    df = store.refresh("AAPL", "1mo", downloader)
+    assert downloader.calls == [("AAPL", "1mo", TODAY - pd.Timedelta(days=3))]
+    assert df.index.is_unique
+    assert df.index[-1] == TODAY
+    assert len(store.load("AAPL")) == len(df)
+
+def test_last_stored_bar_is_replaced(tmp_path):
+    store = OHLCVStore(str(tmp_path))
+    store.write("AAPL", make_bars(TODAY - pd.Timedelta(days=40), TODAY))
+    update = make_bars(TODAY, TODAY)
+    update['Close'] = 42.0
+    merged = store.append("AAPL", update)
+    assert merged['Close'].iloc[-1] == 42.0
+    assert len(merged) == 41
+
+def test_longer_period_triggers_full_download(tmp_path):
+    store = OHLCVStore(str(tmp_path))
+    store.refresh("AAPL", "1mo", StubDownloader())
+    downloader = StubDownloader()
+    df = store.refresh("AAPL", "1y", downloader)
+    assert downloader.calls == [("AAPL", "1y", None)]
+    assert df.index[0] <= TODAY - pd.DateOffset(months=11)
+
+def test_shorter_period_is_served_from_store(tmp_path):
+    store = OHLCVStore(str(tmp_path))
+    store.refresh("AAPL", "1y", StubDownloader())
+    df = store.refresh("AAPL", "1mo", StubDownloader())
+    assert df.index[0] >= TODAY - pd.DateOffset(months=1)
+
+def test_max_period_is_recorded(tmp_path):
+    store = OHLCVStore(str(tmp_path))
+    assert not store.covers("AAPL", "max")
+    store.write("AAPL", make_bars("2000-01-01", TODAY), period="max")
+    assert store.covers("AAPL", "max")
+
+def test_unsupported_period(tmp_path):
+    with pytest.raises(ValueError):
+        period_start("1y!", TODAY)
+
+def test_gather_data_with_store(tmp_path):
+    store = OHLCVStore(str(tmp_path))
+    downloader = StubDownloader()
+    data = gather_data(["AAPL", "NVDA"], "1mo", downloader=downloader, store=store)
+    assert set(data) == {"AAPL", "NVDA"}
+    assert 'change_percent' in data["AAPL"].columns
+    # change_percent is derived on load and never stored
+    assert 'change_percent' not in store.load("AAPL").columns
+
+def test_concurrent_writes_from_several_stores_keep_every_manifest_entry(tmp_path):
+    bars = make_bars(TODAY - pd.Timedelta(days=5), TODAY)
+    stocks = [f"T{i}" for i in range(16)]
+
+    # Every Streamlit session builds its own store on the same directory
+    def write(stock):
+        OHLCVStore(str(tmp_path)).write(stock, bars, "max")
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(write, stocks))
+
+    store = OHLCVStore(str(tmp_path))
+    assert all(store.covers(stock, "max") for stock in stocks)
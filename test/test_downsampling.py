@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import pytest
+from src.downsampling import distribution_sample, downsample, histogram_trace, line_trace, lttb, minmax, resample_ohlcv
+from src.plotting import plot_actual_vs_predicted_stock_data, plot_stats
+
+@pytest.fixture
+def series():
+    index = pd.date_range("2015-01-01", periods=50_000, freq="min", tz="America/New_York")
+    values = np.cumsum(np.random.default_rng(0).normal(0, 1, 50_000))
+    values[1234] += 500  # A spike that must survive the downsampling
+    return pd.Series(values, index=index)
+
+def test_lttb_keeps_endpoints_and_spikes(series):
+    indices = lttb(series.index, series.to_numpy(), 500)
+    assert len(indices) == 500
+    assert indices[0] == 0 and indices[-1] == len(series) - 1
+    assert np.all(np.diff(indices) > 0)
+    assert 1234 in indices
+
+def test_minmax_keeps_extremes_of_every_bucket(series):
+    indices = minmax(series.to_numpy(), 500)
+    assert len(indices) <= 500
+    assert series.to_numpy().argmax() in indices and series.to_numpy().argmin() in indices
+
+def test_short_series_are_kept_whole():
+    x, y = downsample([1, 2, 3], [1.0, np.nan, 3.0], max_points=10)
+    assert list(x) == [1, 2, 3] and len(y) == 3
+    assert isinstance(line_trace([1, 2, 3], [1, 2, 3]), go.Scatter)
+
+def test_line_trace_uses_webgl_for_large_traces(series):
+    trace = line_trace(series.index, series, max_points=2000)
+    assert isinstance(trace, go.Scattergl)
+    assert len(trace.y) == 2000
+    assert len(line_trace(series.index, series, max_points=None).y) == len(series)
+
+def test_invalid_method(series):
+    with pytest.raises(ValueError):
+        downsample(series.index, series, method="mean")
+
+def test_histogram_trace_sends_counts(series):
+    trace = histogram_trace(series, 200, max_points=1000)
+    assert len(trace.x) == 200 and trace.histfunc == "sum"
+    assert sum(trace.y) == len(series)
+
+def test_distribution_sample_keeps_quartiles(series):
+    sample = distribution_sample(series, 1001)
+    assert len(sample) == 1001
+    assert sample[0] == series.min() and sample[-1] == series.max()
+    assert sample[500] == pytest.approx(series.median())
+
+def test_resample_ohlcv():
+    index = pd.date_range("2024-01-01", periods=10, freq="min")
+    df = pd.DataFrame({"Open": np.arange(10.0), "High": np.arange(10.0) + 1, "Low": np.arange(10.0) - 1,
+                       "Close": np.arange(10.0) + 0.5, "Volume": 1}, index=index)
+    resampled = resample_ohlcv(df, max_bars=4)
+    assert len(resampled) == 4
+    assert list(resampled.index) == list(index[::3])
+    assert resampled.iloc[0].to_dict() == {"Open": 0.0, "High": 3.0, "Low": -1.0, "Close": 2.5, "Volume": 3}
+
+def test_plots_are_downsampled(series):
+    df = pd.DataFrame({"Open": series, "High": series + 1, "Low": series - 1, "Close": series, "Volume": 1}, index=series.index)
+    df["change_percent"] = df["Close"].pct_change() * 100
+    fig_candlestick, fig = plot_stats({"stock": df}, "stock", max_points=1000)
+    assert all(len(trace.y) <= 1000 for trace in fig.data)
+    assert fig.data[3].points is False
+
+    actual = {"Test": df[["Close"]]}
+    fig = plot_actual_vs_predicted_stock_data(actual, {"Test": series.to_numpy()}, {"Test": "darkred"}, max_points=1000)
+    assert all(len(trace.y) <= 1000 for trace in fig.data)
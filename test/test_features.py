@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.data_handling import construct_lstm_data, preprocess_data, split_dataset_sequentially
+from src.features import FeatureEngine, compute_features, parse_feature_set, rsi
+
+@pytest.fixture
+def data():
+    index = pd.bdate_range("2023-01-02", periods=200, name="Date")
+    rng = np.random.default_rng(0)
+    close = 100 + np.cumsum(rng.normal(0, 1, 200))
+    volume = rng.integers(1_000, 2_000, 200)
+    return pd.DataFrame({"Open": close, "High": close + 1, "Low": close - 1, "Close": close, "Volume": volume}, index=index)
+
+def test_compute_features(data):
+    feature_set = [("log_return", {}), ("rolling_mean", {"window": 10}), ("rsi", {}), ("volume_zscore", {"window": 5}), ("calendar", {})]
+    features = compute_features(data, feature_set)
+    assert list(features.columns) == [
+        "Close", "log_return", "rolling_mean_10", "rsi_14", "volume_zscore_5",
+        "day_of_week_sin", "day_of_week_cos", "month_sin", "month_cos"
+    ]
+    # The RSI needs 14 changes, i.e. 15 bars, before it is defined
+    assert features.index[0] == data.index[14]
+    assert not features.isnull().values.any()
+    np.testing.assert_allclose(features["log_return"], np.log(data["Close"]).diff().loc[features.index])
+    np.testing.assert_allclose(features["rolling_mean_10"], data["Close"].rolling(10).mean().loc[features.index])
+    assert features["rsi_14"].between(0, 100).all()
+
+def test_rsi_of_rising_series_is_100():
+    data = pd.DataFrame({"Close": np.arange(1.0, 31.0)}, index=pd.bdate_range("2023-01-02", periods=30))
+    assert (rsi(data, "Close", window=5).dropna() == 100).all()
+
+def test_invalid_feature_set(data):
+    with pytest.raises(ValueError):
+        compute_features(data, [("macd", {})])
+    with pytest.raises(ValueError):
+        compute_features(data, [("rsi", {"span": 3})])
+
+def test_parse_feature_set():
+    assert parse_feature_set(["log_return", "rsi:7"]) == [("log_return", {}), ("rsi", {"window": 7})]
+
+def test_engine_caches_columns(data):
+    engine = FeatureEngine()
+    feature_set = [("log_return", {}), ("rsi", {"window": 14})]
+    features = engine.compute("AAPL", data, feature_set)
+    assert engine.computed == 2
+    assert engine.compute("AAPL", data, feature_set) is features
+
+    # Changing one parameter only computes that indicator again
+    changed = engine.compute("AAPL", data, [("log_return", {}), ("rsi", {"window": 7})])
+    assert engine.computed == 3
+    pd.testing.assert_frame_equal(changed, compute_features(data, [("log_return", {}), ("rsi", {"window": 7})]))
+
+    # New bars invalidate the cached columns
+    engine.compute("AAPL", data.iloc[:-1], feature_set)
+    assert engine.computed == 5
+
+def test_engine_evicts_least_recently_used(data):
+    engine = FeatureEngine(max_entries=2)
+    for window in (5, 6, 7):
+        engine.compute("AAPL", data, [("rsi", {"window": window})])
+    engine.compute("AAPL", data, [("rsi", {"window": 5})])
+    assert engine.computed == 4
+
+def test_multivariate_preprocessing(data):
+    features = compute_features(data, [("log_return", {}), ("rsi", {})])
+    splits = split_dataset_sequentially({"AAPL": features}, ["AAPL", list(features.columns)])
+    X_train, y_train, X_val, y_val, X_test, y_test, scaler = preprocess_data(*splits, seq_size=8, target_index=0)
+    assert X_train.shape[1:] == (8, 3)
+    assert y_train.shape == (len(X_train),)
+    # The target is the next value of the first column
+    np.testing.assert_allclose(X_train[1, -1, 0], y_train[0])
+
+def test_construct_lstm_data_target_index():
+    data = np.arange(20, dtype=float).reshape(10, 2)
+    X, y = construct_lstm_data(data, 3, target_index=1)
+    assert X.shape == (7, 3, 2)
+    np.testing.assert_array_equal(y, data[3:, 1])
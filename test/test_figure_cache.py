@@ -0,0 +1,73 @@
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import pytest
+from src.figure_cache import FigureCache, fingerprint
+from src.plotting import cached_plot_splitted_stock_data, cached_plot_stats, cached_plot_training_performance
+
+@pytest.fixture
+def data():
+    index = pd.date_range("2024-01-01", periods=60)
+    close = np.linspace(10, 20, 60)
+    df = pd.DataFrame({"Open": close, "High": close + 1, "Low": close - 1, "Close": close, "Volume": 100}, index=index)
+    df["change_percent"] = df["Close"].pct_change() * 100
+    return {"stock": df}
+
+def test_fingerprint_depends_on_content(data):
+    df = data["stock"]
+    assert fingerprint(df, "a") == fingerprint(df.copy(), "a")
+    assert fingerprint(df, "a") != fingerprint(df, "b")
+    changed = df.copy()
+    changed.iloc[-1, 0] += 1
+    assert fingerprint(df) != fingerprint(changed)
+    assert fingerprint({"loss": [1, 2]}) != fingerprint({"loss": [1, 2, 3]})
+
+def test_cached_plot_stats_builds_once(data):
+    cache = FigureCache()
+    png, fig = cached_plot_stats(data, "stock", cache=cache)
+    assert png.startswith(b"\x89PNG")
+    assert isinstance(fig, go.Figure)
+    assert cache.misses == 1
+
+    # Another session gets its own copy of the cached figures
+    png_again, fig_again = cached_plot_stats({"stock": data["stock"].copy()}, "stock", cache=cache)
+    assert cache.hits == 1 and len(cache) == 1
+    assert png_again == png and fig_again is not fig
+    assert fig_again.to_json() == fig.to_json()
+
+    # New data is a new entry
+    refreshed = data["stock"].iloc[:-1]
+    cached_plot_stats({"stock": refreshed}, "stock", cache=cache)
+    assert cache.misses == 2 and len(cache) == 2
+
+def test_cached_plot_stats_invalid_data():
+    with pytest.raises(ValueError):
+        cached_plot_stats({}, "stock", cache=FigureCache())
+
+def test_other_cached_plots(data):
+    cache = FigureCache()
+    splits = {"Train": data["stock"][["Close"]].iloc[:40], "Test": data["stock"][["Close"]].iloc[40:]}
+    colors = {"Train": "lightblue", "Test": "darkred"}
+    assert cached_plot_splitted_stock_data(splits, colors, cache=cache).startswith(b"\x89PNG")
+    assert cached_plot_splitted_stock_data(splits, colors, cache=cache) == cached_plot_splitted_stock_data(splits, colors, cache=cache)
+    fig = cached_plot_training_performance({"loss": [0.3, 0.2], "val_loss": [0.4, 0.3]}, cache=cache)
+    assert isinstance(fig, go.Figure) and list(fig.data[0].y) == [0.3, 0.2]
+    assert cache.misses == 2 and cache.hits == 2
+
+def test_lru_eviction_by_size():
+    figure = go.Figure(go.Scatter(y=list(range(100))))
+    entry_size = len(figure.to_json())
+    cache = FigureCache(max_bytes=entry_size * 2)
+    cache.put("a", (figure,))
+    cache.put("b", (figure,))
+    cache.get("a")
+    cache.put("c", (figure,))
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.size() <= cache.max_bytes
+
+def test_matplotlib_figures_are_closed():
+    fig = plt.figure()
+    FigureCache().put("key", (fig,))
+    assert not plt.fignum_exists(fig.number)
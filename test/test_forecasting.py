@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+from sklearn.preprocessing import MinMaxScaler
+from src.create_model import LSTMForecasting
+from src.forecasting import forecast, forecast_prices
+from src.numpy_inference import NumpyLSTMForecasting
+
+@pytest.fixture(scope="module")
+def model():
+    model = LSTMForecasting(
+        input_size=6,
+        lstm_hidden_size=8,
+        linear_hidden_size=12,
+        lstm_num_layers=2,
+        linear_num_layers=2,
+        output_size=1
+    )
+    model(np.zeros((1, 6, 1), dtype=np.float32))
+    return model
+
+@pytest.fixture
+def window():
+    return np.random.default_rng(0).uniform(-1, 1, (6, 1)).astype(np.float32)
+
+def test_stateful_matches_growing_sequence(model, window):
+    forecasts = forecast(model, window, n_steps=5)
+    assert forecasts.shape == (5, 1)
+
+    # Carrying the states is equivalent to running the window followed by the previous forecasts
+    sequence = window
+    for step in range(5):
+        expected = model.predict(sequence[None], verbose=0)[0]
+        np.testing.assert_allclose(forecasts[step], expected, rtol=1e-4, atol=1e-5)
+        sequence = np.concatenate([sequence, expected[None]])
+
+def test_window_matches_sliding_predictions(model, window):
+    forecasts = forecast(model, window, n_steps=4, method="window")
+
+    sequence = window
+    for step in range(4):
+        expected = model.predict(sequence[None], verbose=0)[0]
+        np.testing.assert_allclose(forecasts[step], expected, rtol=1e-4, atol=1e-5)
+        sequence = np.concatenate([sequence[1:], expected[None]])
+
+def test_methods_agree_on_first_step(model, window):
+    engine = NumpyLSTMForecasting.from_model(model)
+    np.testing.assert_allclose(
+        forecast(engine, window, 3)[0],
+        forecast(engine, window, 3, method="window")[0],
+        rtol=1e-6
+    )
+
+def test_batch_of_windows(model):
+    windows = np.random.default_rng(1).uniform(-1, 1, (3, 6, 1)).astype(np.float32)
+    forecasts = forecast(model, windows, n_steps=4)
+    assert forecasts.shape == (3, 4, 1)
+    np.testing.assert_allclose(forecasts[1], forecast(model, windows[1], n_steps=4), rtol=1e-5)
+
+def test_forecast_prices(model, window):
+    scaler = MinMaxScaler(feature_range=(-1, 1)).fit(np.array([[100.0], [200.0]]))
+    prices = forecast_prices(model, window, scaler, n_steps=3)
+    expected = scaler.inverse_transform(forecast(model, window, n_steps=3)).ravel()
+    np.testing.assert_allclose(prices, expected, rtol=1e-5)
+
+def test_invalid_arguments(model, window):
+    with pytest.raises(ValueError):
+        forecast(model, window, n_steps=0)
+    with pytest.raises(ValueError):
+        forecast(model, window, n_steps=3, method="direct")
+    with pytest.raises(ValueError):
+        # A single output cannot be fed back into a window of two features
+        forecast(model, np.zeros((6, 2), dtype=np.float32), n_steps=3)
@@ -0,0 +1,75 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+from src.data_handling import gather_data, gather_data_concurrently
+
+def make_stock_frame(n=5):
+    return pd.DataFrame({
+        'Open': range(n),
+        'High': range(n),
+        'Low': range(n),
+        'Close': [float(i + 1) for i in range(n)],
+        'Volume': range(n)
+    }, index=pd.date_range(start='2024-01-01', periods=n))
+
+class StubDownloader:
+    def __init__(self, fail=(), flaky=(), delay=0.0):
+        self.fail = set(fail)
+        self.flaky = set(flaky)
+        self.delay = delay
+        self.calls = {}
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, stock, period):
+        with self.lock:
+            self.calls[stock] = self.calls.get(stock, 0) + 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delay)
+            if stock in self.fail:
+                return pd.DataFrame()
+            if stock in self.flaky and self.calls[stock] == 1:
+                raise ConnectionError(f"Temporary failure for {stock}")
+            return make_stock_frame()
+        finally:
+            with self.lock:
+                self.active -= 1
+
+def test_downloads_run_concurrently_within_bound():
+    downloader = StubDownloader(delay=0.05)
+    stocks = [f"STOCK{i}" for i in range(12)]
+    data, failures = gather_data_concurrently(stocks, "1y", max_concurrency=4, downloader=downloader)
+    assert failures == {}
+    assert list(data) == stocks
+    assert 1 < downloader.max_active <= 4
+    for df in data.values():
+        assert 'change_percent' in df.columns
+
+def test_flaky_download_is_retried():
+    downloader = StubDownloader(flaky=["AAPL"])
+    data, failures = gather_data_concurrently(["AAPL"], "1y", backoff=0.0, downloader=downloader)
+    assert failures == {}
+    assert "AAPL" in data
+    assert downloader.calls["AAPL"] == 2
+
+def test_partial_failures_are_reported():
+    downloader = StubDownloader(fail=["BAD"])
+    data, failures = gather_data_concurrently(["AAPL", "BAD", "NVDA"], "1y", retries=1, backoff=0.0, downloader=downloader)
+    assert list(data) == ["AAPL", "NVDA"]
+    assert list(failures) == ["BAD"]
+    assert "BAD" in failures["BAD"]
+    assert downloader.calls["BAD"] == 2
+
+def test_gather_data_raises_on_any_failure():
+    downloader = StubDownloader(fail=["BAD"])
+    with pytest.raises(ValueError):
+        gather_data(["AAPL", "BAD"], backoff=0.0, downloader=downloader)
+
+def test_invalid_concurrency():
+    with pytest.raises(ValueError):
+        gather_data_concurrently(["AAPL"], max_concurrency=0, downloader=StubDownloader())
@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+from sklearn.preprocessing import MinMaxScaler
+from src.data_handling import inverse_scale_target
+
+def test_matches_scaler_inverse_transform():
+    data = np.random.rand(100, 3) * [10, 200, 3000]
+    scaler = MinMaxScaler(feature_range=(-1, 1)).fit(data)
+    scaled = scaler.transform(data)
+
+    for target_index in range(3):
+        values = inverse_scale_target(scaler, scaled[:, target_index], target_index)
+        np.testing.assert_allclose(values, data[:, target_index])
+
+def test_column_shaped_values_are_flattened():
+    data = np.random.rand(20, 1)
+    scaler = MinMaxScaler(feature_range=(-1, 1)).fit(data)
+    values = inverse_scale_target(scaler, scaler.transform(data))
+    assert values.shape == (20,)
+    np.testing.assert_allclose(values, data[:, 0])
+
+def test_unfitted_scaler():
+    with pytest.raises(ValueError):
+        inverse_scale_target(MinMaxScaler(), np.zeros(3))
+
+def test_target_index_out_of_range():
+    scaler = MinMaxScaler().fit(np.random.rand(10, 2))
+    with pytest.raises(IndexError):
+        inverse_scale_target(scaler, np.zeros(3), target_index=2)
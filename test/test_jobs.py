@@ -0,0 +1,91 @@
+import json
+
+import numpy as np
+import pytest
+from src.jobs import TrainingJobManager
+from src.model_registry import ModelRegistry
+
+MODEL_PARAMS = dict(input_size=5, lstm_hidden_size=4, linear_hidden_size=4, lstm_num_layers=1, linear_num_layers=1, output_size=1)
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    return (rng.random((40, 5, 1), dtype=np.float32), rng.random(40, dtype=np.float32),
+            rng.random((10, 5, 1), dtype=np.float32), rng.random(10, dtype=np.float32))
+
+@pytest.fixture
+def registry(tmp_path):
+    return ModelRegistry(root=str(tmp_path / "registry"))
+
+def make_manager(tmp_path, registry, **kwargs):
+    return TrainingJobManager(root=str(tmp_path / "jobs"), registry=registry, **kwargs)
+
+def test_job_trains_and_persists_its_model(tmp_path, registry, data):
+    manager = make_manager(tmp_path, registry)
+    job_id = manager.submit("alice", "key", MODEL_PARAMS, {"epochs": 2, "batch_size": 8}, data)
+    job = manager.wait(job_id, timeout=120)
+    manager.shutdown()
+
+    assert job["status"] == "completed", job["error"]
+    assert job["epoch"] == 2 and len(job["loss"]) == len(job["val_loss"]) == 2
+    assert [row["epoch"] for row in manager.profile(job_id)["epochs"]] == [1, 2]
+    model, history = manager.result(job_id)
+    assert history["loss"] == pytest.approx(job["loss"])
+    # The record survives a restart of the app
+    with open(tmp_path / "jobs" / f"{job_id}.json") as f:
+        assert json.load(f)["status"] == "completed"
+    assert make_manager(tmp_path, registry, start=False).get(job_id)["status"] == "completed"
+
+def test_owners_are_served_in_turn(tmp_path, registry, data):
+    manager = make_manager(tmp_path, registry, start=False)
+    train_params = {"epochs": 1, "batch_size": 8}
+    alice = [manager.submit("alice", f"alice-{i}", MODEL_PARAMS, train_params, data) for i in range(3)]
+    bob = manager.submit("bob", "bob", MODEL_PARAMS, train_params, data)
+    manager.start()
+    for job_id in alice + [bob]:
+        assert manager.wait(job_id, timeout=120)["status"] == "completed"
+    manager.shutdown()
+
+    started = sorted(manager.jobs(), key=lambda job: job["started_at"])
+    assert [job["id"] for job in started] == [alice[0], bob, alice[1], alice[2]]
+    assert len(manager.jobs(owner="bob")) == 1
+
+def test_cancel_queued_and_running_jobs(tmp_path, registry, data):
+    manager = make_manager(tmp_path, registry)
+    running = manager.submit("alice", "running", MODEL_PARAMS, {"epochs": 500, "batch_size": 8}, data)
+    queued = manager.submit("alice", "queued", MODEL_PARAMS, {"epochs": 1}, data)
+    assert manager.cancel(queued)
+    assert manager.get(queued)["status"] == "cancelled"
+
+    while manager.get(running)["epoch"] < 1:
+        manager.wait(running, timeout=0.1)
+    assert manager.cancel(running)
+    job = manager.wait(running, timeout=120)
+    manager.shutdown()
+
+    assert job["status"] == "cancelled"
+    assert job["epoch"] < 500
+    assert "running" not in registry
+    assert not manager.cancel(running)
+
+def test_unfinished_jobs_are_interrupted_on_restart(tmp_path, registry, data):
+    manager = make_manager(tmp_path, registry, start=False)
+    job_id = manager.submit("alice", "key", MODEL_PARAMS, {"epochs": 1}, data)
+    assert make_manager(tmp_path, registry, start=False).get(job_id)["status"] == "interrupted"
+
+def test_registered_runs_are_not_trained_again(tmp_path, registry, data):
+    manager = make_manager(tmp_path, registry)
+    first = manager.submit("alice", "key", MODEL_PARAMS, {"epochs": 2, "batch_size": 8}, data)
+    manager.wait(first, timeout=120)
+    second = manager.submit("bob", "key", MODEL_PARAMS, {"epochs": 2, "batch_size": 8}, data)
+    job = manager.wait(second, timeout=120)
+    manager.shutdown()
+    assert job["status"] == "completed" and job["loss"] == []
+    assert manager.result(second) is not None
+
+def test_failed_job(tmp_path, registry, data):
+    manager = make_manager(tmp_path, registry)
+    job_id = manager.submit("alice", "key", {**MODEL_PARAMS, "lstm_hidden_size": -1}, {"epochs": 1}, data)
+    job = manager.wait(job_id, timeout=120)
+    manager.shutdown()
+    assert job["status"] == "failed" and job["error"]
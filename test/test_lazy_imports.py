@@ -0,0 +1,29 @@
+import subprocess
+import sys
+
+import pytest
+from benchmarks.bench_imports import parse_importtime
+
+@pytest.mark.parametrize("module", [
+    "main",
+    "src.pages.HomePage",
+    "src.pages.ContactPage",
+    "src.pages.DataGatheringPage",
+    "src.pages.DataAnalysisPage",
+    "src.pages.DataPreprocessingPage",
+])
+def test_pages_without_model_do_not_import_tensorflow(module):
+    code = f"import sys, {module}; assert 'tensorflow' not in sys.modules and 'keras' not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+def test_main_does_not_import_pages():
+    code = "import sys, main; assert not any(name.startswith('src.') for name in sys.modules)"
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+def test_parse_importtime():
+    stderr = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   _io\n"
+        "import time:      2000 |       5000 | pandas\n"
+    )
+    assert parse_importtime(stderr) == [("_io", 120, 120), ("pandas", 2000, 5000)]
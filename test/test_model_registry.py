@@ -0,0 +1,70 @@
+import os
+
+import numpy as np
+from src.create_model import LSTMForecasting
+from src.model_registry import ModelRegistry, fingerprint_arrays
+
+def make_model():
+    model = LSTMForecasting(
+        input_size=5,
+        lstm_hidden_size=4,
+        linear_hidden_size=4,
+        lstm_num_layers=1,
+        linear_num_layers=1,
+        output_size=1
+    )
+    model(np.zeros((1, 5, 1), dtype=np.float32))
+    return model
+
+def make_key(learning_rate=0.01, data=None):
+    if data is None:
+        data = (np.arange(10.0),)
+    return ModelRegistry.make_key(
+        ticker="NVDA",
+        feature="Close",
+        window_size=5,
+        split_sizes=(0.7, 0.1, 0.2),
+        model_config=make_model().get_config(),
+        optimizer_config={"learning_rate": learning_rate, "epochs": 10},
+        data=data
+    )
+
+def test_key_is_stable_across_model_instances():
+    assert make_key() == make_key()
+
+def test_key_changes_with_settings_and_data():
+    assert make_key() != make_key(learning_rate=0.001)
+    assert make_key() != make_key(data=(np.arange(10.0) + 1,))
+
+def test_fingerprint_covers_shape():
+    assert fingerprint_arrays(np.zeros(4)) != fingerprint_arrays(np.zeros((2, 2)))
+
+def test_put_and_get(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    key = make_key()
+    assert registry.get(key) is None
+
+    model = make_model()
+    registry.put(key, model, {"loss": [0.5, 0.25], "val_loss": [0.6, 0.3]})
+    cached_model, history = registry.get(key)
+
+    X = np.random.rand(3, 5, 1).astype(np.float32)
+    np.testing.assert_allclose(cached_model.predict(X, verbose=0), model.predict(X, verbose=0), rtol=1e-6)
+    assert history == {"loss": [0.5, 0.25], "val_loss": [0.6, 0.3]}
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    history = {"loss": [0.1], "val_loss": [0.1]}
+    registry.put("first", make_model(), history)
+    registry.put("second", make_model(), history)
+    os.utime(tmp_path / "first", (1, 1))
+    os.utime(tmp_path / "second", (2, 2))
+    registry.get("first")
+
+    # Room for two and a half entries, so storing a third one evicts exactly one
+    registry.max_bytes = registry.size() * 5 // 4
+    registry.put("third", make_model(), history)
+
+    assert "first" in registry
+    assert "second" not in registry
+    assert "third" in registry
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+from src.create_model import LSTMForecasting
+from src.data_handling import concatenate_windows, preprocess_data, split_datasets_sequentially
+from src.predictions import predict
+from src.train_model import train_model
+
+def make_data():
+    index = pd.date_range(start='2024-01-01', periods=100)
+    return {
+        'AAPL': pd.DataFrame({'Close': np.linspace(100, 200, 100)}, index=index),
+        'NVDA': pd.DataFrame({'Close': np.linspace(1, 2, 100)}, index=index),
+    }
+
+class StubModel:
+    """Predicts the last value of each sequence, counting the forward passes."""
+    def __init__(self):
+        self.calls = 0
+
+    def predict(self, X, batch_size=None, verbose=0):
+        self.calls += 1
+        return X[:, -1, :1]
+
+def test_split_datasets_sequentially():
+    train_data, val_data, test_data = split_datasets_sequentially(make_data(), 'Close')
+    assert list(train_data) == ['AAPL', 'NVDA']
+    assert len(train_data['AAPL']) == 70
+    assert len(val_data['NVDA']) == 11
+    assert len(test_data['NVDA']) == 19
+
+def test_each_stock_is_scaled_independently():
+    train_data, val_data, test_data = split_datasets_sequentially(make_data(), 'Close')
+    X_train, y_train, X_val, y_val, X_test, y_test, scalers = preprocess_data(train_data, val_data, test_data, seq_size=5)
+
+    assert set(scalers) == {'AAPL', 'NVDA'}
+    assert X_train['AAPL'].shape == (65, 5, 1)
+    # Both series are linear over the same range, so they scale to the same values
+    np.testing.assert_allclose(X_train['AAPL'], X_train['NVDA'])
+    assert scalers['AAPL'].data_max_[0] != scalers['NVDA'].data_max_[0]
+
+def test_concatenate_windows():
+    X = {'A': np.array([[0], [1], [2]]), 'B': np.array([[10], [11]])}
+    y = {'A': np.array([0, 1, 2]), 'B': np.array([10, 11])}
+    X_all, y_all = concatenate_windows(X, y)
+    np.testing.assert_array_equal(X_all.ravel(), [0, 1, 2, 10, 11])
+    np.testing.assert_array_equal(y_all, [0, 1, 2, 10, 11])
+
+def test_predict_multiple_stocks_in_one_pass():
+    data = make_data()
+    train_data, val_data, test_data = split_datasets_sequentially(data, 'Close')
+    X_train, y_train, X_val, y_val, X_test, y_test, scalers = preprocess_data(train_data, val_data, test_data, seq_size=5)
+
+    model = StubModel()
+    train_results, val_results, test_results = predict(model, X_train, X_val, X_test, y_train, y_val, y_test, scalers)
+
+    assert model.calls == 1
+    for stock, df in data.items():
+        np.testing.assert_allclose(train_results[stock], df['Close'].values[4:69])
+        np.testing.assert_allclose(val_results[stock], df['Close'].values[74:80])
+        np.testing.assert_allclose(test_results[stock], df['Close'].values[85:99])
+
+def test_train_one_model_over_multiple_stocks(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    train_data, val_data, test_data = split_datasets_sequentially(make_data(), 'Close')
+    X_train, y_train, X_val, y_val, X_test, y_test, scalers = preprocess_data(train_data, val_data, test_data, seq_size=5)
+    model = LSTMForecasting(
+        input_size=5,
+        lstm_hidden_size=4,
+        linear_hidden_size=4,
+        lstm_num_layers=1,
+        linear_num_layers=1,
+        output_size=1
+    )
+    model, history = train_model(model, epochs=2, X_train=X_train, y_train=y_train, X_val=X_val, y_val=y_val)
+    assert len(history['loss']) == 2
@@ -0,0 +1,38 @@
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+from src.create_model import LSTMForecasting
+from src.numpy_inference import NumpyLSTMForecasting, export_weights
+
+def make_model(lstm_num_layers, linear_num_layers):
+    model = LSTMForecasting(
+        input_size=6,
+        lstm_hidden_size=8,
+        linear_hidden_size=12,
+        lstm_num_layers=lstm_num_layers,
+        linear_num_layers=linear_num_layers,
+        output_size=1
+    )
+    model(np.zeros((1, 6, 2), dtype=np.float32))
+    return model
+
+@pytest.mark.parametrize("lstm_num_layers,linear_num_layers", [(1, 1), (2, 2), (3, 1)])
+def test_matches_keras_model(tmp_path, lstm_num_layers, linear_num_layers):
+    model = make_model(lstm_num_layers, linear_num_layers)
+    path = str(tmp_path / "model.npz")
+    export_weights(model, path)
+
+    X = np.random.uniform(-1, 1, (32, 6, 2)).astype(np.float32)
+    expected = model.predict(X, verbose=0)
+    np.testing.assert_allclose(NumpyLSTMForecasting.load(path).predict(X), expected, rtol=1e-4, atol=1e-5)
+    np.testing.assert_allclose(NumpyLSTMForecasting.from_model(model).predict(X), expected, rtol=1e-4, atol=1e-5)
+
+def test_invalid_weights():
+    with pytest.raises(ValueError):
+        NumpyLSTMForecasting({"fc_kernel": np.zeros((1, 1))})
+
+def test_module_does_not_import_tensorflow():
+    code = "import sys, src.numpy_inference; assert 'tensorflow' not in sys.modules and 'keras' not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], check=True)
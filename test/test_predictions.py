@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+from src.data_handling import preprocess_data
+from src.predictions import predict
+
+class StubModel:
+    """Predicts the last value of each sequence, counting the forward passes."""
+    def __init__(self):
+        self.calls = 0
+
+    def predict(self, X, batch_size=None, verbose=0):
+        self.calls += 1
+        return X[:, -1, :1]
+
+def test_predict_matches_scaler_inverse_transform():
+    values = np.linspace(10, 50, 100)
+    train_data = pd.DataFrame(values[:70], columns=["Close"])
+    val_data = pd.DataFrame(values[70:80], columns=["Close"])
+    test_data = pd.DataFrame(values[80:], columns=["Close"])
+    X_train, y_train, X_val, y_val, X_test, y_test, scaler = preprocess_data(train_data, val_data, test_data, seq_size=5)
+
+    model = StubModel()
+    train_results, val_results, test_results = predict(model, X_train, X_val, X_test, y_train, y_val, y_test, scaler)
+
+    assert model.calls == 1
+    assert train_results.shape == (65,)
+    assert val_results.shape == (5,)
+    assert test_results.shape == (15,)
+    np.testing.assert_allclose(train_results, values[4:69])
+    np.testing.assert_allclose(val_results, values[74:79])
+    np.testing.assert_allclose(test_results, values[84:99])
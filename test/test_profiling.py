@@ -0,0 +1,55 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.create_model import LSTMForecasting
+from src.data_handling import construct_lstm_data
+from src.plotting import plot_training_profile
+from src.profiling import TrainingProfiler, profile_frames
+from src.train_model import train_model
+
+def make_model():
+    return LSTMForecasting(input_size=5, lstm_hidden_size=4, linear_hidden_size=4, lstm_num_layers=1, linear_num_layers=1, output_size=1)
+
+@pytest.fixture
+def trained_profiler(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    X, y = construct_lstm_data(np.random.rand(60, 1), sequence_size=5)
+    profiler = TrainingProfiler()
+    # 35 training sequences in batches of 16
+    train_model(make_model(), epochs=3, batch_size=16, X_train=X[:35], y_train=y[:35], X_val=X[35:], y_val=y[35:], profiler=profiler)
+    return profiler
+
+def test_profiler_records_epochs_and_batches(trained_profiler):
+    epochs = trained_profiler.epochs_frame()
+    batches = trained_profiler.batches_frame()
+
+    assert list(epochs.index) == [1, 2, 3]
+    assert (epochs["batches"] == 3).all()
+    assert (epochs["samples"] == 35).all()
+    assert list(batches.loc[1, "samples"]) == [16, 16, 3]
+    assert (epochs["time_s"] >= epochs["overhead_s"] + epochs["compute_s"]).all()
+    assert (epochs["samples_per_s"] > 0).all()
+    np.testing.assert_allclose(batches.groupby(level="epoch")["compute_s"].sum(), epochs["compute_s"])
+
+    summary = trained_profiler.summary()
+    assert summary["epochs"] == 3
+    assert 0 <= summary["overhead_fraction"] <= 1
+    assert summary["total_s"] >= epochs["time_s"].sum()
+
+def test_profiler_exports(tmp_path, trained_profiler):
+    trained_profiler.to_json(str(tmp_path / "profile.json"))
+    trained_profiler.to_csv(str(tmp_path / "profile"))
+
+    with open(tmp_path / "profile.json") as f:
+        epochs, batches = profile_frames(json.load(f))
+    pd.testing.assert_frame_equal(epochs, trained_profiler.epochs_frame(), check_dtype=False)
+    assert len(batches) == 9
+    assert len(pd.read_csv(tmp_path / "profile" / "epochs.csv")) == 3
+    assert len(pd.read_csv(tmp_path / "profile" / "batches.csv")) == 9
+    assert len(plot_training_profile(epochs).data) == 4
+
+def test_profiler_with_invalid_trace_epochs():
+    with pytest.raises(ValueError):
+        TrainingProfiler(trace_epochs=(2, 1))
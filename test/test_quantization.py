@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.create_model import LSTMForecasting
+from src.data_handling import preprocess_data
+from src.quantization import TFLiteForecasting, export_tflite, quantization_report
+
+def make_model():
+    model = LSTMForecasting(
+        input_size=6,
+        lstm_hidden_size=8,
+        linear_hidden_size=8,
+        lstm_num_layers=2,
+        linear_num_layers=2,
+        output_size=1
+    )
+    model(np.zeros((1, 6, 1), dtype=np.float32))
+    return model
+
+@pytest.mark.parametrize("quantization,tolerance", [("none", 1e-5), ("dynamic", 1e-2), ("float16", 1e-2)])
+def test_tflite_matches_keras(tmp_path, quantization, tolerance):
+    model = make_model()
+    path = str(tmp_path / "model.tflite")
+    export_tflite(model, path, quantization=quantization, batch_size=4)
+
+    X = np.random.uniform(-1, 1, (10, 6, 1)).astype(np.float32)
+    predictions = TFLiteForecasting(path).predict(X)
+    assert predictions.shape == (10, 1)
+    np.testing.assert_allclose(predictions, model.predict(X, verbose=0), atol=tolerance)
+
+def test_invalid_quantization():
+    with pytest.raises(ValueError):
+        export_tflite(make_model(), quantization="int4")
+
+def test_quantization_report():
+    values = np.sin(np.linspace(0, 10, 120)) + 2
+    splits = [pd.DataFrame(part, columns=["Close"]) for part in (values[:80], values[80:95], values[95:])]
+    X_train, y_train, X_val, y_val, X_test, y_test, scaler = preprocess_data(*splits, seq_size=6)
+
+    report = quantization_report(make_model(), X_test, y_test, scaler=scaler, modes=("none", "float16"))
+    assert list(report.index) == ["keras", "none", "float16"]
+    assert report.loc["none", "max_abs_diff"] < 1e-4
+    assert report.loc["float16", "size_bytes"] > 0
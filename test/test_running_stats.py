@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.running_stats import RunningStats
+
+@pytest.fixture
+def series():
+    index = pd.date_range("2024-01-01", periods=500, freq="min")
+    values = 100 + np.cumsum(np.random.default_rng(0).normal(0, 1, 500))
+    values[[10, 250]] = np.nan
+    return pd.Series(values, index=index)
+
+def assert_matches_pandas(stats, series, window):
+    summary = stats.summary()
+    assert summary["mean"] == pytest.approx(series.mean())
+    assert summary["std"] == pytest.approx(series.std())
+    assert summary["min"] == series.min()
+    assert summary["max"] == series.max()
+    assert summary["missing"] == series.isnull().sum()
+    rolling = stats.rolling_summary()
+    tail = series.iloc[-window:]
+    assert rolling["mean"] == pytest.approx(tail.mean())
+    assert rolling["std"] == pytest.approx(tail.std())
+    assert rolling["min"] == tail.min() and rolling["max"] == tail.max()
+
+def test_incremental_updates_match_full_recompute(series):
+    stats = RunningStats(window=20)
+    for end in (7, 8, 120, 300, 500):
+        # The whole refreshed series is passed, only the new bars are added
+        stats.update(series.iloc[:end])
+        assert_matches_pandas(stats, series.iloc[:end], 20)
+    assert stats.count == 498
+    assert stats.last_index == series.index[-1]
+
+def test_update_without_new_bars_is_a_no_op(series):
+    stats = RunningStats().update(series)
+    summary = stats.summary()
+    assert stats.update(series).summary() == summary
+    assert stats.update(series.iloc[:0]).summary() == summary
+
+def test_rewritten_history_is_recomputed(series):
+    stats = RunningStats(window=5).update(series)
+    assert_matches_pandas(stats.update(series.iloc[100:]), series.iloc[100:], 5)
+
+def test_empty_stats():
+    stats = RunningStats()
+    assert np.isnan(stats.summary()["mean"]) and np.isnan(stats.std)
+    with pytest.raises(ValueError):
+        RunningStats(window=0)
+
+@pytest.mark.parametrize("corrected", [101.5, np.nan, 1000.0])
+def test_corrected_last_bar_replaces_its_old_value(series, corrected):
+    stats = RunningStats(window=20).update(series.iloc[:300])
+    # The refresh downloads the last stored bar again, with its final value
+    refreshed = series.iloc[:400].copy()
+    refreshed.iloc[299] = corrected
+    stats.update(refreshed)
+    assert_matches_pandas(stats, refreshed, 20)
+
+def test_corrected_extreme_last_bar_recomputes(series):
+    values = series.iloc[:300].copy()
+    values.iloc[-1] = values.max() + 10
+    stats = RunningStats(window=20).update(values)
+    values.iloc[-1] = 100.0
+    stats.update(values)
+    assert_matches_pandas(stats, values, 20)
@@ -0,0 +1,33 @@
+import numpy as np
+from src.create_model import LSTMForecasting
+from src.serving import ServingModel
+
+def make_model():
+    model = LSTMForecasting(
+        input_size=6,
+        lstm_hidden_size=8,
+        linear_hidden_size=8,
+        lstm_num_layers=2,
+        linear_num_layers=2,
+        output_size=1
+    )
+    model(np.zeros((1, 6, 2), dtype=np.float32))
+    return model
+
+def test_matches_model_predict():
+    model = make_model()
+    serving_model = ServingModel(model, n_features=2)
+    X = np.random.rand(50, 6, 2)
+    np.testing.assert_allclose(serving_model.predict(X), model.predict(X, verbose=0), rtol=1e-5, atol=1e-6)
+    np.testing.assert_allclose(serving_model.predict(X, batch_size=16), model.predict(X, verbose=0), rtol=1e-5, atol=1e-6)
+
+def test_varying_batch_sizes_do_not_retrace():
+    serving_model = ServingModel(make_model(), n_features=2)
+    for batch_size in (1, 7, 32, 100):
+        assert serving_model.predict(np.random.rand(batch_size, 6, 2)).shape == (batch_size, 1)
+    assert serving_model.serve.experimental_get_tracing_count() == 1
+
+def test_jit_compiled_serving():
+    model = make_model()
+    X = np.random.rand(8, 6, 2).astype(np.float32)
+    np.testing.assert_allclose(ServingModel(model, n_features=2, jit_compile=True).predict(X), model.predict(X, verbose=0), rtol=1e-4, atol=1e-5)
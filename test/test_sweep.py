@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from src.sweep import MedianPruningCallback, grid_search_space, random_search_space, run_sweep
+
+class FakeModel:
+    stop_training = False
+
+class FakeLock:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+def test_grid_search_space():
+    trials = grid_search_space({"lstm_num_layers": [1, 2], "learning_rate": [0.01, 0.001, 0.0001]})
+    assert len(trials) == 6
+    assert {"lstm_num_layers": 2, "learning_rate": 0.001} in trials
+
+def test_random_search_space():
+    space = {"lstm_hidden_size": (4, 64), "learning_rate": (1e-4, 1e-1), "batch_size": [16, 32]}
+    trials = random_search_space(space, n_trials=20, seed=0)
+    assert len(trials) == 20
+    assert trials == random_search_space(space, n_trials=20, seed=0)
+    for trial in trials:
+        assert 4 <= trial["lstm_hidden_size"] <= 64
+        assert 1e-4 <= trial["learning_rate"] <= 1e-1
+        assert trial["batch_size"] in (16, 32)
+
+def test_unknown_parameter():
+    with pytest.raises(ValueError):
+        grid_search_space({"dropout": [0.1]})
+
+def test_trial_worse_than_median_is_pruned():
+    shared_history = {3: [0.1, 0.2, 0.3]}
+    callback = MedianPruningCallback(shared_history, FakeLock(), warmup_epochs=2, min_trials=2)
+    callback.set_model(FakeModel())
+    callback.on_epoch_end(3, {"val_loss": 0.5})
+    assert callback.pruned
+    assert callback.model.stop_training
+    assert shared_history[3] == [0.1, 0.2, 0.3, 0.5]
+
+def test_trial_is_not_pruned_during_warmup_or_when_better():
+    callback = MedianPruningCallback({1: [0.1, 0.2], 5: [0.3, 0.4]}, FakeLock(), warmup_epochs=2, min_trials=2)
+    callback.set_model(FakeModel())
+    callback.on_epoch_end(1, {"val_loss": 0.5})
+    callback.on_epoch_end(5, {"val_loss": 0.2})
+    assert not callback.pruned
+
+def test_run_sweep_returns_ranked_leaderboard():
+    X = np.random.rand(30, 4, 1).astype(np.float32)
+    y = np.random.rand(30).astype(np.float32)
+    trials = grid_search_space({"lstm_hidden_size": [2, 4], "linear_hidden_size": [2], "epochs": [2]})
+    leaderboard = run_sweep(trials, X, y, X, y, max_workers=2)
+    assert len(leaderboard) == 2
+    assert leaderboard["error"].isnull().all()
+    assert leaderboard["best_val_loss"].is_monotonic_increasing
+    assert set(leaderboard["lstm_hidden_size"]) == {2, 4}
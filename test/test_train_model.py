@@ -0,0 +1,163 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from keras.callbacks import Callback
+from keras.models import load_model
+from src.create_model import LSTMForecasting
+from src.data_handling import construct_lstm_data
+from src.profiling import TrainingProfiler
+from src.train_model import BEST_WEIGHTS_MODES, TimeBudgetCallback, make_windowed_dataset, train_model
+
+def make_model(window_size):
+    return LSTMForecasting(
+        input_size=window_size,
+        lstm_hidden_size=4,
+        linear_hidden_size=4,
+        lstm_num_layers=1,
+        linear_num_layers=1,
+        output_size=1
+    )
+
+def test_windowed_dataset_matches_construct_lstm_data():
+    series = np.random.rand(40, 2).astype(np.float32)
+    expected_X, expected_y = construct_lstm_data(series, sequence_size=5)
+
+    batches = list(make_windowed_dataset(series, sequence_size=5, batch_size=8))
+    X = np.concatenate([X.numpy() for X, _ in batches])
+    y = np.concatenate([y.numpy() for _, y in batches])
+
+    assert len(batches) == 5  # 35 sequences in batches of 8
+    np.testing.assert_array_equal(X, expected_X)
+    np.testing.assert_array_equal(y, expected_y)
+
+def test_windowed_dataset_shuffle_keeps_all_sequences():
+    series = np.arange(30, dtype=np.float32).reshape(-1, 1)
+    dataset = make_windowed_dataset(series, sequence_size=4, batch_size=4, shuffle_buffer=10, seed=0)
+    y = np.concatenate([y.numpy() for _, y in dataset]).ravel()
+
+    assert not np.array_equal(y, np.arange(4, 30))
+    np.testing.assert_array_equal(np.sort(y), np.arange(4, 30))
+
+def test_windowed_dataset_with_invalid_sequence_size():
+    with pytest.raises(ValueError):
+        make_windowed_dataset(np.random.rand(5, 1), sequence_size=5)
+
+def test_train_model_with_datasets(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    series = np.random.rand(60, 1)
+    train_dataset = make_windowed_dataset(series[:45], sequence_size=5, batch_size=8, shuffle_buffer=16)
+    val_dataset = make_windowed_dataset(series[45:], sequence_size=5, batch_size=8)
+
+    model, history = train_model(make_model(5), epochs=2, train_dataset=train_dataset, val_dataset=val_dataset)
+
+    assert len(history['loss']) == 2
+    assert model.predict(np.random.rand(3, 5, 1), verbose=0).shape == (3, 1)
+
+def test_train_model_with_dataset_requires_validation():
+    train_dataset = make_windowed_dataset(np.random.rand(20, 1), sequence_size=5)
+    with pytest.raises(ValueError):
+        train_model(make_model(5), train_dataset=train_dataset)
+
+def test_train_model_early_stopping_records_epochs_run(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    X, y = construct_lstm_data(np.random.rand(40, 1), sequence_size=5)
+
+    # Without learning, the validation loss never improves after the first epoch
+    _, history = train_model(make_model(5), learning_rate=0.0, epochs=20, X_train=X[:30], y_train=y[:30],
+                             X_val=X[30:], y_val=y[30:], early_stopping_patience=2)
+
+    assert history["epoch"] == [1, 2, 3]
+    assert len(history["loss"]) == 3
+
+def test_train_model_reduces_learning_rate_on_plateau(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    X, y = construct_lstm_data(np.random.rand(40, 1), sequence_size=5)
+
+    _, history = train_model(make_model(5), learning_rate=1e-12, epochs=4, X_train=X[:30], y_train=y[:30],
+                             X_val=X[30:], y_val=y[30:], reduce_lr_patience=1, reduce_lr_factor=0.5, min_learning_rate=0.0)
+
+    assert history["learning_rate"][-1] < history["learning_rate"][0]
+
+def test_train_model_time_budget(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    X, y = construct_lstm_data(np.random.rand(40, 1), sequence_size=5)
+
+    profiler = TrainingProfiler()
+    _, history = train_model(make_model(5), epochs=20, batch_size=4, X_train=X[:30], y_train=y[:30],
+                             X_val=X[30:], y_val=y[30:], time_budget=0, profiler=profiler)
+
+    # The budget is spent after the first batch, so the first epoch ends there
+    assert history["epoch"] == [1]
+    assert len(profiler.batches) == 1
+
+class WeightsRecorder(Callback):
+    def __init__(self):
+        super().__init__()
+        self.weights = []
+        self.val_losses = []
+
+    def on_epoch_end(self, epoch, logs=None):
+        self.weights.append(self.model.get_weights())
+        self.val_losses.append(logs["val_loss"])
+
+@pytest.mark.parametrize("best_weights", BEST_WEIGHTS_MODES)
+def test_train_model_returns_best_weights(tmp_path, monkeypatch, best_weights):
+    monkeypatch.chdir(tmp_path)
+    X, y = construct_lstm_data(np.random.rand(60, 1), sequence_size=5)
+    recorder = WeightsRecorder()
+    model_path = str(tmp_path / "model.keras")
+
+    model, history = train_model(make_model(5), learning_rate=0.05, epochs=6, X_train=X[:40], y_train=y[:40],
+                                 X_val=X[40:], y_val=y[40:], model_path=model_path, callbacks=[recorder],
+                                 best_weights=best_weights)
+
+    best_epoch = int(np.argmin(recorder.val_losses))
+    for weights, expected in zip(model.get_weights(), recorder.weights[best_epoch]):
+        np.testing.assert_allclose(weights, expected)
+    saved = load_model(model_path)
+    np.testing.assert_allclose(saved.predict(X[40:], verbose=0), model.predict(X[40:], verbose=0), rtol=1e-5)
+
+def test_train_model_with_invalid_best_weights_mode():
+    with pytest.raises(ValueError):
+        train_model(make_model(5), X_train=np.zeros((4, 5, 1)), y_train=np.zeros((4, 1)),
+                    X_val=np.zeros((4, 5, 1)), y_val=np.zeros((4, 1)), best_weights="disk")
+
+class ScrambleLastEpoch(Callback):
+    def __init__(self, last_epoch):
+        super().__init__()
+        self.last_epoch = last_epoch
+
+    def on_epoch_begin(self, epoch, logs=None):
+        # Makes the last epoch the worst one
+        if epoch == self.last_epoch:
+            rng = np.random.default_rng(0)
+            self.model.set_weights([rng.normal(0, 10, w.shape).astype(w.dtype) for w in self.model.get_weights()])
+
+@pytest.mark.parametrize("best_weights", BEST_WEIGHTS_MODES)
+def test_train_model_without_restoring_best_weights_returns_last_epoch(tmp_path, monkeypatch, best_weights):
+    monkeypatch.chdir(tmp_path)
+    X, y = construct_lstm_data(np.random.rand(60, 1), sequence_size=5)
+    recorder = WeightsRecorder()
+
+    model, history = train_model(make_model(5), learning_rate=1e-6, epochs=3, X_train=X[:40], y_train=y[:40],
+                                 X_val=X[40:], y_val=y[40:], callbacks=[ScrambleLastEpoch(2), recorder],
+                                 restore_best_weights=False, best_weights=best_weights)
+
+    assert int(np.argmin(recorder.val_losses)) != 2
+    for weights, expected in zip(model.get_weights(), recorder.weights[-1]):
+        np.testing.assert_allclose(weights, expected)
+    best_epoch = int(np.argmin(recorder.val_losses))
+    assert not all(np.allclose(w, e) for w, e in zip(model.get_weights(), recorder.weights[best_epoch]))
+
+def test_time_budget_records_the_epoch_stopped_mid_epoch():
+    budget = TimeBudgetCallback(0)
+    model = SimpleNamespace(stop_training=False)
+    budget.set_model(model)
+
+    budget.on_train_begin()
+    budget.on_epoch_begin(3)
+    budget.on_train_batch_end(0)
+
+    assert model.stop_training
+    assert budget.stopped_epoch == 3